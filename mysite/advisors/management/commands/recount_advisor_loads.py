@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+
+from advisors.models import Advisor
+from advisors.quotas import actual_loads
+from projects.signals import update_advisors
+
+
+class Command(BaseCommand):
+    help = "Recompute Advisor.leading_count/committee_count from the join tables and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report drift; exit with an error instead of fixing it.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            loads = actual_loads()
+            drifted = Advisor.objects.annotate(
+                expected_leading=loads['leading_count'],
+                expected_committee=loads['committee_count'],
+            ).filter(
+                ~Q(leading_count=F('expected_leading')) | ~Q(committee_count=F('expected_committee'))
+            ).order_by('pk')
+
+            rows = list(drifted)
+            for advisor in rows:
+                self.stdout.write(
+                    f"{advisor.pk} {advisor}: leading {advisor.leading_count} -> {advisor.expected_leading}, "
+                    f"committee {advisor.committee_count} -> {advisor.expected_committee}"
+                )
+
+            if not rows:
+                self.stdout.write(self.style.SUCCESS("Advisor load counters are in sync."))
+                return
+            if options['check']:
+                raise CommandError(f"{len(rows)} advisor(s) have drifted load counters.")
+
+            update_advisors(Advisor.objects.filter(pk__in=[advisor.pk for advisor in rows]), **loads)
+            self.stdout.write(self.style.SUCCESS(f"Fixed load counters for {len(rows)} advisor(s)."))
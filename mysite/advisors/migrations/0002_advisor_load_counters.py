@@ -0,0 +1,42 @@
+# Generated by Django 5.0.13 on 2026-10-18 20:11
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_load_counters(apps, schema_editor):
+    Advisor = apps.get_model('advisors', 'Advisor')
+    FinalProject = apps.get_model('projects', 'FinalProject')
+
+    def assignment_count(queryset):
+        return Coalesce(Subquery(
+            queryset.filter(advisor=OuterRef('pk')).order_by().values('advisor').annotate(total=Count('pk')).values('total')
+        ), 0)
+
+    Advisor.objects.update(
+        leading_count=assignment_count(FinalProject.objects.all()),
+        committee_count=assignment_count(FinalProject.committee_members.through.objects.all()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisors', '0001_initial'),
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='advisor',
+            name='committee_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='advisor',
+            name='leading_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_load_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.13 on 2026-10-18 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisors', '0002_advisor_load_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='advisor',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
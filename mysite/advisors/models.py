@@ -15,6 +15,13 @@ class Advisor(models.Model):
     leading_quota = models.IntegerField(default=0)
     committee_quota = models.IntegerField(default=0)
 
+    # Denormalized loads, maintained by the signal handlers in projects/signals.py.
+    # `manage.py recount_advisor_loads` recomputes them from the join tables.
+    leading_count = models.PositiveIntegerField(default=0, editable=False)
+    committee_count = models.PositiveIntegerField(default=0, editable=False)
+    # Version stamp for ETags; the load counter updates bump it as well.
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
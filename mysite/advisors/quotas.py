@@ -0,0 +1,87 @@
+"""
+Advisor quota accounting shared by project validation and the bulk
+quota-check endpoint.
+
+Quota checks read the denormalized `leading_count`/`committee_count`
+columns, so any number of advisors is checked with one primary-key
+lookup. With `lock=True` that lookup takes row locks (ordered by pk to
+avoid deadlocks), so concurrent assignments to the same advisor are
+serialized: the second writer only sees the counts after the first has
+committed. `actual_loads` recomputes the counts from the join tables.
+"""
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from projects.models import FinalProject
+from .models import Advisor
+
+
+def _assignment_count(queryset):
+    """
+    Correlated subquery counting the rows of `queryset` pointing at the outer advisor.
+    """
+    return Coalesce(
+        Subquery(
+            queryset.filter(advisor=OuterRef('pk'))
+            .order_by()
+            .values('advisor')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def actual_loads():
+    """
+    Return {'leading_count': expr, 'committee_count': expr} recomputing each
+    advisor's load from the join tables, for use in annotate() or update().
+    """
+    return {
+        'leading_count': _assignment_count(FinalProject.objects.all()),
+        'committee_count': _assignment_count(FinalProject.committee_members.through.objects.all()),
+    }
+
+
+def advisor_loads(advisor_ids, lock=False):
+    """
+    Return {advisor_id: advisor} for the given ids using one query.
+
+    With `lock=True` the rows stay locked until the end of the current
+    transaction, which must be open. On SQLite row locks are a no-op and
+    writers are serialized by the database lock instead.
+    """
+    advisors = Advisor.objects.filter(pk__in=advisor_ids)
+    if lock:
+        advisors = advisors.select_for_update().order_by('pk')
+    return {advisor.pk: advisor for advisor in advisors}
+
+
+def quota_errors(leading=(), committee=(), lock=False):
+    """
+    Check that each advisor in `leading` can take one more leading project
+    and each advisor in `committee` one more committee seat.
+
+    Returns a dict of error messages keyed by the FinalProject field
+    ('advisor' / 'committee_members'); an empty dict means all fit.
+    """
+    leading_ids = {advisor.pk for advisor in leading}
+    committee_ids = {advisor.pk for advisor in committee}
+    if not (leading_ids or committee_ids):
+        return {}
+
+    loads = advisor_loads(leading_ids | committee_ids, lock=lock)
+    errors = {}
+    for advisor_id in sorted(leading_ids):
+        advisor = loads[advisor_id]
+        if advisor.leading_count >= advisor.leading_quota:
+            errors.setdefault('advisor', []).append(
+                f'Advisor {advisor} has reached their leading project limit of {advisor.leading_quota}.'
+            )
+    for advisor_id in sorted(committee_ids):
+        advisor = loads[advisor_id]
+        if advisor.committee_count >= advisor.committee_quota:
+            errors.setdefault('committee_members', []).append(
+                f'Advisor {advisor} has reached their committee limit of {advisor.committee_quota}.'
+            )
+    return errors
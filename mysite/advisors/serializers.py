@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from mysite.readers import ValuesSerializer
+from mysite.sparse import SparseFieldsSerializerMixin
 from .models import Advisor, AdvisorRole
 
 class AdvisorRoleSerializer(serializers.ModelSerializer):
@@ -6,9 +8,21 @@ class AdvisorRoleSerializer(serializers.ModelSerializer):
         model = AdvisorRole
         fields = '__all__'
 
-class AdvisorSerializer(serializers.ModelSerializer):
+class AdvisorSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     roles = AdvisorRoleSerializer(many=True, read_only=True)
 
     class Meta:
         model = Advisor
         fields = '__all__'
+
+class AdvisorReadSerializer(ValuesSerializer):
+    """
+    AdvisorSerializer's output built from `.values()` rows, for list responses.
+    """
+    serializer_class = AdvisorSerializer
+
+class AdvisorQuotaCheckSerializer(serializers.Serializer):
+    """
+    Input for the bulk quota check: the advisors an admin is planning to assign.
+    """
+    advisors = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
@@ -0,0 +1,165 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from projects.models import FinalProject
+from users.models import UserProfile
+from .models import Advisor
+from .quotas import advisor_loads, quota_errors
+
+class AdvisorQuotaTests(APITestCase):
+    """
+    Tests for batched quota accounting and the bulk quota-check endpoint.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+
+        self.advisors = [
+            Advisor.objects.create(email=f'a{i}@test.com', first_name='A', last_name=str(i), leading_quota=2, committee_quota=1)
+            for i in range(5)
+        ]
+        project = FinalProject.objects.create(title='P1', description='...', advisor=self.advisors[0])
+        project.committee_members.add(self.advisors[1])
+
+    def test_loads_counted_in_one_query(self):
+        """
+        Counting any number of advisors costs a single query.
+        """
+        with self.assertNumQueries(1):
+            loads = advisor_loads([advisor.pk for advisor in self.advisors])
+        self.assertEqual(loads[self.advisors[0].pk].leading_count, 1)
+        self.assertEqual(loads[self.advisors[1].pk].committee_count, 1)
+        self.assertEqual(loads[self.advisors[2].pk].committee_count, 0)
+
+    def test_quota_errors_reports_every_full_advisor(self):
+        """
+        All advisors over quota are reported, keyed by project field.
+        """
+        errors = quota_errors(leading=[self.advisors[0]], committee=self.advisors[1:3])
+        self.assertNotIn('advisor', errors)
+        self.assertEqual(len(errors['committee_members']), 1)
+        self.assertIn('has reached their committee limit', errors['committee_members'][0])
+
+    def test_check_quota_endpoint(self):
+        """
+        Staff can check remaining capacity for several advisors in one call.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        ids = [self.advisors[0].pk, self.advisors[1].pk]
+        response = self.client.post('/api/advisors/check-quota/', {'advisors': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['advisor'] for row in response.data], ids)
+        self.assertEqual(response.data[0]['leading_available'], 1)
+        self.assertEqual(response.data[1]['committee_available'], 0)
+
+    def test_check_quota_rejects_unknown_ids(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        response = self.client.post('/api/advisors/check-quota/', {'advisors': [999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_check_quota_denied_for_lecturer(self):
+        lecturer = User.objects.create_user(username='lecturer', password='password123')
+        UserProfile.objects.create(user=lecturer, role='lecturer')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(lecturer).access_token}')
+        response = self.client.post('/api/advisors/check-quota/', {'advisors': [self.advisors[0].pk]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AdvisorLoadCounterTests(APITestCase):
+    """
+    Tests for the denormalized leading/committee load counters.
+    """
+
+    def setUp(self):
+        self.a1 = Advisor.objects.create(email='a1@test.com', first_name='A', last_name='1', leading_quota=5, committee_quota=5)
+        self.a2 = Advisor.objects.create(email='a2@test.com', first_name='A', last_name='2', leading_quota=5, committee_quota=5)
+
+    def counts(self, advisor):
+        advisor.refresh_from_db()
+        return advisor.leading_count, advisor.committee_count
+
+    def test_leading_count_follows_project_saves_and_deletes(self):
+        project = FinalProject.objects.create(title='P', description='...', advisor=self.a1)
+        self.assertEqual(self.counts(self.a1), (1, 0))
+
+        project.advisor = self.a2
+        project.save()
+        self.assertEqual(self.counts(self.a1), (0, 0))
+        self.assertEqual(self.counts(self.a2), (1, 0))
+
+        FinalProject.objects.get(pk=project.pk).delete()
+        self.assertEqual(self.counts(self.a2), (0, 0))
+
+    def test_committee_count_follows_m2m_changes(self):
+        project = FinalProject.objects.create(title='P', description='...')
+        project.committee_members.add(self.a1, self.a2)
+        project.committee_members.add(self.a1)  # already a member
+        self.assertEqual(self.counts(self.a1), (0, 1))
+
+        project.committee_members.remove(self.a1)
+        project.committee_members.remove(self.a1)  # no longer a member
+        self.assertEqual(self.counts(self.a1), (0, 0))
+
+        self.a1.committee_projects.add(project)
+        self.assertEqual(self.counts(self.a1), (0, 1))
+
+        project.committee_members.set([self.a2])
+        self.assertEqual(self.counts(self.a1), (0, 0))
+        self.assertEqual(self.counts(self.a2), (0, 1))
+
+        project.delete()
+        self.assertEqual(self.counts(self.a2), (0, 0))
+
+    def test_deletes_and_removals_survive_counters_drifted_to_zero(self):
+        project = FinalProject.objects.create(title='P', description='...', advisor=self.a1)
+        project.committee_members.add(self.a2)
+        other = FinalProject.objects.create(title='Q', description='...')
+        other.committee_members.add(self.a1)
+        Advisor.objects.update(leading_count=0, committee_count=0)
+
+        other.committee_members.remove(self.a1)
+        FinalProject.objects.get(pk=project.pk).delete()
+        self.assertEqual(self.counts(self.a1), (0, 0))
+        self.assertEqual(self.counts(self.a2), (0, 0))
+
+    def test_recount_command_reports_and_fixes_drift(self):
+        project = FinalProject.objects.create(title='P', description='...', advisor=self.a1)
+        project.committee_members.add(self.a2)
+        Advisor.objects.filter(pk=self.a1.pk).update(leading_count=4)
+
+        with self.assertRaises(CommandError):
+            call_command('recount_advisor_loads', '--check', stdout=StringIO())
+        self.assertEqual(self.counts(self.a1), (4, 0))
+
+        out = StringIO()
+        call_command('recount_advisor_loads', stdout=out)
+        self.assertIn('leading 4 -> 1', out.getvalue())
+        self.assertEqual(self.counts(self.a1), (1, 0))
+        self.assertEqual(self.counts(self.a2), (0, 1))
+
+
+class AdvisorListTests(APITestCase):
+    """
+    Tests for sparse fieldsets and export on the advisor routes.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.advisor = Advisor.objects.create(email='a1@test.com', first_name='A', last_name='1', leading_quota=2, committee_quota=1)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+
+    def test_fields(self):
+        response = self.client.get('/api/advisors/', {'fields': 'id,last_name'})
+        self.assertEqual(response.data['results'], [{'id': self.advisor.pk, 'last_name': '1'}])
+
+    def test_export(self):
+        response = self.client.get('/api/advisors/export/', {'format': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'"email": "a1@test.com"', b''.join(response.streaming_content))
@@ -1,9 +1,18 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .models import Advisor, AdvisorRole
-from .serializers import AdvisorSerializer, AdvisorRoleSerializer
+from .quotas import advisor_loads
+from .serializers import AdvisorReadSerializer, AdvisorSerializer, AdvisorRoleSerializer, AdvisorQuotaCheckSerializer
 from users.permissions import IsAdminUser, IsStaffUser, IsLecturerUser
+from users.roles import get_role_context
+from mysite.conditional import ConditionalGetMixin
+from mysite.exports import ExportMixin
+from mysite.readers import FastReadMixin
+from mysite.response_cache import ResponseCacheMixin
+from mysite.sparse import SparseFieldsMixin
 
-class AdvisorViewSet(viewsets.ModelViewSet):
+class AdvisorViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsMixin, FastReadMixin, ExportMixin, viewsets.ModelViewSet):
     """
     This viewset provides CRUD operations for Advisors.
     - Admins/Staff: Full access.
@@ -11,15 +20,20 @@ class AdvisorViewSet(viewsets.ModelViewSet):
     - Students: Can view list.
     """
     serializer_class = AdvisorSerializer
+    read_serializer_class = AdvisorReadSerializer
+    query_budgets = {'list': 5, 'retrieve': 5, 'export': 3, 'check_quota': 3}
+    # Served on the event loop under ASGI (mysite/asyncviews.py)
+    async_actions = ('list', 'retrieve')
     permission_classes = [permissions.IsAuthenticated]
+    export_fields = [field.name for field in Advisor._meta.concrete_fields]
 
     def get_permissions(self):
         """
         Set custom permissions for different actions.
         """
-        if self.action in ['create', 'destroy']:
+        if self.action in ['create', 'destroy', 'check_quota']:
             self.permission_classes = [permissions.IsAuthenticated, IsAdminUser | IsStaffUser]
-        elif self.action in ['list', 'retrieve']:
+        elif self.action in ['list', 'retrieve', 'export']:
             self.permission_classes = [permissions.IsAuthenticated] # All authenticated users can view
         elif self.action in ['update', 'partial_update']:
              self.permission_classes = [permissions.IsAuthenticated, IsAdminUser | IsStaffUser | IsLecturerUser]
@@ -36,16 +50,45 @@ class AdvisorViewSet(viewsets.ModelViewSet):
         Allow an advisor (lecturer) to update their own profile.
         Admin and Staff can update any profile.
         """
-        instance = self.get_object()
-        user = self.request.user
+        instance = serializer.instance
+        context = get_role_context(self.request)
 
-        if user.is_staff or (hasattr(user, 'userprofile') and user.userprofile.role == 'admin'):
+        if context.is_staff or context.role == 'admin':
             serializer.save()
-        elif hasattr(user, 'userprofile') and user.userprofile.role == 'lecturer' and instance.user == user:
+        elif context.role == 'lecturer' and instance.user_id == context.user_id:
              serializer.save()
         else:
             self.permission_denied(self.request)
 
+    @action(detail=False, methods=['post'], url_path='check-quota')
+    def check_quota(self, request):
+        """
+        Report current load and remaining capacity for many advisors at once,
+        so admins can plan committee assignments before submitting them.
+        """
+        serializer = AdvisorQuotaCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        advisor_ids = serializer.validated_data['advisors']
+
+        loads = advisor_loads(advisor_ids)
+        missing = sorted(set(advisor_ids) - set(loads))
+        if missing:
+            return Response({'advisors': [f'Unknown advisor ids: {missing}.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        for advisor_id in dict.fromkeys(advisor_ids):
+            advisor = loads[advisor_id]
+            results.append({
+                'advisor': advisor.pk,
+                'leading_quota': advisor.leading_quota,
+                'leading_count': advisor.leading_count,
+                'leading_available': max(advisor.leading_quota - advisor.leading_count, 0),
+                'committee_quota': advisor.committee_quota,
+                'committee_count': advisor.committee_count,
+                'committee_available': max(advisor.committee_quota - advisor.committee_count, 0),
+            })
+        return Response(results)
+
 class AdvisorRoleViewSet(viewsets.ModelViewSet):
     """
     This viewset provides CRUD for Advisor Roles.
@@ -0,0 +1,5 @@
+"""
+Load tests run against a throwaway database, outside the test suite.
+
+Run them from the mysite directory, e.g. `python -m benchmarks.db_writes`.
+"""
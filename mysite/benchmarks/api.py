@@ -0,0 +1,345 @@
+"""
+Load test of the API endpoints over seeded data, with a JSON baseline to
+compare later runs against.
+
+    python -m benchmarks.api --students 10000 --save baseline.json
+    python -m benchmarks.api --students 10000 --compare baseline.json
+
+Data comes from `benchmarks.seed`, in a separate process so seeding does
+not count towards peak memory. `--database` keeps the seeded file between
+runs, which saves minutes at 1M students. Pass the same seeding options
+again when reusing it, since they are recorded in the results.
+
+Each scenario sends `--requests` requests (`--auth-requests` for the
+password-hashing endpoints) after `--warmup` unmeasured ones, either
+in-process through Django's test client (`--mode inprocess`, which also
+counts queries per request) or over HTTP to `manage.py runserver` on a
+local port (`--mode server`, optionally with `--concurrency` clients;
+queries are counted there when the server runs with QUERY_INSPECTOR=1).
+The results hold p50/p95/p99/mean latency, the mean queries per request,
+the response statuses and the serving process's peak RSS.
+
+Each scenario repeats one URL, so with the list response cache on every
+measured request after the warmup would be a hit. Scenarios therefore
+run with the response cache off and measure the query and serialization
+path. The `:cached` scenarios repeat a few lists with the cache on
+(`RESPONSE_CACHE_BACKEND`, locmem by default) to measure hits.
+
+`--compare` fails (exit status 1) when any percentile is more than
+`--threshold` slower than the baseline, and also at least
+`--min-delta-ms` slower, so sub-millisecond noise is ignored. It also
+fails when queries per request grow, when new errors appear or when peak
+RSS grows past the threshold.
+"""
+import argparse
+import http.client
+import json
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from .environment import BASE_DIR, local_server, peak_rss_mb, profile_env, setup_django
+
+PERCENTILES = (50, 95, 99)
+# Average extra queries per request tolerated before --compare fails
+QUERY_TOLERANCE = 0.5
+
+
+class Scenario:
+    """
+    One endpoint exercised as one user. `body(n)` builds the JSON body of
+    the n-th request, for the endpoints that take one.
+    """
+
+    def __init__(self, name, path, token=None, method='GET', body=None, expected=200, auth=False, cached=False):
+        self.name = name
+        self.path = path
+        self.token = token
+        self.method = method
+        self.body = body
+        self.expected = expected
+        self.auth = auth
+        # Served with the response cache on
+        self.cached = cached
+
+    def headers(self):
+        headers = {'Accept': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if self.body:
+            headers['Content-Type'] = 'application/json'
+        return headers
+
+
+def build_scenarios():
+    """
+    The scenarios for the seeded database, covering every role that lists
+    projects and each public endpoint.
+    """
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from advisors.models import Advisor
+    from projects.models import FinalProject
+    from students.models import Student
+    from .seed import ADMIN_USERNAME, PASSWORD, STAFF_USERNAME, TOPICS
+
+    def token(user):
+        return str(RefreshToken.for_user(user).access_token)
+
+    staff = token(User.objects.get(username=STAFF_USERNAME))
+    admin = token(User.objects.get(username=ADMIN_USERNAME))
+    lecturer = Advisor.objects.filter(user__isnull=False).order_by('-leading_count', '-committee_count', 'pk').first()
+    student = Student.objects.filter(user__isnull=False, projects__isnull=False).order_by('pk').first()
+    project = FinalProject.objects.order_by('pk').values_list('pk', flat=True)[FinalProject.objects.count() // 2]
+    run = uuid.uuid4().hex[:8]
+
+    def registration(n):
+        return {
+            'username': f'register-{run}-{n}', 'password': PASSWORD, 'email': f'register-{run}-{n}@bench.local',
+            'first_name': 'Load', 'last_name': 'Test', 'role': 'student',
+            'student_id': f'R{run}{n}', 'major': 'Computer Science', 'year_enrolled': 2024,
+        }
+
+    lecturers = Advisor.objects.count()
+
+    def login(n):
+        return {'username': f'lecturer{n % lecturers}', 'password': PASSWORD}
+
+    return [
+        Scenario('projects:staff', '/api/projects/', staff),
+        Scenario('projects:lecturer', '/api/projects/', token(lecturer.user)),
+        Scenario('projects:student', '/api/projects/', token(student.user)),
+        Scenario('projects:detail', f'/api/projects/{project}/', staff),
+        Scenario('projects:search', f'/api/projects/?q={TOPICS[2]}', staff),
+        Scenario('projects:sparse', '/api/projects/?fields=id,title,advisor.last_name', staff),
+        Scenario('students:staff', '/api/students/', staff),
+        Scenario('advisors:staff', '/api/advisors/', staff),
+        Scenario('dashboard', '/api/dashboard/', admin),
+        Scenario('projects:staff:cached', '/api/projects/', staff, cached=True),
+        Scenario('students:staff:cached', '/api/students/', staff, cached=True),
+        Scenario('token', '/api/token/', method='POST', body=login, auth=True),
+        Scenario('register', '/api/register/', method='POST', body=registration, expected=201, auth=True),
+    ]
+
+
+class QueryCounter:
+    """
+    `connection.execute_wrapper` counting the statements it sees.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_inprocess(scenario, count, offset):
+    """
+    Send `count` requests through the test client; returns
+    [(status, seconds, queries)].
+    """
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client, override_settings
+
+    client = Client(raise_request_exception=False)
+    cache_alias = settings.RESPONSE_CACHE_ALIAS if scenario.cached else None
+    headers = {name.lower(): value for name, value in scenario.headers().items() if name != 'Content-Type'}
+    samples = []
+    for n in range(offset, offset + count):
+        kwargs = {'headers': headers}
+        if scenario.body:
+            kwargs.update(data=json.dumps(scenario.body(n)), content_type='application/json')
+        counter = QueryCounter()
+        with override_settings(RESPONSE_CACHE_ALIAS=cache_alias), connection.execute_wrapper(counter):
+            began = time.perf_counter()
+            response = client.generic(scenario.method, scenario.path, **kwargs)
+            elapsed = time.perf_counter() - began
+        samples.append((response.status_code, elapsed, counter.count))
+    return samples
+
+
+def run_server(scenario, count, offset, base_url, concurrency):
+    """
+    Send `count` requests over HTTP from `concurrency` client threads.
+    """
+    address = urlsplit(base_url)
+    headers = scenario.headers()
+
+    def send(n):
+        body = json.dumps(scenario.body(n)).encode() if scenario.body else None
+        connection = http.client.HTTPConnection(address.hostname, address.port, timeout=60)
+        try:
+            began = time.perf_counter()
+            connection.request(scenario.method, scenario.path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - began
+            # Only sent when the server runs with QUERY_INSPECTOR=1
+            queries = response.getheader('X-Query-Count')
+            return response.status, elapsed, int(queries) if queries is not None else None
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(send, range(offset, offset + count)))
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarize(scenario, samples):
+    latencies = [seconds * 1000 for _, seconds, _ in samples]
+    queries = [count for _, _, count in samples if count is not None]
+    statuses = {}
+    for status, _, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    summary = {
+        'requests': len(samples),
+        'errors': sum(1 for status, _, _ in samples if status != scenario.expected),
+        'statuses': statuses,
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+    }
+    for q in PERCENTILES:
+        summary[f'p{q}_ms'] = round(percentile(latencies, q), 3)
+    return summary
+
+
+def run(args, database):
+    setup_django(database)
+    from django.conf import settings
+    import django
+
+    scenarios = [s for s in build_scenarios() if not args.scenario or s.name in args.scenario]
+    results = {
+        'meta': {
+            'mode': args.mode, 'concurrency': args.concurrency if args.mode == 'server' else 1,
+            'students': args.students, 'accounts': args.accounts, 'seed': args.seed,
+            'requests': args.requests, 'auth_requests': args.auth_requests, 'warmup': args.warmup,
+            'python': platform.python_version(), 'django': django.get_version(),
+            'json_backend': settings.JSON_BACKEND, 'response_cache': settings.RESPONSE_CACHE_BACKEND,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'scenarios': {},
+    }
+
+    def measure(send, pid, scenarios):
+        for scenario in scenarios:
+            count = args.auth_requests if scenario.auth else args.requests
+            send(scenario, args.warmup, 0)
+            summary = summarize(scenario, send(scenario, count, args.warmup))
+            results['scenarios'][scenario.name] = summary
+            print(f"{scenario.name:<22} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f} "
+                  f"{summary['queries_per_request'] if summary['queries_per_request'] is not None else '-':>8} "
+                  f"{summary['errors']:>6}")
+        rss = peak_rss_mb(pid)
+        if rss is not None:
+            results['peak_rss_mb'] = max(rss, results.get('peak_rss_mb') or 0)
+
+    results['peak_rss_mb'] = None
+    print(f"{'scenario':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>6}")
+    if args.mode == 'inprocess':
+        measure(run_inprocess, 'self', scenarios)
+    else:
+        for cached in (False, True):
+            group = [scenario for scenario in scenarios if scenario.cached == cached]
+            if not group:
+                continue
+            env = profile_env('tuned', database)
+            if not cached:
+                env['RESPONSE_CACHE_BACKEND'] = 'off'
+            with local_server(env) as (base_url, process):
+                measure(lambda scenario, count, offset: run_server(scenario, count, offset, base_url, args.concurrency),
+                        process.pid, group)
+    if results['peak_rss_mb'] is not None:
+        results['peak_rss_mb'] = round(results['peak_rss_mb'], 1)
+        print(f"peak RSS {results['peak_rss_mb']} MiB")
+    return results
+
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """
+    Return the regressions of `current` against `baseline`, as messages.
+    """
+    regressions = []
+    for key in ('mode', 'concurrency', 'students', 'accounts', 'seed'):
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            regressions.append(f"baseline was recorded with {key}={baseline['meta'].get(key)}, "
+                               f"this run used {current['meta'].get(key)}")
+    for name, before in baseline['scenarios'].items():
+        after = current['scenarios'].get(name)
+        if after is None:
+            continue
+        for q in PERCENTILES:
+            metric = f'p{q}_ms'
+            if after[metric] > before[metric] * (1 + threshold) and after[metric] - before[metric] > min_delta_ms:
+                regressions.append(f'{name}: {metric} {before[metric]:.2f} -> {after[metric]:.2f}')
+        if before['queries_per_request'] is not None and after['queries_per_request'] is not None:
+            if after['queries_per_request'] > before['queries_per_request'] + QUERY_TOLERANCE:
+                regressions.append(f"{name}: queries per request {before['queries_per_request']} -> "
+                                   f"{after['queries_per_request']}")
+        if after['errors'] > before['errors']:
+            regressions.append(f"{name}: errors {before['errors']} -> {after['errors']}")
+    before_rss, after_rss = baseline.get('peak_rss_mb'), current.get('peak_rss_mb')
+    if before_rss and after_rss and after_rss > before_rss * (1 + threshold):
+        regressions.append(f'peak RSS {before_rss} -> {after_rss} MiB')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=10_000)
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database', type=Path, help='Seeded SQLite file to reuse, or to create if missing.')
+    parser.add_argument('--mode', choices=['inprocess', 'server'], default='inprocess')
+    parser.add_argument('--concurrency', type=int, default=1, help='Client threads in server mode.')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--auth-requests', type=int, default=10,
+                        help='Requests for the token and register scenarios, which hash passwords.')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--scenario', action='append', help='Only run this scenario; repeatable.')
+    parser.add_argument('--save', type=Path, help='Write the results to this JSON file.')
+    parser.add_argument('--compare', type=Path, help='Baseline JSON file to check the results against.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Tolerated slowdown, as a fraction.')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.database or Path(directory) / 'api.sqlite3'
+        if not database.exists():
+            subprocess.run([
+                sys.executable, '-m', 'benchmarks.seed', '--database', str(database),
+                '--students', str(args.students), '--accounts', str(args.accounts), '--seed', str(args.seed),
+            ], cwd=BASE_DIR, check=True)
+        results = run(args, database)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + '\n')
+    if args.compare:
+        regressions = compare(json.loads(args.compare.read_text()), results, args.threshold, args.min_delta_ms)
+        if regressions:
+            print('\n'.join(['Regressions against the baseline:', *regressions]))
+            raise SystemExit(1)
+        print('No regressions against the baseline.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Throughput of the read endpoints under WSGI and ASGI at increasing
+numbers of concurrent connections:
+
+    python -m benchmarks.asgi --students 10000 --concurrency 1 8 32 --save asgi.json
+
+WSGI is `manage.py runserver --noreload`, which serves each connection in
+its own thread. ASGI is `mysite.asgi:application`, whose read endpoints
+take the async views of `mysite/asyncviews.py`, under uvicorn when it is
+installed and `benchmarks.asgi_server` otherwise (`--asgi-server` picks
+one). Both run a single process over the same seeded database, with role
+claims in the access tokens so that reads authenticate without a query
+and stay on the async path, and with the list response cache off so
+every request reads and serializes its rows.
+
+For each server, concurrency level and scenario, `--requests` requests
+are sent after `--warmup` unmeasured ones; the results hold requests per
+second over the wall time of the batch, p50/p95 latency and the count of
+unexpected statuses.
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .api import Scenario, run_server, summarize
+from .environment import BASE_DIR, local_server, profile_env, setup_django
+
+SERVERS = ('wsgi', 'asgi')
+
+
+def build_scenarios():
+    """
+    The read scenarios served asynchronously under ASGI.
+    """
+    from django.contrib.auth.models import User
+
+    from advisors.models import Advisor
+    from projects.models import FinalProject
+    from users.tokens import RoleTokenObtainPairSerializer
+    from .seed import ADMIN_USERNAME, STAFF_USERNAME
+
+    def token(user):
+        return str(RoleTokenObtainPairSerializer.get_token(user).access_token)
+
+    staff = token(User.objects.get(username=STAFF_USERNAME))
+    admin = token(User.objects.get(username=ADMIN_USERNAME))
+    lecturer = Advisor.objects.filter(user__isnull=False).order_by('-leading_count', '-committee_count', 'pk').first()
+    project = FinalProject.objects.order_by('pk').values_list('pk', flat=True)[FinalProject.objects.count() // 2]
+    return [
+        Scenario('projects:staff', '/api/projects/', staff),
+        Scenario('projects:lecturer', '/api/projects/', token(lecturer.user)),
+        Scenario('projects:detail', f'/api/projects/{project}/', staff),
+        Scenario('students:staff', '/api/students/', staff),
+        Scenario('advisors:staff', '/api/advisors/', staff),
+        Scenario('dashboard', '/api/dashboard/', admin),
+    ]
+
+
+def server_argv(server, asgi_server):
+    """
+    `local_server()` options starting `server`.
+    """
+    if server == 'wsgi':
+        # Async views off, as under a WSGI deployment
+        return {'command': ('runserver', '--noreload')}
+    if asgi_server == 'uvicorn':
+        return {'argv': lambda port: [
+            sys.executable, '-m', 'uvicorn', 'mysite.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--no-access-log', '--log-level', 'warning',
+        ]}
+    return {'argv': lambda port: [
+        sys.executable, '-m', 'benchmarks.asgi_server', 'mysite.asgi:application', f'127.0.0.1:{port}',
+    ]}
+
+
+def run(args, database):
+    setup_django(database)
+    import django
+
+    scenarios = [s for s in build_scenarios() if not args.scenario or s.name in args.scenario]
+    results = {
+        'meta': {
+            'students': args.students, 'accounts': args.accounts, 'seed': args.seed,
+            'requests': args.requests, 'warmup': args.warmup, 'concurrency': args.concurrency,
+            'asgi_server': args.asgi_server,
+            'python': platform.python_version(), 'django': django.get_version(),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'servers': {},
+    }
+
+    print(f"{'server':<6} {'conc':>5} {'scenario':<18} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+    for server in SERVERS:
+        env = profile_env('tuned', database)
+        env['ASYNC_READ_VIEWS'] = '1' if server == 'asgi' else '0'
+        # Repeated URLs would otherwise be list response cache hits
+        env['RESPONSE_CACHE_BACKEND'] = 'off'
+        results['servers'][server] = by_concurrency = {}
+        with local_server(env, **server_argv(server, args.asgi_server)) as (base_url, _):
+            for concurrency in args.concurrency:
+                by_concurrency[str(concurrency)] = by_scenario = {}
+                for scenario in scenarios:
+                    run_server(scenario, args.warmup, 0, base_url, concurrency)
+                    began = time.perf_counter()
+                    samples = run_server(scenario, args.requests, args.warmup, base_url, concurrency)
+                    elapsed = time.perf_counter() - began
+                    summary = summarize(scenario, samples)
+                    summary = {
+                        'requests_per_second': round(len(samples) / elapsed, 1),
+                        **{key: summary[key] for key in ('requests', 'errors', 'statuses', 'p50_ms', 'p95_ms')},
+                    }
+                    by_scenario[scenario.name] = summary
+                    print(f"{server:<6} {concurrency:>5} {scenario.name:<18} {summary['requests_per_second']:>9.1f} "
+                          f"{summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['errors']:>6}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=10_000)
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database', type=Path, help='Seeded SQLite file to reuse, or to create if missing.')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32],
+                        help='Concurrent client connections; one run per value.')
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--asgi-server', choices=['uvicorn', 'builtin'],
+                        default='uvicorn' if importlib.util.find_spec('uvicorn') else 'builtin')
+    parser.add_argument('--scenario', action='append', help='Only run this scenario; repeatable.')
+    parser.add_argument('--save', type=Path, help='Write the results to this JSON file.')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = args.database or Path(directory) / 'api.sqlite3'
+        if not database.exists():
+            subprocess.run([
+                sys.executable, '-m', 'benchmarks.seed', '--database', str(database),
+                '--students', str(args.students), '--accounts', str(args.accounts), '--seed', str(args.seed),
+            ], cwd=BASE_DIR, check=True)
+        results = run(args, database)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    main()
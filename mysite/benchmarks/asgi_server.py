@@ -0,0 +1,116 @@
+"""
+A minimal asyncio HTTP/1.1 server for ASGI applications, used by
+`benchmarks.asgi` when uvicorn is not installed:
+
+    python -m benchmarks.asgi_server mysite.asgi:application 127.0.0.1:8001
+
+It serves one request per connection (responses carry `Connection:
+close`), buffers request bodies and has no TLS, keep-alive or lifespan
+support: enough to drive the application from an event loop the way
+uvicorn does, not to deploy it.
+"""
+import asyncio
+import importlib
+import sys
+from http import HTTPStatus
+from urllib.parse import unquote
+
+MAX_HEADER_BYTES = 64 * 1024
+
+
+async def read_request(reader):
+    """
+    Return (method, target, version, headers, body), or None when the
+    client closed the connection first.
+    """
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        return None
+    request_line, *header_lines = head[:-4].decode('latin-1').split('\r\n')
+    method, target, version = request_line.split(' ', 2)
+    headers = []
+    for line in header_lines:
+        name, _, value = line.partition(':')
+        headers.append((name.strip().lower().encode('latin-1'), value.strip().encode('latin-1')))
+    length = int(dict(headers).get(b'content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return method, target, version, headers, body
+
+
+def build_scope(method, target, version, headers, client, server):
+    path, _, query = target.partition('?')
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0', 'spec_version': '2.3'},
+        'http_version': version.split('/', 1)[1],
+        'method': method,
+        'scheme': 'http',
+        'path': unquote(path),
+        'raw_path': path.encode('latin-1'),
+        'query_string': query.encode('latin-1'),
+        'root_path': '',
+        'headers': headers,
+        'client': client,
+        'server': server,
+    }
+
+
+def serve(application, host, port):
+    async def handle(reader, writer):
+        done = asyncio.Event()
+        try:
+            request = await read_request(reader)
+            if request is None:
+                return
+            method, target, version, headers, body = request
+            scope = build_scope(
+                method, target, version, headers,
+                writer.get_extra_info('peername')[:2], writer.get_extra_info('sockname')[:2],
+            )
+            received = False
+
+            async def receive():
+                nonlocal received
+                if received:
+                    # Django listens for a disconnect while the view runs;
+                    # the connection only closes once the response is sent
+                    await done.wait()
+                    return {'type': 'http.disconnect'}
+                received = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+                    lines = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}'.encode('latin-1')]
+                    lines += [name + b': ' + value for name, value in message.get('headers', [])]
+                    lines.append(b'Connection: close')
+                    writer.write(b'\r\n'.join(lines) + b'\r\n\r\n')
+                elif message['type'] == 'http.response.body':
+                    writer.write(message.get('body', b''))
+                    await writer.drain()
+
+            await application(scope, receive, send)
+        finally:
+            done.set()
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, host, port, limit=MAX_HEADER_BYTES, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def main(argv=None):
+    target, address = (argv or sys.argv[1:])[:2]
+    module, _, attribute = target.partition(':')
+    host, _, port = address.rpartition(':')
+    sys.path.insert(0, '.')
+    serve(getattr(importlib.import_module(module), attribute), host, int(port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Write throughput of concurrent worker processes against SQLite, with the
+stock backend ("before") and the tuned one from settings ("after").
+
+Every worker is a separate process, like a WSGI worker, and runs
+`--writes` transactions that read before inserting a Student. The same
+workload runs once per profile on a fresh database file:
+
+    python -m benchmarks.db_writes --workers 8 --writes 200
+
+Failed writes are counted, not retried, so "database is locked" errors
+show up in the `errors` column.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .environment import BASE_DIR, PROFILES, create_database, profile_env
+
+
+def worker(env, worker_id, writes, start, results):
+    """
+    Run `writes` read-then-insert transactions and report (ok, errors, seconds).
+    """
+    os.environ.update(env)
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+    django.setup()
+    from django.db import DatabaseError, transaction
+    from students.models import Student
+
+    ok = errors = 0
+    start.wait()
+    began = time.perf_counter()
+    for n in range(writes):
+        try:
+            with transaction.atomic():
+                Student.objects.filter(major='Benchmark').count()
+                Student.objects.create(
+                    first_name='Load', last_name=str(n), major='Benchmark', year_enrolled=2024,
+                    student_id=f'W{worker_id}-{n}', email=f'w{worker_id}-{n}@bench.local',
+                )
+            ok += 1
+        except DatabaseError:
+            errors += 1
+    results.put((ok, errors, time.perf_counter() - began))
+
+
+def run_profile(profile, workers, writes, directory):
+    env = profile_env(profile, Path(directory) / f'{profile}.sqlite3')
+    create_database(env)
+
+    ctx = multiprocessing.get_context('spawn')
+    start = ctx.Event()
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=worker, args=(env, worker_id, writes, start, results))
+        for worker_id in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    # Give every worker time to import Django before releasing them together.
+    time.sleep(2)
+    began = time.perf_counter()
+    start.set()
+    totals = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - began
+    for process in processes:
+        process.join()
+
+    ok = sum(result[0] for result in totals)
+    errors = sum(result[1] for result in totals)
+    return {'profile': profile, 'ok': ok, 'errors': errors, 'seconds': elapsed, 'writes_per_second': ok / elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help='Transactions per worker.')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='Profile to run; repeatable. Defaults to all.')
+    args = parser.parse_args(argv)
+
+    print(f"{'profile':<8} {'ok':>7} {'errors':>7} {'seconds':>8} {'writes/s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for profile in args.profile or PROFILES:
+            row = run_profile(profile, args.workers, args.writes, directory)
+            print(f"{row['profile']:<8} {row['ok']:>7} {row['errors']:>7} "
+                  f"{row['seconds']:>8.2f} {row['writes_per_second']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
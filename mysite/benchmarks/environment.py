@@ -0,0 +1,92 @@
+"""
+Throwaway SQLite databases for the load tests.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    'stock': {'SQLITE_TUNING': '0'},
+    'tuned': {'SQLITE_TUNING': '1'},
+}
+
+
+def profile_env(profile, path):
+    env = dict(os.environ, DB_ENGINE='sqlite', SQLITE_PATH=str(path), **PROFILES[profile])
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+    # Measure production settings: no query log, no per-request log lines
+    env.setdefault('DJANGO_DEBUG', '0')
+    env.setdefault('API_LOGGING_SAMPLE_RATE', '0')
+    return env
+
+
+def create_database(env):
+    subprocess.run(
+        [sys.executable, 'manage.py', 'migrate', '--run-syncdb', '--verbosity', '0'],
+        cwd=BASE_DIR, env=env, check=True,
+    )
+
+
+def peak_rss_mb(pid='self'):
+    """
+    Peak resident set size of a process in MiB, from /proc (Linux only).
+    """
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+@contextmanager
+def local_server(env, command=('runserver', '--noreload'), timeout=30, argv=None):
+    """
+    Serve the site from a subprocess on a free local port; yields
+    (base URL, process). `command` is the manage.py command to run, with
+    the address appended; `argv(port)` replaces the whole command line
+    for other servers.
+    """
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    process = subprocess.Popen(
+        argv(port) if argv else [sys.executable, 'manage.py', *command, f'127.0.0.1:{port}'],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'The server exited with status {process.returncode}.')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f'The server did not listen on port {port} within {timeout}s.')
+                time.sleep(0.1)
+        yield f'http://127.0.0.1:{port}', process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def setup_django(path, profile='tuned'):
+    """
+    Create a migrated database at `path` and point this process's Django at it.
+    """
+    env = profile_env(profile, path)
+    create_database(env)
+    os.environ.update(env)
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+    django.setup()
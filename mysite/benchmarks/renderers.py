@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of DRF's JSONRenderer/JSONParser against the orjson-backed
+FastJSONRenderer/FastJSONParser over payloads shaped like API responses:
+
+    python -m benchmarks.renderers
+
+Each payload is rendered and parsed `--repeat` times; the best run is
+reported. Rendered bytes are checked to be identical.
+"""
+import argparse
+import datetime
+import decimal
+import io
+import os
+import sys
+import time
+
+from .environment import BASE_DIR
+
+
+def student(n):
+    return {
+        'id': n, 'first_name': 'ສົມພອນ', 'last_name': f'Student {n}', 'student_id': f'S{n:06d}',
+        'date_of_birth': '2002-01-31', 'phone_number': '020 5555 1234', 'email': f'student{n}@example.com',
+        'address': 'Vientiane Capital', 'major': 'Computer Science', 'year_enrolled': 2020,
+        'graduation_year_estimate': 2024, 'gpa': '3.25', 'status': 'studying', 'user': n,
+    }
+
+
+def advisor(n):
+    return {
+        'id': n, 'first_name': 'A', 'last_name': f'Advisor {n}', 'position': 'Lecturer', 'department': 'Science',
+        'phone_number': None, 'email': f'advisor{n}@example.com', 'leading_quota': 5, 'committee_quota': 5,
+        'leading_count': 2, 'committee_count': 3, 'user': None,
+    }
+
+
+def project(n):
+    return {
+        'id': n, 'title': f'Project {n}', 'description': 'A final project description. ' * 8,
+        'submission_date': '2024-06-01', 'status': 'in_progress',
+        'students': [student(2 * n), student(2 * n + 1)], 'advisor': advisor(n),
+        'committee_members': [advisor(n + 1), advisor(n + 2)],
+    }
+
+
+def payloads():
+    return {
+        'student page (50)': {'next': 'http://testserver/api/students/?cursor=cD01MA%3D%3D', 'previous': None,
+                              'results': [student(n) for n in range(50)]},
+        'project page (50)': {'next': None, 'previous': None, 'results': [project(n) for n in range(50)]},
+        'project page (500)': {'next': None, 'previous': None, 'results': [project(n) for n in range(500)]},
+        'dashboard stats': {
+            'total_students': 1200, 'total_advisors': 80, 'total_projects': 400,
+            'students_by_status': {'studying': 1000, 'graduated': 150, 'leave': 50},
+            'projects_by_status': {'in_progress': 300, 'completed': 90, 'pending_review': 10},
+            'advisor_quota_usage': [advisor(n) for n in range(80)],
+        },
+        'native types': [{'gpa': decimal.Decimal('3.50'), 'born': datetime.date(2002, 1, 31),
+                          'seen': datetime.datetime(2024, 5, 1, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc)}
+                         for _ in range(200)],
+    }
+
+
+def best(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - began)
+    return min(timings) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+    sys.path.insert(0, str(BASE_DIR))
+    import django
+    django.setup()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from mysite.fastjson import FastJSONParser, FastJSONRenderer, orjson
+
+    if orjson is None:
+        print('orjson is not installed; FastJSONRenderer falls back to the stdlib.')
+
+    print(f"{'payload':<20} {'bytes':>8} {'render ms':>10} {'fast':>7} {'parse ms':>9} {'fast':>7}")
+    for name, payload in payloads().items():
+        expected = JSONRenderer().render(payload)
+        if FastJSONRenderer().render(payload) != expected:
+            raise SystemExit(f'{name}: FastJSONRenderer output differs from JSONRenderer')
+        render = best(args.repeat, lambda: JSONRenderer().render(payload))
+        fast_render = best(args.repeat, lambda: FastJSONRenderer().render(payload))
+        parse = best(args.repeat, lambda: JSONParser().parse(io.BytesIO(expected)))
+        fast_parse = best(args.repeat, lambda: FastJSONParser().parse(io.BytesIO(expected)))
+        print(f'{name:<20} {len(expected):>8} {render:>10.3f} {fast_render:>7.3f} {parse:>9.3f} {fast_parse:>7.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Latency of `?q=` full-text search over a large student table.
+
+Fills a throwaway SQLite database with `--rows` students, then times the
+ranked index lookup and the fetch of the matching page for a few query
+shapes (rare word, common prefix, two words):
+
+    python -m benchmarks.search --rows 100000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from .environment import setup_django
+from .seed import FIRST_NAMES, LAST_NAMES, MAJORS
+
+QUERIES = ['Xay', 'som', 'phy', 'khamla sisouk', 'S00042']
+
+
+def populate(rows):
+    from students.models import Student
+    from students.search import student_index
+
+    rng = random.Random(0)
+    batch = []
+    for n in range(rows):
+        batch.append(Student(
+            first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES), major=rng.choice(MAJORS),
+            student_id=f'S{n:06d}', email=f'student{n}@bench.local', year_enrolled=2015 + n % 10,
+        ))
+        if len(batch) == 5000:
+            student_index.add(Student.objects.bulk_create(batch))
+            batch = []
+    if batch:
+        student_index.add(Student.objects.bulk_create(batch))
+
+
+def time_query(text, repeat, page_size):
+    from students.models import Student
+    from students.search import student_index
+
+    lookups, totals = [], []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        pks = student_index.search(text, limit=page_size + 1)
+        looked_up = time.perf_counter()
+        list(Student.objects.in_bulk(pks[:page_size]).values())
+        done = time.perf_counter()
+        lookups.append((looked_up - began) * 1000)
+        totals.append((done - began) * 1000)
+    return statistics.median(lookups), statistics.median(totals), len(pks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(Path(directory) / 'search.sqlite3')
+        from django.db import transaction
+
+        began = time.perf_counter()
+        with transaction.atomic():
+            populate(args.rows)
+        print(f'indexed {args.rows} students in {time.perf_counter() - began:.1f}s')
+
+        print(f"{'query':<16} {'lookup ms':>10} {'page ms':>8} {'hits':>5}")
+        for text in QUERIES:
+            lookup, total, hits = time_query(text, args.repeat, args.page_size)
+            print(f'{text:<16} {lookup:>10.2f} {total:>8.2f} {hits:>5}')
+
+
+if __name__ == '__main__':
+    main()
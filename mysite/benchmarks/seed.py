@@ -0,0 +1,176 @@
+"""
+Reproducible data for the load tests: students, advisors and projects with
+realistic many-to-many fan-out, plus user accounts to log in with.
+
+    python -m benchmarks.seed --students 100000 --database /tmp/bench.sqlite3
+
+The same `--students` and `--seed` always produce the same rows:
+
+- one advisor per 10 students, each with a User and a lecturer profile;
+- one project per ~1.6 students: 1-3 students each (every student sits
+  on at most one project), a leading advisor for ~90% of them and 2-3
+  committee members, all within the advisors' quotas;
+- a User and student profile for the first `--accounts` students, plus a
+  staff and an admin account. Every account's password is PASSWORD.
+
+Rows go in with bulk inserts in chunks of `CHUNK` students, the search
+indexes are filled as they go and the advisors' load counters are
+recomputed once at the end.
+"""
+import argparse
+import random
+import time
+from pathlib import Path
+
+from .environment import setup_django
+
+PASSWORD = 'bench-password'
+STAFF_USERNAME = 'bench-staff'
+ADMIN_USERNAME = 'bench-admin'
+CHUNK = 10_000
+
+FIRST_NAMES = ['Alice', 'Bounmy', 'Chanthy', 'Daovone', 'Khamla', 'Noy', 'Phet', 'Somsak', 'Vanh', 'Xay']
+LAST_NAMES = ['Keomany', 'Phommachanh', 'Sayavong', 'Sengdara', 'Sisouk', 'Vongsa', 'Xaiyavong']
+MAJORS = ['Computer Science', 'Mathematics', 'Physics', 'Economics', 'Civil Engineering', 'Linguistics']
+DEPARTMENTS = ['Science', 'Engineering', 'Economics', 'Letters']
+TOPICS = ['traffic', 'rice yields', 'hydropower', 'mobile banking', 'dialect corpora', 'flood maps', 'school meals']
+STUDENT_STATUSES = (['studying'] * 7) + (['graduated'] * 2) + ['leave']
+PROJECT_STATUSES = (['in_progress'] * 5) + (['pending_review'] * 2) + (['completed'] * 3)
+STUDENTS_PER_PROJECT = (1, 1, 1, 1, 1, 2, 2, 2, 3, 3)
+
+
+def create_users(usernames, role, password):
+    from django.contrib.auth.models import User
+    from users.models import UserProfile
+
+    users = User.objects.bulk_create(
+        [User(username=username, password=password, email=f'{username}@bench.local') for username in usernames],
+        batch_size=5000,
+    )
+    UserProfile.objects.bulk_create([UserProfile(user=user, role=role) for user in users], batch_size=5000)
+    return users
+
+
+def seed(students, accounts=1000, seed=0, verbose=True):
+    """
+    Fill the configured database; returns the number of rows per model.
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+
+    from advisors.models import Advisor
+    from advisors.quotas import actual_loads
+    from projects.models import FinalProject
+    from projects.search import project_index
+    from students.models import Student
+    from students.search import student_index
+
+    rng = random.Random(seed)
+    # Hashing is deliberately slow; every account shares one hash.
+    password = make_password(PASSWORD)
+    Students = FinalProject.students.through
+    Committee = FinalProject.committee_members.through
+    began = time.perf_counter()
+
+    with transaction.atomic():
+        create_users([STAFF_USERNAME], 'staff', password)
+        create_users([ADMIN_USERNAME], 'admin', password)
+
+        advisor_count = max(students // 10, 5)
+        lecturer_users = create_users([f'lecturer{n}' for n in range(advisor_count)], 'lecturer', password)
+        advisors = Advisor.objects.bulk_create([
+            Advisor(
+                user=user, first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                email=f'advisor{n}@bench.local', department=rng.choice(DEPARTMENTS), position='Lecturer',
+                leading_quota=rng.randint(5, 10), committee_quota=rng.randint(12, 20),
+            )
+            for n, user in enumerate(lecturer_users)
+        ], batch_size=5000)
+        leading_left = {advisor.pk: advisor.leading_quota for advisor in advisors}
+        committee_left = {advisor.pk: advisor.committee_quota for advisor in advisors}
+        advisor_ids = list(leading_left)
+
+        def pick(left, exclude=()):
+            # A few random probes; a fully booked faculty leaves the seat empty
+            for _ in range(8):
+                advisor_id = rng.choice(advisor_ids)
+                if left[advisor_id] > 0 and advisor_id not in exclude:
+                    left[advisor_id] -= 1
+                    return advisor_id
+            return None
+
+        projects = 0
+        for start in range(0, students, CHUNK):
+            numbers = range(start, min(start + CHUNK, students))
+            student_users = create_users(
+                [f'student{n}' for n in numbers if n < accounts], 'student', password,
+            )
+            users = dict(zip(range(start, start + len(student_users)), student_users))
+            chunk = Student.objects.bulk_create([
+                Student(
+                    user=users.get(n), first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                    student_id=f'S{n:07d}', email=f'student{n}@bench.local', major=rng.choice(MAJORS),
+                    year_enrolled=2015 + n % 10, gpa=f'{rng.uniform(2, 4):.2f}', status=rng.choice(STUDENT_STATUSES),
+                )
+                for n in numbers
+            ], batch_size=5000)
+            student_index.add(chunk)
+
+            groups, members = [], list(chunk)
+            rng.shuffle(members)
+            while members:
+                size = rng.choice(STUDENTS_PER_PROJECT)
+                groups.append(members[:size])
+                members = members[size:]
+
+            chunk_projects = []
+            for group in groups:
+                leader = pick(leading_left) if rng.random() < 0.9 else None
+                chunk_projects.append(FinalProject(
+                    title=f'{rng.choice(TOPICS).capitalize()} study {projects + len(chunk_projects)}',
+                    description=f'A final project on {rng.choice(TOPICS)} and {rng.choice(TOPICS)}.',
+                    status=rng.choice(PROJECT_STATUSES), advisor_id=leader,
+                ))
+            chunk_projects = FinalProject.objects.bulk_create(chunk_projects, batch_size=5000)
+            project_index.add(chunk_projects)
+            projects += len(chunk_projects)
+
+            Students.objects.bulk_create([
+                Students(finalproject_id=project.pk, student_id=student.pk)
+                for project, group in zip(chunk_projects, groups) for student in group
+            ], batch_size=5000)
+            committee = []
+            for project in chunk_projects:
+                seats = set()
+                for _ in range(rng.choice((2, 2, 3))):
+                    advisor_id = pick(committee_left, exclude=seats | {project.advisor_id})
+                    if advisor_id is not None:
+                        seats.add(advisor_id)
+                committee.extend(Committee(finalproject_id=project.pk, advisor_id=advisor_id) for advisor_id in seats)
+            Committee.objects.bulk_create(committee, batch_size=5000)
+
+            if verbose:
+                print(f'  {numbers.stop} students, {projects} projects ({time.perf_counter() - began:.0f}s)')
+
+        Advisor.objects.update(**actual_loads())
+
+    return {'students': students, 'advisors': advisor_count, 'projects': projects}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=10_000)
+    parser.add_argument('--accounts', type=int, default=1000, help='Students that get a user account.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database', type=Path, required=True, help='SQLite file to create.')
+    args = parser.parse_args(argv)
+
+    if args.database.exists():
+        raise SystemExit(f'{args.database} already exists; seed a new file.')
+    setup_django(args.database)
+    counts = seed(args.students, accounts=args.accounts, seed=args.seed)
+    print(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
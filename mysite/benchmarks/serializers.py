@@ -0,0 +1,98 @@
+"""
+Rows per second of the DRF serializers against the `.values()` read
+serializers used by the list endpoints.
+
+Fills a throwaway SQLite database with `--rows` students and projects
+(each project has two students, an advisor and two committee members),
+then renders every row to JSON both ways, queries included, and checks
+that the bytes are identical:
+
+    python -m benchmarks.serializers --rows 10000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from .environment import setup_django
+
+
+def populate(rows):
+    from advisors.models import Advisor
+    from projects.models import FinalProject
+    from students.models import Student
+
+    advisors = Advisor.objects.bulk_create(
+        Advisor(first_name='A', last_name=str(n), email=f'advisor{n}@bench.local', department='Science',
+                leading_quota=10, committee_quota=10)
+        for n in range(max(rows // 5, 3))
+    )
+    students = Student.objects.bulk_create(
+        Student(first_name='S', last_name=str(n), student_id=f'S{n:06d}', email=f'student{n}@bench.local',
+                major='Computer Science', year_enrolled=2020, gpa='3.25', date_of_birth='2002-01-31')
+        for n in range(rows)
+    )
+    projects = FinalProject.objects.bulk_create(
+        FinalProject(title=f'Project {n}', description='Benchmark project', submission_date='2024-06-01',
+                     advisor=advisors[n % len(advisors)])
+        for n in range(rows)
+    )
+    FinalProject.students.through.objects.bulk_create(
+        FinalProject.students.through(finalproject_id=project.pk, student_id=students[(n + k) % rows].pk)
+        for n, project in enumerate(projects) for k in range(2)
+    )
+    FinalProject.committee_members.through.objects.bulk_create(
+        FinalProject.committee_members.through(finalproject_id=project.pk, advisor_id=advisors[(n + k) % len(advisors)].pk)
+        for n, project in enumerate(projects) for k in (1, 2)
+    )
+
+
+def best_of(repeat, render):
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        payload = render()
+        timings.append(time.perf_counter() - began)
+    return min(timings), payload
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(Path(directory) / 'serializers.sqlite3')
+        from rest_framework.renderers import JSONRenderer
+
+        from advisors.models import Advisor
+        from advisors.serializers import AdvisorReadSerializer, AdvisorSerializer
+        from projects.models import FinalProject
+        from projects.serializers import FinalProjectReadSerializer, FinalProjectSerializer
+        from students.models import Student
+        from students.serializers import StudentReadSerializer, StudentSerializer
+
+        populate(args.rows)
+        renderer = JSONRenderer()
+        cases = [
+            ('students', Student.objects.all(), StudentSerializer, StudentReadSerializer),
+            ('advisors', Advisor.objects.all(), AdvisorSerializer, AdvisorReadSerializer),
+            ('projects', FinalProject.objects.with_related(), FinalProjectSerializer, FinalProjectReadSerializer),
+        ]
+
+        print(f"{'resource':<9} {'rows':>6} {'drf rows/s':>11} {'values rows/s':>14} {'speedup':>8}")
+        for name, queryset, serializer, read_serializer in cases:
+            queryset = queryset.order_by('pk')
+            count = queryset.count()
+            slow, expected = best_of(args.repeat, lambda: renderer.render(serializer(queryset.all(), many=True).data))
+            fast, payload = best_of(args.repeat, lambda: renderer.render(
+                read_serializer(read_serializer.values(queryset.all()), many=True).data
+            ))
+            if payload != expected:
+                raise SystemExit(f'{name}: read serializer output differs from {serializer.__name__}')
+            print(f'{name:<9} {count:>6} {count / slow:>11.0f} {count / fast:>14.0f} {slow / fast:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
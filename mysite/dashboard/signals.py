@@ -0,0 +1,28 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from students.models import Student
+from students.signals import students_imported
+from projects.models import FinalProject
+from projects.signals import projects_assigned
+from advisors.models import Advisor
+from .stats import invalidate
+
+
+@receiver(post_save, sender=Student)
+@receiver(students_imported, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Advisor)
+@receiver(post_delete, sender=Advisor)
+@receiver(post_save, sender=FinalProject)
+@receiver(post_delete, sender=FinalProject)
+@receiver(projects_assigned, sender=FinalProject)
+def invalidate_on_write(sender, **kwargs):
+    invalidate()
+
+
+@receiver(m2m_changed, sender=FinalProject.committee_members.through)
+def invalidate_on_committee_change(sender, action, **kwargs):
+    # Committee changes move the advisors' committee_count
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate()
@@ -0,0 +1,192 @@
+"""
+Cached dashboard statistics.
+
+The payload is stored in Django's cache together with its ETag, the time
+it was computed and the data version it was computed for. Writes to
+Student, Advisor and FinalProject bump the version (see signals.py), so
+a cached payload is served only while nothing has changed.
+
+With `DASHBOARD_STATS_BACKGROUND_REBUILD` enabled, a stale payload keeps
+being served while a background thread recomputes it, so readers never
+wait on a cold recompute; otherwise the first reader after a write
+recomputes it inline.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+
+from students.models import Student
+from projects.models import FinalProject
+from advisors.models import Advisor
+from mysite import metrics
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'dashboard:stats'
+VERSION_KEY = 'dashboard:stats:version'
+REBUILD_LOCK_KEY = 'dashboard:stats:rebuilding'
+
+
+def compute_stats():
+    """
+    Return a dictionary of dashboard statistics straight from the database.
+    """
+    # --- Student Stats ---
+    total_students = Student.objects.count()
+    students_by_status = Student.objects.values('status').annotate(count=Count('status'))
+
+    # --- Advisor Stats ---
+    total_advisors = Advisor.objects.count()
+
+    # --- Project Stats ---
+    total_projects = FinalProject.objects.count()
+    projects_by_status = FinalProject.objects.values('status').annotate(count=Count('status'))
+
+    # --- Prepare Advisor Quota Usage ---
+    # The loads are maintained on the advisor row, so this is a plain column read
+    advisors_with_project_counts = Advisor.objects.values(
+        'first_name', 'last_name', 'leading_quota', 'committee_quota', 'leading_count', 'committee_count'
+    )
+
+    # --- Compile the final data ---
+    return {
+        'total_students': total_students,
+        'students_by_status': {item['status']: item['count'] for item in students_by_status},
+        'total_advisors': total_advisors,
+        'total_projects': total_projects,
+        'projects_by_status': {item['status']: item['count'] for item in projects_by_status},
+        'advisor_quota_usage': list(advisors_with_project_counts)
+    }
+
+
+async def acompute_stats():
+    """
+    `compute_stats()` with the async ORM.
+    """
+    return {
+        'total_students': await Student.objects.acount(),
+        'students_by_status': {
+            item['status']: item['count']
+            async for item in Student.objects.values('status').annotate(count=Count('status'))
+        },
+        'total_advisors': await Advisor.objects.acount(),
+        'total_projects': await FinalProject.objects.acount(),
+        'projects_by_status': {
+            item['status']: item['count']
+            async for item in FinalProject.objects.values('status').annotate(count=Count('status'))
+        },
+        'advisor_quota_usage': [
+            advisor async for advisor in Advisor.objects.values(
+                'first_name', 'last_name', 'leading_quota', 'committee_quota', 'leading_count', 'committee_count'
+            )
+        ],
+    }
+
+
+def make_entry(data, version):
+    payload = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return {
+        'data': data,
+        'etag': hashlib.md5(payload, usedforsecurity=False).hexdigest(),
+        'last_modified': int(time.time()),
+        'version': version,
+    }
+
+
+def build_entry(version):
+    entry = make_entry(compute_stats(), version)
+    cache.set(STATS_KEY, entry, settings.DASHBOARD_STATS_TIMEOUT)
+    return entry
+
+
+async def abuild_entry(version):
+    entry = make_entry(await acompute_stats(), version)
+    await cache.aset(STATS_KEY, entry, settings.DASHBOARD_STATS_TIMEOUT)
+    return entry
+
+
+def cached_entry(cached):
+    """
+    Return (entry to serve or None, current version) from the cached keys.
+    """
+    entry = cached.get(STATS_KEY)
+    version = cached.get(VERSION_KEY, 0)
+    if entry is not None:
+        if entry['version'] == version:
+            metrics.cache_requests.inc('dashboard_stats', 'hit')
+            return entry, version
+        if settings.DASHBOARD_STATS_BACKGROUND_REBUILD:
+            metrics.cache_requests.inc('dashboard_stats', 'stale')
+            return entry, version
+    metrics.cache_requests.inc('dashboard_stats', 'miss')
+    return None, version
+
+
+def get_stats():
+    """
+    Return the cache entry for the current data version:
+    {'data': ..., 'etag': ..., 'last_modified': <unix time>, 'version': ...}.
+    """
+    entry, version = cached_entry(cache.get_many([STATS_KEY, VERSION_KEY]))
+    if entry is None:
+        return build_entry(version)
+    if entry['version'] != version:
+        schedule_rebuild()
+    return entry
+
+
+async def aget_stats():
+    """
+    `get_stats()` for async views.
+    """
+    entry, version = cached_entry(await cache.aget_many([STATS_KEY, VERSION_KEY]))
+    if entry is None:
+        return await abuild_entry(version)
+    if entry['version'] != version:
+        await sync_to_async(schedule_rebuild)()
+    return entry
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate():
+    """
+    Mark the cached stats as stale.
+
+    The version is bumped right away and again once the surrounding
+    transaction commits, so a payload recomputed from pre-commit data in
+    between is not mistaken for current.
+    """
+    bump_version()
+    transaction.on_commit(bump_version)
+    if settings.DASHBOARD_STATS_BACKGROUND_REBUILD:
+        transaction.on_commit(schedule_rebuild)
+
+
+def schedule_rebuild():
+    # Only one rebuild at a time; the lock expires in case a thread dies.
+    if cache.add(REBUILD_LOCK_KEY, True, timeout=60):
+        threading.Thread(target=_rebuild, name='dashboard-stats-rebuild', daemon=True).start()
+
+
+def _rebuild():
+    try:
+        build_entry(cache.get(VERSION_KEY, 0))
+    except Exception:
+        logger.exception("Rebuilding dashboard stats failed")
+    finally:
+        cache.delete(REBUILD_LOCK_KEY)
+        close_old_connections()
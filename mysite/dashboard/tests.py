@@ -1,4 +1,6 @@
 from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -63,3 +65,38 @@ class DashboardAPITests(APITestCase):
 
         # Check that the request was forbidden
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_dashboard_cached_until_write(self):
+        """
+        Repeated hits are served from cache; a write invalidates the payload.
+        """
+        refresh = RefreshToken.for_user(self.staff_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        url = '/api/dashboard/'
+        self.client.get(url, format='json')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, format='json')
+        self.assertEqual(response.data['total_students'], 1)
+        self.assertFalse(any('FROM "students_student"' in query['sql'] for query in ctx.captured_queries))
+
+        Student.objects.create(student_id='s456', email='s2@t.com', first_name='S', last_name='2', major='CS', year_enrolled=2021)
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.data['total_students'], 2)
+
+    def test_dashboard_conditional_get(self):
+        """
+        An unchanged dashboard answers If-None-Match with 304; a changed one with 200.
+        """
+        refresh = RefreshToken.for_user(self.staff_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        url = '/api/dashboard/'
+        etag = self.client.get(url, format='json')['ETag']
+
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        FinalProject.objects.create(title='P2', description='...')
+        response = self.client.get(url, format='json', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import DashboardStatsView
+from mysite.asyncviews import async_reads
+from .views import DashboardStatsView, ProfileDetailView, ProfileListView, QueryStatsView
 
 urlpatterns = [
-    path('dashboard/', DashboardStatsView.as_view(), name='dashboard-stats'),
+    path('dashboard/', async_reads(DashboardStatsView.as_view()), name='dashboard-stats'),
+    path('dashboard/queries/', QueryStatsView.as_view(), name='dashboard-queries'),
+    path('dashboard/profiles/', ProfileListView.as_view(), name='dashboard-profiles'),
+    path('dashboard/profiles/<str:trace_id>/', ProfileDetailView.as_view(), name='dashboard-profile'),
 ]
@@ -1,12 +1,15 @@
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import permissions
-from django.db.models import Count
+from rest_framework import permissions, status
 
-from students.models import Student
-from projects.models import FinalProject
-from advisors.models import Advisor
+from mysite.profiling import list_traces, summarize, trace_path
+from mysite.querybudget import query_stats
 from users.permissions import IsAdminUser, IsStaffUser
+from .stats import aget_stats, get_stats
 
 class DashboardStatsView(APIView):
     """
@@ -14,37 +17,71 @@ class DashboardStatsView(APIView):
     Accessible only by Admin and Staff users.
     """
     permission_classes = [permissions.IsAuthenticated, IsAdminUser | IsStaffUser]
+    # A cold cache recomputes every statistic
+    query_budgets = {'get': 8}
+    # Served on the event loop under ASGI (mysite/asyncviews.py)
+    async_actions = ('get',)
 
     def get(self, request, format=None):
         """
         Return a dictionary of dashboard statistics.
+
+        The payload is served from cache and carries ETag/Last-Modified, so
+        pollers sending If-None-Match/If-Modified-Since get a 304 while
+        nothing has changed.
         """
-        # --- Student Stats ---
-        total_students = Student.objects.count()
-        students_by_status = Student.objects.values('status').annotate(count=Count('status'))
-        
-        # --- Advisor Stats ---
-        total_advisors = Advisor.objects.count()
-
-        # --- Project Stats ---
-        total_projects = FinalProject.objects.count()
-        projects_by_status = FinalProject.objects.values('status').annotate(count=Count('status'))
-        
-        # --- Prepare Advisor Quota Usage ---
-        # This can be a more expensive query, so we'll be efficient
-        advisors_with_project_counts = Advisor.objects.annotate(
-            leading_count=Count('leading_projects', distinct=True),
-            committee_count=Count('committee_projects', distinct=True)
-        ).values('first_name', 'last_name', 'leading_quota', 'committee_quota', 'leading_count', 'committee_count')
-
-        # --- Compile the final data ---
-        data = {
-            'total_students': total_students,
-            'students_by_status': {item['status']: item['count'] for item in students_by_status},
-            'total_advisors': total_advisors,
-            'total_projects': total_projects,
-            'projects_by_status': {item['status']: item['count'] for item in projects_by_status},
-            'advisor_quota_usage': list(advisors_with_project_counts)
-        }
-        
-        return Response(data)
+        return self.respond(request, get_stats())
+
+    async def aget(self, request, format=None):
+        return self.respond(request, await aget_stats())
+
+    def respond(self, request, entry):
+        etag = quote_etag(entry['etag'])
+
+        response = get_conditional_response(request, etag=etag, last_modified=entry['last_modified'])
+        if response is None:
+            response = Response(entry['data'])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class QueryStatsView(APIView):
+    """
+    Per-view histograms of queries per request and query time in this
+    process, recorded while the query inspector is enabled.
+    Accessible only by Admin and Staff users.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser | IsStaffUser]
+
+    def get(self, request, format=None):
+        return Response({'enabled': settings.QUERY_INSPECTOR.get('ENABLED', False), 'views': query_stats()})
+
+
+class ProfileListView(APIView):
+    """
+    Request profiles stored by the profiling middleware, newest first.
+    Accessible only by Admin users.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response(list_traces())
+
+
+class ProfileDetailView(APIView):
+    """
+    The pstats report of one profile (`?sort=cumulative|tottime|calls`),
+    or the raw `.prof` file with `?download=1`.
+    Accessible only by Admin users.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdminUser]
+
+    def get(self, request, trace_id, format=None):
+        path = trace_path(trace_id)
+        if path is None:
+            return Response({'detail': 'Profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+        if request.query_params.get('download') == '1':
+            return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
+        return Response({'id': trace_id, 'report': summarize(path, request.query_params.get('sort', 'cumulative'))})
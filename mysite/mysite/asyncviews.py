@@ -0,0 +1,123 @@
+"""
+Async read paths for ASGI deployments.
+
+DRF views are synchronous, so under ASGI Django runs each request to them
+in a worker thread. With `ASYNC_READ_VIEWS` on (mysite/asgi.py turns it
+on), the actions a view lists in `async_actions` are served on the event
+loop instead. Content negotiation, authentication, permissions and
+rendering run inline, and the view's `a`-prefixed counterpart of the
+action (`alist`, `aretrieve`, `aget`) reads the data with the async ORM.
+
+A request takes the async path only when nothing in it needs the
+synchronous code:
+
+- it is a GET of one of the `async_actions`;
+- it has no `?fields=`, `?expand=`, `?q=` or format suffix, which go
+  through the regular serializers and search;
+- its authentication needs no query: no token, or an access token with
+  role claims (see `ClaimsJWTAuthentication.needs_database`).
+
+Everything else, writes included, runs the regular view in a worker
+thread, exactly as Django would. Django's async ORM still runs each query
+in a worker thread; what the event loop saves is a thread held for the
+whole request, and the hops in and out of it for rendering.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.routers import DefaultRouter
+
+# Query parameters only the synchronous views understand
+SYNC_ONLY_PARAMS = ('fields', 'expand', 'q', 'format')
+
+
+def reads_async(view_class, action, request, kwargs):
+    if request.method != 'GET' or action not in getattr(view_class, 'async_actions', ()):
+        return False
+    if 'format' in kwargs or any(param in request.GET for param in SYNC_ONLY_PARAMS):
+        return False
+    return not any(
+        not hasattr(authentication, 'needs_database') or authentication().needs_database(request)
+        for authentication in view_class.authentication_classes
+    )
+
+
+def detach(response):
+    """
+    Render a DRF response here, on the event loop, into a plain
+    HttpResponse; Django would hand `render()` to a worker thread.
+    """
+    if not hasattr(response, 'render'):
+        return response
+    response.render()
+    plain = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        plain[header] = value
+    return plain
+
+
+async def dispatch(view, actions, action, request, args, kwargs):
+    """
+    `APIView.dispatch()` awaiting the `a<action>` handler.
+    """
+    if actions is not None:
+        view.action_map = actions
+    view.args = args
+    view.kwargs = kwargs
+    request = view.initialize_request(request, *args, **kwargs)
+    view.request = request
+    view.headers = view.default_response_headers
+    try:
+        view.initial(request, *args, **kwargs)
+        response = await getattr(view, f'a{action}')(request, *args, **kwargs)
+    except Exception as exc:
+        response = view.handle_exception(exc)
+    view.response = view.finalize_response(request, response, *args, **kwargs)
+    return detach(view.response)
+
+
+def async_read_view(view):
+    """
+    Wrap the view function of a DRF view or viewset (from `as_view()`) in
+    an async view serving its `async_actions`; see the module docstring.
+    """
+    view_class, initkwargs = view.cls, view.initkwargs
+    actions = getattr(view, 'actions', None)
+    run_sync = sync_to_async(view)
+
+    async def async_view(request, *args, **kwargs):
+        method = request.method.lower()
+        action = actions.get(method) if actions is not None else method
+        if not reads_async(view_class, action, request, kwargs):
+            return await run_sync(request, *args, **kwargs)
+        return await dispatch(view_class(**initkwargs), actions, action, request, args, kwargs)
+
+    # Read by the URL resolver's users: metrics, query budgets, schema generation
+    async_view.cls = view_class
+    async_view.initkwargs = initkwargs
+    if actions is not None:
+        async_view.actions = actions
+    async_view.csrf_exempt = True
+    return async_view
+
+
+def async_reads(view):
+    """
+    `async_read_view(view)` when `ASYNC_READ_VIEWS` is on, else `view`.
+    """
+    return async_read_view(view) if settings.ASYNC_READ_VIEWS else view
+
+
+class AsyncReadRouter(DefaultRouter):
+    """
+    DefaultRouter passing the routes of viewsets with `async_actions`
+    through `async_reads()`.
+    """
+
+    def get_urls(self):
+        urls = super().get_urls()
+        for pattern in urls:
+            callback = pattern.callback
+            if getattr(getattr(callback, 'cls', None), 'async_actions', None) and 'get' in getattr(callback, 'actions', {}):
+                pattern.callback = async_reads(callback)
+        return urls
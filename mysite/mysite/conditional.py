@@ -0,0 +1,153 @@
+"""
+Conditional GET on list and detail routes: ETag / If-None-Match.
+
+ETags are derived from a version stamp, never from the response body, so
+a 304 is answered before any row is fetched or serialized:
+
+- detail: the object's `version_field`, read with a one-column query;
+- list: `Max(version_field)` and `Count('pk')` over the filtered queryset,
+  one aggregate query. The count catches deletions, which leave the
+  maximum untouched.
+
+The stamp is hashed together with the full path (query string included,
+so `?cursor=`, `?fields=`, `?q=`... each get their own ETag), the
+negotiated media type and the user, since the same URL shows different
+rows to different users.
+
+Models must keep `version_field` current for every change that shows up
+in their representation, including queryset updates and changes to
+embedded relations; see `projects/signals.py`.
+
+Stamps are taken before their transaction commits, so a transaction that
+stamps T1 but commits after another one stamped T2 > T1 changes the
+collection without moving `Max(version_field)`. That can only happen
+while the newest stamp is recent, so a list whose collection changed less
+than `RESPONSE_CACHE_SETTLE_SECONDS` ago is served without an ETag, and
+never answered with a 304: with write transactions shorter than the
+window, a settled stamp is final. `ResponseCacheMixin` applies the same
+rule to its entries.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from . import metrics
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin adding ETags to `list` and `retrieve`, and to their async
+    counterparts (see `asyncviews`). Must come before the mixins that
+    override `list`, so the 304 short-circuits them too.
+    """
+    version_field = 'updated_at'
+
+    def collection_stamp(self):
+        return self.filter_queryset(self.get_queryset()).order_by(), {
+            'latest': Max(self.version_field), 'count': Count('pk'),
+        }
+
+    def collection_version(self):
+        # Shared with ResponseCacheMixin, so computed once per request
+        if not hasattr(self, '_collection_version'):
+            queryset, aggregates = self.collection_stamp()
+            read_at = timezone.now()
+            self.set_collection_version(queryset.aggregate(**aggregates), read_at)
+        return self._collection_version
+
+    async def acollection_version(self):
+        if not hasattr(self, '_collection_version'):
+            queryset, aggregates = self.collection_stamp()
+            read_at = timezone.now()
+            self.set_collection_version(await queryset.aaggregate(**aggregates), read_at)
+        return self._collection_version
+
+    def set_collection_version(self, stamp, read_at):
+        # How long before the read the collection last changed
+        self.collection_age = read_at - stamp['latest'] if stamp['latest'] is not None else None
+        self._collection_version = f"{stamp['latest']}:{stamp['count']}"
+
+    def collection_settled(self):
+        """
+        Whether the collection version read by `collection_version()` can
+        no longer be overtaken by a slower commit; see the module docstring.
+        """
+        age = self.collection_age
+        return age is None or age >= timedelta(seconds=settings.RESPONSE_CACHE_SETTLE_SECONDS)
+
+    def list_etag_version(self, version):
+        return version if self.collection_settled() else None
+
+    def object_stamp(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        return queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).values_list(
+            self.version_field, flat=True,
+        )[:1]
+
+    def object_version(self):
+        """
+        The object's stamp, or None if it is not visible; the regular
+        `retrieve` then answers the 404.
+        """
+        version = list(self.object_stamp())
+        return str(version[0]) if version else None
+
+    async def aobject_version(self):
+        version = [stamp async for stamp in self.object_stamp()]
+        return str(version[0]) if version else None
+
+    def get_etag(self, version):
+        request = self.request
+        key = '|'.join([
+            self.basename, self.action, version, request.get_full_path(),
+            str(request.accepted_media_type), str(request.user.pk),
+        ])
+        return quote_etag(hashlib.md5(key.encode('utf-8'), usedforsecurity=False).hexdigest())
+
+    def not_modified(self, request, etag):
+        response = get_conditional_response(request, etag=etag)
+        if 'If-None-Match' in request.headers:
+            # Revalidations answered with 304 spared the client a download
+            metrics.cache_requests.inc('etag', 'miss' if response is None else 'hit')
+        return response
+
+    def tag(self, response, etag):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def conditional_response(self, request, version, handler, *args, **kwargs):
+        if version is None:
+            return handler(request, *args, **kwargs)
+        etag = self.get_etag(version)
+        response = self.not_modified(request, etag) or handler(request, *args, **kwargs)
+        return self.tag(response, etag)
+
+    async def aconditional_response(self, request, version, handler, *args, **kwargs):
+        if version is None:
+            return await handler(request, *args, **kwargs)
+        etag = self.get_etag(version)
+        response = self.not_modified(request, etag) or await handler(request, *args, **kwargs)
+        return self.tag(response, etag)
+
+    def list(self, request, *args, **kwargs):
+        version = self.list_etag_version(self.collection_version())
+        return self.conditional_response(request, version, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.object_version(), super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        version = self.list_etag_version(await self.acollection_version())
+        return await self.aconditional_response(request, version, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        version = await self.aobject_version()
+        return await self.aconditional_response(request, version, super().aretrieve, *args, **kwargs)
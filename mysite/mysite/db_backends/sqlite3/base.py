@@ -0,0 +1,45 @@
+"""
+SQLite backend tuned for several concurrent writer processes.
+
+Each new connection applies the PRAGMAs from OPTIONS['pragmas'] (WAL
+journal, synchronous=NORMAL, busy_timeout, mmap and page cache size), so
+readers no longer block the writer and a busy database is waited on
+instead of failing immediately.
+
+With OPTIONS['transaction_mode'] = 'IMMEDIATE', atomic blocks take the
+write lock with BEGIN IMMEDIATE. A deferred transaction that reads first
+and writes later cannot wait for the lock once another writer holds it:
+SQLite reports "database is locked" straight away, ignoring busy_timeout.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+TRANSACTION_MODES = {'DEFERRED', 'IMMEDIATE', 'EXCLUSIVE'}
+
+
+class DatabaseWrapper(SQLiteDatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = dict(options.get('pragmas', {}))
+        self.transaction_mode = (options.get('transaction_mode') or 'DEFERRED').upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(sorted(TRANSACTION_MODES))}."
+            )
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # Backend options, not sqlite3.connect() arguments.
+        kwargs.pop('pragmas', None)
+        kwargs.pop('transaction_mode', None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
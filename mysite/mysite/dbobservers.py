@@ -0,0 +1,52 @@
+"""
+Per-request observation of database statements, under WSGI and ASGI.
+
+`connection.execute_wrapper()` only applies to the connection of the
+thread that enters it, but under ASGI the async ORM runs its queries in
+worker threads the middleware never sees. Instead, every connection
+carries one permanent wrapper, `dispatch`, which hands each statement to
+the observers of the current context. `observing()` registers an observer
+in a ContextVar, which asgiref copies into `sync_to_async` threads, so the
+observer sees the request's queries whichever thread runs them.
+
+Observers have the `execute_wrapper` signature.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+observers = ContextVar('database_observers', default=())
+
+
+def dispatch(execute, sql, params, many, context):
+    active = observers.get()
+    for observer in reversed(active):
+        execute = partial(observer, execute)
+    return execute(sql, params, many, context)
+
+
+def instrument(connection, **kwargs):
+    if dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(dispatch)
+
+
+def install():
+    """
+    Instrument the connections opened from now on and this thread's
+    existing ones. Idempotent; middleware call it when they are loaded.
+    """
+    connection_created.connect(instrument, dispatch_uid='mysite.dbobservers')
+    for connection in connections.all(initialized_only=True):
+        instrument(connection)
+
+
+@contextmanager
+def observing(observer):
+    token = observers.set((*observers.get(), observer))
+    try:
+        yield observer
+    finally:
+        observers.reset(token)
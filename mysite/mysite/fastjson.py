@@ -0,0 +1,93 @@
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+`FastJSONRenderer` produces the same bytes as DRF's `JSONRenderer`:
+compact separators, UTF-8 output, U+2028/U+2029 escaped, and every type
+orjson would format differently (dates, times, datetimes, Decimal, lazy
+strings, querysets...) handed to DRF's own `JSONEncoder.default`.
+Pretty-printed responses (`Accept: application/json; indent=4`), payloads
+orjson rejects (integers wider than 64 bits) and `JSON_BACKEND = 'stdlib'`
+go through DRF's implementation.
+
+Known differences: floats in exponent notation are spelled `1e16`
+instead of `1e+16`, and NaN renders as null instead of failing. The API
+serializes Decimal fields as strings, so neither shows up in practice.
+
+`FastJSONParser` falls back to the stdlib parser for non-UTF-8 bodies
+and for anything orjson rejects, so error messages are unchanged. One
+difference remains: orjson reads integers wider than 64 bits as floats.
+No field of this API accepts such values, so the request is rejected
+either way, only with "A valid integer is required." as the message.
+"""
+import io
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+UNSAFE_LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+def fast_backend_enabled():
+    return orjson is not None and getattr(settings, 'JSON_BACKEND', 'auto') != 'stdlib'
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    Drop-in replacement for `rest_framework.renderers.JSONRenderer`.
+    """
+
+    def __init__(self):
+        self.default = self.encoder_class().default
+        if orjson is not None:
+            self.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            not fast_backend_enabled()
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        for raw, escaped in UNSAFE_LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """
+    Drop-in replacement for `rest_framework.parsers.JSONParser`.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not fast_backend_enabled() or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read() if stream is not None else b''
+        try:
+            # orjson rejects NaN/Infinity, as the strict stdlib parser does
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
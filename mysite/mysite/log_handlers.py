@@ -0,0 +1,77 @@
+"""
+Logging handlers that keep formatting and I/O off the request thread.
+"""
+import atexit
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class DrainingQueueListener(QueueListener):
+    """
+    QueueListener whose stop() waits for room in a bounded queue instead of
+    failing, and is safe to call more than once.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+    def stop(self):
+        if self._thread is not None:
+            super().stop()
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Hand records to a bounded queue drained by a background thread, which
+    formats them and writes them to stderr.
+
+    Records are enqueued unformatted. When the queue is full the record is
+    dropped (and counted in `dropped`) rather than blocking the request.
+    """
+
+    def __init__(self, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        self.target = logging.StreamHandler()
+        self.listener = DrainingQueueListener(self.queue, self.target)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Formatting is left to the listener thread.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self.listener.stop()
+        super().close()
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format a record as one compact JSON object per line, merging in the
+    dict passed as `extra={'api': {...}}`.
+    """
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update(getattr(record, 'api', {}))
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
@@ -0,0 +1,321 @@
+"""
+In-process metrics in the Prometheus text exposition format, served at
+/metrics.
+
+`MetricsMiddleware` records, per request:
+
+- `http_request_duration_seconds{route,method,status}`, a histogram;
+- `db_queries_total{route}` and `db_query_seconds_total{route}`, counted
+  on every database and from any thread (see `dbobservers`);
+- `serializer_duration_seconds{view,action}`, a histogram of the time spent
+  in the resource serializers and the `.values()` readers (see
+  `serialize()`).
+
+`cache_requests_total{cache,result}` counts hits and misses of the
+response cache, the dashboard stats cache and ETag revalidations; the hit
+ratio is `hit / (hit + miss)` in the query language.
+
+Recording takes no lock: each thread adds into its own shard of plain
+lists and only a scrape merges them, folding the shards of finished
+threads into a retired total so thread churn does not grow the registry.
+Each process keeps its own registry, so scrape every worker.
+"""
+import bisect
+import hmac
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+from . import dbobservers
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SERIALIZER_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+NAMED_GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """
+    Metric definitions plus the per-thread shards holding their values.
+
+    A shard maps (metric name, label values) to a list of numbers that
+    only its thread writes: [value] for counters, one count per bucket
+    followed by the sum for histograms.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards = []
+        self.retired = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def shard(self):
+        try:
+            return self.local.shard
+        except AttributeError:
+            shard = self.local.shard = {}
+            with self.lock:
+                self.shards.append((threading.current_thread(), shard))
+            return shard
+
+    def merge(self, into, shard):
+        for key, cell in list(shard.items()):
+            total = into.get(key)
+            if total is None:
+                into[key] = list(cell)
+            else:
+                for index, value in enumerate(cell):
+                    total[index] += value
+
+    def collect(self):
+        """
+        Return {(metric name, label values): merged cell} over all threads.
+        """
+        with self.lock:
+            live = []
+            for thread, shard in self.shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self.merge(self.retired, shard)
+            self.shards = live
+            merged = {}
+            self.merge(merged, self.retired)
+            for _, shard in live:
+                self.merge(merged, shard)
+        return merged
+
+    def reset(self):
+        with self.lock:
+            for _, shard in self.shards:
+                shard.clear()
+            self.retired.clear()
+
+    def exposition(self):
+        """
+        Render every metric in the text exposition format.
+        """
+        merged = self.collect()
+        by_metric = {}
+        for (name, labels), cell in merged.items():
+            by_metric.setdefault(name, []).append((labels, cell))
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, cell in sorted(by_metric.get(name, [])):
+                lines.extend(metric.samples(labels, cell))
+        return '\n'.join(lines) + '\n'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, help, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        registry.register(self)
+
+    def label_text(self, values, extra=()):
+        pairs = [*zip(self.labels, values), *extra]
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{label}="{escape(value)}"' for label, value in pairs) + '}'
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        shard = self.registry.shard()
+        cell = shard.get((self.name, labels))
+        if cell is None:
+            cell = shard[(self.name, labels)] = [0]
+        cell[0] += amount
+
+    def samples(self, labels, cell):
+        yield f'{self.name}{self.label_text(labels)} {format_number(cell[0])}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = self.registry.shard()
+        cell = shard.get((self.name, labels))
+        if cell is None:
+            # One count per bucket, the overflow bucket, then the sum
+            cell = shard[(self.name, labels)] = [0] * (len(self.buckets) + 2)
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def samples(self, labels, cell):
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float('inf')), cell):
+            cumulative += count
+            yield f"{self.name}_bucket{self.label_text(labels, [('le', format_number(bound))])} {cumulative}"
+        yield f'{self.name}_sum{self.label_text(labels)} {format_number(cell[-1])}'
+        yield f'{self.name}_count{self.label_text(labels)} {cumulative}'
+
+
+registry = Registry()
+
+request_duration = Histogram(
+    registry, 'http_request_duration_seconds', 'Time to produce a response, by route.',
+    ['route', 'method', 'status'],
+)
+db_queries = Counter(registry, 'db_queries_total', 'Database statements run, by route.', ['route'])
+db_query_seconds = Counter(registry, 'db_query_seconds_total', 'Time spent in database statements, by route.', ['route'])
+serializer_duration = Histogram(
+    registry, 'serializer_duration_seconds', 'Time spent serializing per request, by viewset action.',
+    ['view', 'action'], buckets=SERIALIZER_BUCKETS,
+)
+cache_requests = Counter(
+    registry, 'cache_requests_total', 'Cache lookups by cache and result (hit, miss).', ['cache', 'result'],
+)
+
+
+class RequestState:
+    """
+    Per-request accumulator; also the database observer counting queries.
+    """
+    __slots__ = ('queries', 'query_seconds', 'serializer_seconds', 'serializing')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - started
+
+
+current_request = ContextVar('metrics_request', default=None)
+
+
+def serialize(function, *args):
+    """
+    Call `function(*args)`, adding its duration to the request's serializer
+    time unless a serializer is already being timed (nested serializers).
+    """
+    state = current_request.get()
+    if state is None or state.serializing:
+        return function(*args)
+    state.serializing = True
+    started = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        state.serializing = False
+        state.serializer_seconds += time.perf_counter() - started
+
+
+def route_of(request):
+    """
+    Return (route pattern, view name, action) for `request`; patterns keep
+    label cardinality bounded, unlike paths. Router regexes are shown like
+    path() routes: `api/advisors/<pk>/`.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>', None, None
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    view = getattr(match.func, 'initkwargs', {}).get('basename') or (view_class and view_class.__name__)
+    route = NAMED_GROUP.sub(r'<\1>', match.route).strip('^$').replace('\\', '')
+    return route, view, actions.get(request.method.lower(), request.method.lower())
+
+
+class MetricsMiddleware:
+    """
+    Record the request metrics listed in the module docstring.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        dbobservers.install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestState()
+        token = current_request.set(state)
+        started = time.perf_counter()
+        try:
+            with dbobservers.observing(state):
+                response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.record(request, response, state, started)
+
+    async def __acall__(self, request):
+        state = RequestState()
+        token = current_request.set(state)
+        started = time.perf_counter()
+        try:
+            with dbobservers.observing(state):
+                response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.record(request, response, state, started)
+
+    def record(self, request, response, state, started):
+        route, view, action = route_of(request)
+        request_duration.observe(time.perf_counter() - started, route, request.method, str(response.status_code))
+        if state.queries:
+            db_queries.inc(route, amount=state.queries)
+            db_query_seconds.inc(route, amount=state.query_seconds)
+        if state.serializer_seconds and view:
+            serializer_duration.observe(state.serializer_seconds, view, action)
+        return response
+
+
+def metrics_view(request):
+    """
+    Serve the registry to scrapers sending `METRICS_TOKEN` as a bearer
+    token. Without a token the endpoint is only served under DEBUG.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            raise Http404
+    elif not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.exposition(), content_type=CONTENT_TYPE)
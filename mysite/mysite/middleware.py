@@ -1,42 +1,136 @@
 import logging
-import json
-import traceback
+import random
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
 logger = logging.getLogger(__name__)
 
+DEFAULTS = {
+    # Fraction of matching requests to log (0.0 - 1.0)
+    'SAMPLE_RATE': 1.0,
+    # Bodies larger than this are not read; only their size is logged
+    'MAX_BODY_BYTES': 4096,
+    # Path prefixes to log, and prefixes to skip even if they match. The
+    # credential endpoints are skipped: their bodies are passwords and tokens.
+    'INCLUDE_PATHS': ['/api/'],
+    'EXCLUDE_PATHS': ['/api/token/', '/api/register/', '/api/password/'],
+    # JSON keys ending with any of these (e.g. `new_password`) have their
+    # string values masked in logged bodies, wherever they appear
+    'REDACT_KEYS': ['password', 'token', 'refresh', 'access'],
+}
+
+TEXT_CONTENT_TYPES = ('application/json', 'text/')
+
+
 class APILoggingMiddleware:
+    """
+    Log one structured record per sampled API request.
+
+    Configured by the `API_LOGGING` setting (see DEFAULTS). Bodies are
+    logged as capped raw text and never parsed, values of credential-like
+    JSON keys are masked with a regular expression, streaming responses are
+    never consumed, and the record is handed to the logging handlers
+    as-is, so with the `BackgroundQueueHandler` from LOGGING all
+    formatting and I/O happen off the request thread. Runs natively
+    under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        config = {**DEFAULTS, **getattr(settings, 'API_LOGGING', {})}
+        self.sample_rate = config['SAMPLE_RATE']
+        self.max_body_bytes = config['MAX_BODY_BYTES']
+        self.include_paths = tuple(config['INCLUDE_PATHS'])
+        self.exclude_paths = tuple(config['EXCLUDE_PATHS'])
+        self.redact_re = None
+        if config['REDACT_KEYS']:
+            keys = '|'.join(re.escape(key) for key in config['REDACT_KEYS'])
+            # A JSON string member whose key ends with one of REDACT_KEYS
+            self.redact_re = re.compile(rf'("[^"\\]*(?:{keys})"\s*:\s*)"(?:[^"\\]|\\.)*"', re.IGNORECASE)
+
+    def should_log(self, request):
+        if not logger.isEnabledFor(logging.INFO):
+            return False
+        if not request.path.startswith(self.include_paths) or request.path.startswith(self.exclude_paths):
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def capped_text(self, content_type, size, read):
+        """
+        Return the body as text, with sensitive values masked, if it is
+        textual and small enough, else a size note.
+        """
+        if not size:
+            return None
+        if size > self.max_body_bytes:
+            return f"<{size} bytes omitted>"
+        if not content_type.startswith(TEXT_CONTENT_TYPES):
+            return f"<{size} bytes {content_type or 'unknown type'}>"
+        text = read().decode('utf-8', errors='replace')
+        if self.redact_re is not None:
+            text = self.redact_re.sub(r'\1"<redacted>"', text)
+        return text
 
     def __call__(self, request):
-        # Information to log
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.should_log(request):
+            return self.get_response(request)
+        log_data = self.start(request)
+        response = self.get_response(request)
+        return self.finish(request, response, log_data, getattr(request, 'user', None))
+
+    async def __acall__(self, request):
+        if not self.should_log(request):
+            return await self.get_response(request)
+        log_data = self.start(request)
+        response = await self.get_response(request)
+        user = getattr(request, 'user', None)
+        if isinstance(user, SimpleLazyObject):
+            # Not set by DRF; resolving the session user may query the database
+            user = await request.auser()
+        return self.finish(request, response, log_data, user)
+
+    def start(self, request):
         log_data = {
+            'started': time.monotonic(),
             'path': request.path,
             'method': request.method,
-            'user': 'anonymous',
         }
 
-        # Add user if authenticated
-        if request.user.is_authenticated:
-            log_data['user'] = request.user.username
-
-        # Log request body for POST/PUT/PATCH
-        if request.method in ['POST', 'PUT', 'PATCH'] and request.body:
+        # The body has to be read before the view consumes the stream.
+        if request.method in ['POST', 'PUT', 'PATCH']:
             try:
-                log_data['request_body'] = json.loads(request.body.decode('utf-8'))
-            except json.JSONDecodeError:
-                log_data['request_body'] = "Non-JSON body"
+                size = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                size = 0
+            log_data['request_body'] = self.capped_text(request.content_type or '', size, lambda: request.body)
+        return log_data
 
-        response = self.get_response(request)
-
-        # Log response status and body
+    def finish(self, request, response, log_data, user):
+        log_data['duration_ms'] = round((time.monotonic() - log_data.pop('started')) * 1000, 2)
         log_data['response_status'] = response.status_code
-        if response.content and 'application/json' in response.get('Content-Type', ''):
-             try:
-                log_data['response_body'] = json.loads(response.content.decode('utf-8'))
-             except json.JSONDecodeError:
-                log_data['response_body'] = "Non-JSON body (error decoding)"
+        # Read after the view, so users authenticated by DRF are reported too
+        log_data['user'] = user.get_username() if user is not None and user.is_authenticated else 'anonymous'
+
+        if response.streaming:
+            log_data['response_body'] = '<streaming>'
+        else:
+            log_data['response_body'] = self.capped_text(
+                response.get('Content-Type', ''), len(response.content), lambda: response.content
+            )
 
-        logger.info(f"API Activity: {json.dumps(log_data, indent=2, sort_keys=True)}")
+        logger.info(
+            "API %s %s %s", request.method, request.path, response.status_code,
+            extra={'api': log_data},
+        )
 
         return response
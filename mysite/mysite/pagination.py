@@ -0,0 +1,132 @@
+from base64 import b64decode
+from urllib.parse import parse_qs
+
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _positive_int, _reverse_ordering
+from rest_framework.utils.urls import remove_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination over the primary key.
+
+    Each page is fetched with `WHERE id > <cursor> ORDER BY id LIMIT n`
+    on the pk index, so deep pages cost the same as the first one and
+    no COUNT(*) is issued. Clients may ask for `?page_size=` up to
+    `API_MAX_PAGE_SIZE`.
+
+    DRF's `paginate_queryset()` is split in two around the one query it
+    runs, so async views can run that query with the async ORM
+    (`apaginate_queryset()`).
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return settings.API_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        window = self.page_window(queryset, request, view)
+        if window is None:
+            return None
+        return self.set_page(list(window))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        window = self.page_window(queryset, request, view)
+        if window is None:
+            return None
+        return self.set_page([item async for item in window])
+
+    def page_window(self, queryset, request, view=None):
+        """
+        The queryset of the requested page plus one item, which tells
+        whether a next page exists; None when pagination is off.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        offset, reverse, current_position = self.cursor or (0, False, None)
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+
+        if current_position is not None:
+            order = self.ordering[0]
+            order_attr = order.lstrip('-')
+            # Cursor direction XOR ordering direction
+            lookup = 'lt' if self.cursor.reverse != order.startswith('-') else 'gt'
+            queryset = queryset.filter(**{f'{order_attr}__{lookup}': current_position})
+        return queryset[offset:offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Keep the page out of `page_window()`'s results and work out the
+        next/previous positions, as DRF does.
+        """
+        offset, reverse, current_position = self.cursor or (0, False, None)
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            # The page was read in reverse order
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None or offset > 0
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None or offset > 0
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def ranked_window(self, request):
+        """
+        Return (offset, limit) of the requested page of a ranked result
+        list, such as search matches, which has no key to paginate on.
+        The offset travels in the same opaque `cursor` parameter, but
+        unlike `decode_cursor()` it is not clamped to `offset_cutoff`,
+        which would serve the page at the cutoff over and over.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        encoded = request.query_params.get(self.cursor_query_param)
+        offset = 0
+        if encoded is not None:
+            try:
+                tokens = parse_qs(b64decode(encoded.encode('ascii')).decode('ascii'))
+                offset = _positive_int(tokens.get('o', ['0'])[0])
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        return offset, self.get_page_size(request)
+
+    def ranked_envelope(self, offset, limit, has_next, results):
+        def link(page_offset):
+            if not page_offset:
+                return remove_query_param(self.base_url, self.cursor_query_param)
+            return self.encode_cursor(Cursor(offset=page_offset, reverse=False, position=None))
+
+        return {
+            'next': link(offset + limit) if has_next else None,
+            'previous': link(max(offset - limit, 0)) if offset else None,
+            'results': results,
+        }
@@ -0,0 +1,237 @@
+"""
+Per-request cProfile traces, kept in a ring buffer on local disk.
+
+`ProfilingMiddleware` profiles a request when either:
+
+- an admin sends the `X-Profile: 1` header. The JWT is checked before
+  the request runs, since DRF authenticates only inside the view, so
+  the trace covers the rest of the middleware stack, the viewset and
+  the serializers;
+- a random draw falls under `SAMPLE_RATE`, for requests under
+  `INCLUDE_PATHS`.
+
+Each trace is written as `<id>.prof` (pstats format, for `python -m
+pstats` or snakeviz) with an `<id>.json` sidecar describing the request.
+Only the newest `MAX_TRACES` are kept. Profiled responses carry an
+`X-Profile-Id` header; traces are listed and summarized at
+/api/dashboard/profiles/ for admins.
+
+One request is profiled at a time per process: Python 3.12 lets only
+one cProfile run at once, so requests arriving meanwhile, or while a
+debugger or another profiler is active, are served without a trace.
+Profiling never fails a request. Streaming responses are profiled until
+the view returns, not while their content is sent. Under ASGI a trace covers the event loop thread:
+the async views' own work, with the queries the async ORM runs in worker
+threads showing up as waits, and any other request served concurrently
+on the loop. Configured by the `PROFILING` setting (see DEFAULTS).
+"""
+import cProfile
+import io
+import json
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import APIException
+
+from users.authentication import ClaimsJWTAuthentication
+from users.roles import build_role_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Let admins request a trace with `X-Profile: 1`
+    'HEADER_ENABLED': True,
+    # Fraction of requests under INCLUDE_PATHS profiled at random
+    'SAMPLE_RATE': 0.0,
+    'INCLUDE_PATHS': ['/api/'],
+    'DIRECTORY': None,
+    'MAX_TRACES': 50,
+}
+
+# Held by the request being profiled
+PROFILER_LOCK = threading.Lock()
+
+TRACE_ID = re.compile(r'^\d{19}-[0-9a-f]{8}$')
+SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'PROFILING', {})}
+    config['DIRECTORY'] = Path(config['DIRECTORY'] or settings.BASE_DIR / '.profiles')
+    return config
+
+
+def is_admin(request):
+    """
+    Whether the request's bearer token belongs to an admin, without
+    letting authentication errors escape; the view reports those.
+    """
+    try:
+        authenticated = ClaimsJWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    return authenticated is not None and build_role_context(authenticated[0]).role == 'admin'
+
+
+def save_trace(profile, meta, directory, max_traces):
+    """
+    Write `profile` and its metadata, then drop the oldest traces beyond
+    `max_traces`. Returns the trace id.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    # Nanosecond timestamp first, so ids sort by age
+    trace_id = f'{time.time_ns():019d}-{uuid.uuid4().hex[:8]}'
+    profile.dump_stats(directory / f'{trace_id}.prof')
+    (directory / f'{trace_id}.json').write_text(json.dumps({'id': trace_id, **meta}))
+    for stale in sorted(directory.glob('*.prof'))[:-max_traces]:
+        # Another process may be trimming the same directory
+        stale.unlink(missing_ok=True)
+        stale.with_suffix('.json').unlink(missing_ok=True)
+    return trace_id
+
+
+def list_traces(directory=None):
+    """
+    Metadata of the stored traces, newest first.
+    """
+    directory = directory or get_config()['DIRECTORY']
+    traces = []
+    for path in sorted(directory.glob('*.json'), reverse=True):
+        try:
+            traces.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return traces
+
+
+def trace_path(trace_id, directory=None):
+    """
+    The `.prof` file of `trace_id`, or None for unknown or malformed ids.
+    """
+    if not TRACE_ID.match(trace_id):
+        return None
+    path = (directory or get_config()['DIRECTORY']) / f'{trace_id}.prof'
+    return path if path.exists() else None
+
+
+def summarize(path, sort='cumulative', limit=40):
+    """
+    The pstats report of the `limit` most expensive functions.
+    """
+    output = io.StringIO()
+    stats = pstats.Stats(str(path), stream=output)
+    stats.strip_dirs().sort_stats(sort if sort in SORT_KEYS else 'cumulative').print_stats(limit)
+    return output.getvalue()
+
+
+def start_profiler():
+    """
+    A running profiler, or None when another request or tool is profiling.
+    """
+    if not PROFILER_LOCK.acquire(blocking=False):
+        return None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # Another profiling tool holds the sys.monitoring slot (3.12+)
+        PROFILER_LOCK.release()
+        return None
+    return profile
+
+
+def stop_profiler(profile):
+    try:
+        profile.disable()
+    finally:
+        PROFILER_LOCK.release()
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests on demand or by sampling; see the module docstring.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def header_requested(self, request, config):
+        return config['HEADER_ENABLED'] and request.headers.get('X-Profile') == '1'
+
+    def sampled(self, request, config):
+        return bool(
+            config['SAMPLE_RATE']
+            and random.random() < config['SAMPLE_RATE']
+            and any(request.path.startswith(prefix) for prefix in config['INCLUDE_PATHS'])
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config = get_config()
+        if self.header_requested(request, config) and is_admin(request):
+            trigger = 'header'
+        elif self.sampled(request, config):
+            trigger = 'sample'
+        else:
+            return self.get_response(request)
+
+        profile = start_profiler()
+        if profile is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_profiler(profile)
+        return self.store(request, response, profile, started, trigger, config)
+
+    async def __acall__(self, request):
+        config = get_config()
+        # Authenticating may load the user row, which the event loop must not do
+        if self.header_requested(request, config) and await sync_to_async(is_admin)(request):
+            trigger = 'header'
+        elif self.sampled(request, config):
+            trigger = 'sample'
+        else:
+            return await self.get_response(request)
+
+        profile = start_profiler()
+        if profile is None:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_profiler(profile)
+        return await sync_to_async(self.store)(request, response, profile, started, trigger, config)
+
+    def store(self, request, response, profile, started, trigger, config):
+        duration_ms = (time.perf_counter() - started) * 1000
+        user = getattr(request, 'user', None)
+        meta = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'trigger': trigger,
+            'user_id': str(user.pk) if user is not None and user.is_authenticated else None,
+            'created': time.time(),
+        }
+        try:
+            response['X-Profile-Id'] = save_trace(profile, meta, config['DIRECTORY'], config['MAX_TRACES'])
+        except Exception:
+            logger.warning("Could not store profile of %s %s", request.method, request.path, exc_info=True)
+        return response
@@ -0,0 +1,264 @@
+"""
+Opt-in SQL inspection per request: N+1 detection, per-view histograms
+and query budgets.
+
+`QueryInspectorMiddleware` records every statement of a request, on every
+configured database and from any thread (see `dbobservers`), and groups
+the statements by shape: literals, parameters and the length of
+`IN (...)` lists are ignored, so the same lookup repeated for N rows
+falls into one group. Each group keeps the project code lines that issued
+it. After the response:
+
+- groups repeated `REPEAT_THRESHOLD` times or more are logged as a
+  warning, with their origins;
+- the query count and total query time feed per-view histograms, read
+  with `query_stats()` (served at /api/dashboard/queries/);
+- `X-Query-Count` / `X-Query-Time-Ms` headers are added;
+- with `ENFORCE_BUDGETS`, a request running more queries than its view
+  declares in `query_budgets` raises `QueryBudgetExceeded`. The test
+  runner turns this on, so every request made by the tests is checked.
+
+A view's `query_budgets` maps an action (or, on plain views, an HTTP
+method name) to the most queries one request may run, on every database,
+counting the two that authentication runs.
+
+Configured by the `QUERY_INSPECTOR` setting (see DEFAULTS). When it is
+disabled the middleware removes itself from the chain. Under ASGI the
+origins of queries run by the async ORM are not recorded, since they
+execute in a worker thread away from the calling code.
+"""
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import dbobservers
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    # Statement shapes run this many times in one request are reported
+    'REPEAT_THRESHOLD': 5,
+    'ENFORCE_BUDGETS': False,
+    'HEADERS': True,
+}
+
+# Upper bounds of the histogram buckets; the last bucket is unbounded
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+QUERY_TIME_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 1000)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)', re.IGNORECASE)
+VALUES_LIST = re.compile(r'\bVALUES \(.*\)', re.IGNORECASE | re.DOTALL)
+SKIPPED_CODE = (__file__, dbobservers.__file__, 'site-packages', 'dist-packages')
+
+
+def statement_shape(sql):
+    """
+    `sql` with literals and parameter lists collapsed, for grouping.
+    """
+    shape = STRING_LITERAL.sub('?', sql)
+    shape = NUMBER_LITERAL.sub('?', shape)
+    shape = IN_LIST.sub('IN (...)', shape)
+    return VALUES_LIST.sub('VALUES (...)', shape)
+
+
+def query_origin():
+    """
+    The innermost project code line on the current stack, as "path:line in name".
+    """
+    project_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(project_dir) and not any(part in filename for part in SKIPPED_CODE):
+            return f'{Path(filename).relative_to(project_dir)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    """
+    `execute_wrapper` collecting the statements of one request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = defaultdict(lambda: {'count': 0, 'duration': 0.0, 'origins': Counter()})
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            group = self.shapes[statement_shape(sql)]
+            group['count'] += 1
+            group['duration'] += elapsed
+            group['origins'][query_origin()] += 1
+
+    def repeated(self, threshold):
+        """
+        The shapes run at least `threshold` times, most frequent first.
+        """
+        return [
+            {
+                'sql': shape, 'count': group['count'], 'time_ms': round(group['duration'] * 1000, 2),
+                'origins': [origin for origin, _ in group['origins'].most_common(3) if origin],
+            }
+            for shape, group in sorted(self.shapes.items(), key=lambda item: -item[1]['count'])
+            if group['count'] >= threshold
+        ]
+
+    def describe(self, threshold=2):
+        lines = [f'{self.count} queries in {self.duration * 1000:.1f} ms']
+        for group in self.repeated(threshold):
+            lines.append(f"  {group['count']}x {group['sql']}")
+            lines.extend(f'      from {origin}' for origin in group['origins'])
+        return '\n'.join(lines)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                break
+        else:
+            index = len(self.bounds)
+        self.counts[index] += 1
+        self.sum += value
+
+    def snapshot(self):
+        """
+        Cumulative bucket counts keyed by upper bound, like Prometheus.
+        """
+        buckets, total = {}, 0
+        for bound, count in zip([*map(str, self.bounds), '+Inf'], self.counts):
+            total += count
+            buckets[bound] = total
+        return {'buckets': buckets, 'count': total, 'sum': round(self.sum, 3)}
+
+
+class QueryStats:
+    """
+    Per-view histograms of queries per request and query time, for this process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, count, duration_ms):
+        with self.lock:
+            if view not in self.views:
+                self.views[view] = (Histogram(QUERY_COUNT_BUCKETS), Histogram(QUERY_TIME_BUCKETS_MS))
+            queries, time_ms = self.views[view]
+            queries.observe(count)
+            time_ms.observe(duration_ms)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view: {'queries': queries.snapshot(), 'time_ms': time_ms.snapshot()}
+                for view, (queries, time_ms) in sorted(self.views.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+stats = QueryStats()
+
+
+def query_stats():
+    return stats.snapshot()
+
+
+def view_budget(request):
+    """
+    Return (endpoint name, budget or None) for the view that served `request`.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>', None
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    budget = getattr(view_class, 'query_budgets', {}).get(action)
+    return match.view_name or match.route, budget
+
+
+class QueryInspectorMiddleware:
+    """
+    Record, report and budget the SQL of each request; see the module docstring.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = {**DEFAULTS, **getattr(settings, 'QUERY_INSPECTOR', {})}
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.repeat_threshold = config['REPEAT_THRESHOLD']
+        self.enforce_budgets = config['ENFORCE_BUDGETS']
+        self.headers = config['HEADERS']
+        dbobservers.install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with dbobservers.observing(QueryRecorder()) as recorder:
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        with dbobservers.observing(QueryRecorder()) as recorder:
+            response = await self.get_response(request)
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        view, budget = view_budget(request)
+        duration_ms = recorder.duration * 1000
+        stats.observe(view, recorder.count, duration_ms)
+        if self.headers:
+            response['X-Query-Count'] = str(recorder.count)
+            response['X-Query-Time-Ms'] = f'{duration_ms:.2f}'
+
+        repeated = recorder.repeated(self.repeat_threshold)
+        if repeated:
+            logger.warning(
+                "%s %s repeated %d statement(s) %s times", request.method, request.path,
+                len(repeated), '/'.join(str(group['count']) for group in repeated),
+                extra={'queries': repeated},
+            )
+        if self.enforce_budgets and budget is not None and recorder.count > budget:
+            raise QueryBudgetExceeded(
+                f'{request.method} {request.path} ({view}) ran over its budget of {budget} queries: '
+                f'{recorder.describe()}'
+            )
+        return response
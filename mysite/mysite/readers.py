@@ -0,0 +1,234 @@
+"""
+Read-only serializers that build list responses from `.values()` rows.
+
+A `ValuesSerializer` reproduces the output of an existing ModelSerializer,
+field for field and byte for byte, without instantiating models or
+walking DRF fields per row. The field plan is derived once from the
+ModelSerializer itself: text, integer and primary-key fields are copied
+as-is, anything else (dates, decimals) goes through the DRF field's own
+`to_representation`, so formatting cannot drift.
+
+Relations listed in `nested` are read in bulk: foreign keys are joined
+into the main query and each many-to-many relation costs one query on its
+through table, however many rows are serialized.
+"""
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ObjectDoesNotExist, ValidationError
+from django.http import Http404
+from rest_framework import fields, relations
+from rest_framework.response import Response
+
+from . import metrics
+from .sparse import ALL_FIELDS
+
+# DRF fields whose to_representation() returns database values unchanged
+PASSTHROUGH_FIELDS = (
+    fields.CharField, fields.IntegerField, fields.ChoiceField, relations.PrimaryKeyRelatedField,
+)
+
+
+def passes_through(field):
+    if isinstance(field, fields.BigIntegerField):
+        return not getattr(field, 'coerce_to_string', False)
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        return field.pk_field is None
+    return isinstance(field, PASSTHROUGH_FIELDS)
+
+
+class ValuesSerializer:
+    """
+    Read-only stand-in for `serializer_class` taking `.values()` rows, as
+    produced by `values(queryset)`.
+    """
+    serializer_class = None
+    # Relation name -> ValuesSerializer used to render it. Nested readers
+    # may join foreign keys of their own but not many-to-many relations.
+    nested = {}
+
+    _plans = None
+
+    def __init__(self, instance=None, many=False, **kwargs):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def model(cls):
+        return cls.serializer_class.Meta.model
+
+    @classmethod
+    def pk_name(cls):
+        return cls.model()._meta.pk.name
+
+    @classmethod
+    def plan(cls, prefix=''):
+        """
+        Return [(output name, values() key, converter or None)] for the
+        serializer's fields, with keys read under `prefix`.
+        """
+        if cls.__dict__.get('_plans') is None:
+            cls._plans = {}
+        if prefix not in cls._plans:
+            cls._plans[prefix] = [
+                (name, column and prefix + column, convert) for name, column, convert in cls._build_plan()
+            ]
+        return cls._plans[prefix]
+
+    @classmethod
+    def _build_plan(cls):
+        model = cls.model()
+        plan = []
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                if hasattr(model, field.source):
+                    raise ImproperlyConfigured(f'{cls.__name__} cannot read {model.__name__}.{field.source}.')
+                # DRF skips optional read-only fields whose attribute is missing
+                continue
+            if model_field.many_to_many:
+                if name not in cls.nested:
+                    raise ImproperlyConfigured(f'{cls.__name__} needs a nested reader for {name}.')
+                plan.append((name, None, None))
+            else:
+                plan.append((name, field.source, None if passes_through(field) else field.to_representation))
+        return plan
+
+    @classmethod
+    def joined(cls):
+        """
+        The nested foreign keys, read through joins in the main query.
+        """
+        return [
+            (name, reader) for name, reader in cls.nested.items()
+            if not cls.model()._meta.get_field(name).many_to_many
+        ]
+
+    @classmethod
+    def columns(cls, prefix=''):
+        keys = [key for _, key, _ in cls.plan(prefix) if key is not None]
+        if not prefix and cls.pk_name() not in keys:
+            keys.append(cls.pk_name())
+        for name, reader in cls.joined():
+            keys.extend(reader.columns(f'{prefix}{name}__'))
+        return keys
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(*cls.columns())
+
+    @classmethod
+    def represent(cls, row, prefix=''):
+        representation = {}
+        for name, key, convert in cls.plan(prefix):
+            if key is None:
+                # Many-to-many, filled in by represent_rows()
+                representation[name] = []
+            else:
+                value = row[key]
+                representation[name] = value if convert is None or value is None else convert(value)
+        for name, reader in cls.joined():
+            # Unset foreign keys stay None
+            if representation.get(name) is not None:
+                representation[name] = reader.represent(row, f'{prefix}{name}__')
+        return representation
+
+    @classmethod
+    def link_querysets(cls, pks):
+        """
+        Yield (relation name, reader, source field, target field, `.values()`
+        of the through table) for each many-to-many relation of the objects `pks`.
+        """
+        for name, reader in cls.nested.items():
+            field = cls.model()._meta.get_field(name)
+            if not field.many_to_many or not pks:
+                continue
+            through = field.remote_field.through
+            source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+            links = through._default_manager.filter(**{f'{source}__in': list(pks)}).order_by(source, target)
+            yield name, reader, source, target, links.values(
+                f'{source}_id', f'{target}_id', *reader.columns(f'{target}__'),
+            )
+
+    @classmethod
+    def represent_rows(cls, rows, links=None):
+        """
+        Represent `rows`, reading the many-to-many relations unless
+        `links` already holds their through-table rows by relation name.
+        """
+        data = [cls.represent(row) for row in rows]
+        by_pk = {row[cls.pk_name()]: item for row, item in zip(rows, data)}
+        for name, reader, source, target, queryset in cls.link_querysets(by_pk):
+            cached = {}
+            for link in (queryset if links is None else links[name]):
+                target_id = link[f'{target}_id']
+                if target_id not in cached:
+                    cached[target_id] = reader.represent(link, f'{target}__')
+                by_pk[link[f'{source}_id']][name].append(cached[target_id])
+        return data
+
+    @classmethod
+    async def arepresent_rows(cls, rows):
+        """
+        `represent_rows()` for async views, reading the relations with the async ORM.
+        """
+        links = {}
+        for name, _, _, _, queryset in cls.link_querysets([row[cls.pk_name()] for row in rows]):
+            links[name] = [link async for link in queryset.aiterator()]
+        return metrics.serialize(cls.represent_rows, rows, links)
+
+    @property
+    def data(self):
+        if self.many:
+            return metrics.serialize(self.represent_rows, list(self.instance))
+        return metrics.serialize(self.represent_rows, [self.instance])[0]
+
+
+class FastReadMixin:
+    """
+    Viewset mixin serving `list` through `read_serializer_class`, a
+    `ValuesSerializer`, whenever the default representation is requested.
+    `?fields=`/`?expand=` responses go through the regular serializer.
+
+    `alist` and `aretrieve` serve the default representation to async
+    views (see `asyncviews`) with the async ORM.
+    """
+    read_serializer_class = None
+
+    def reads_values(self):
+        """
+        Whether list responses are built by `read_serializer_class`.
+        """
+        return self.read_serializer_class is not None and self.get_field_selection() is ALL_FIELDS
+
+    def list(self, request, *args, **kwargs):
+        if not self.reads_values():
+            return super().list(request, *args, **kwargs)
+
+        rows = self.read_serializer_class.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.read_serializer_class(page, many=True).data)
+        return Response(self.read_serializer_class(rows, many=True).data)
+
+    async def alist(self, request, *args, **kwargs):
+        reader = self.read_serializer_class
+        rows = reader.values(self.filter_queryset(self.get_queryset()))
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(rows, request, view=self)
+            if page is not None:
+                return self.get_paginated_response(await reader.arepresent_rows(page))
+        return Response(await reader.arepresent_rows([row async for row in rows]))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        reader = self.read_serializer_class
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = reader.values(self.filter_queryset(self.get_queryset()))
+        try:
+            row = await rows.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            # As get_object() does
+            raise Http404(f'No {rows.model._meta.object_name} matches the given query.')
+        self.check_object_permissions(request, row)
+        [data] = await reader.arepresent_rows([row])
+        return Response(data)
@@ -0,0 +1,120 @@
+"""
+Cache of list responses, keyed by (user scope, query, data version).
+
+The data version is the collection stamp of `ConditionalGetMixin`:
+`Max(updated_at)` and the row count over the scoped, filtered queryset.
+Writes bump `updated_at` on exactly the rows whose representation they
+change (see `projects/signals.py`), so an entry goes stale only when a
+row visible in its scope changes, and without any cross-process
+invalidation: a hit costs the one aggregate query, a write to another
+lecturer's project leaves this lecturer's entries valid. Stale entries
+are never read again and age out through the backend's eviction.
+
+A version can be overtaken by a slower commit while its collection has
+not settled (see `conditional`), so such entries are cached for
+`RESPONSE_CACHE_SETTLE_SECONDS` only: with write transactions shorter than
+the window, no entry is served stale for longer than it. Settled
+collections are cached for the full timeout.
+
+The backend is the `RESPONSE_CACHE_ALIAS` entry of CACHES, selected in
+settings by `RESPONSE_CACHE_BACKEND`: locmem (LRU, per process), file, or
+redis. Backend errors are logged and the response is built uncached.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from rest_framework.response import Response
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def response_cache():
+    alias = getattr(settings, 'RESPONSE_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+class ResponseCacheMixin:
+    """
+    Viewset mixin caching the data of successful `list` responses.
+
+    Needs `collection_version()` and `collection_settled()`, from
+    `ConditionalGetMixin`, and must come after it so a 304 is still
+    answered before the cache is read.
+    """
+
+    def get_cache_scope(self):
+        """
+        Requests with the same scope see the same rows; by default each
+        user is their own scope.
+        """
+        return f'user:{self.request.user.pk}'
+
+    def get_cache_key(self):
+        request = self.request
+        query = '|'.join([
+            request.get_full_path(), str(request.accepted_media_type), self.collection_version(),
+        ])
+        digest = hashlib.md5(query.encode('utf-8'), usedforsecurity=False).hexdigest()
+        return f'response:{self.basename}:{self.get_cache_scope()}:{digest}'
+
+    def get_cache_timeout(self):
+        """
+        The settle window until the collection has settled (see the module
+        docstring), else the backend's timeout.
+        """
+        return DEFAULT_TIMEOUT if self.collection_settled() else settings.RESPONSE_CACHE_SETTLE_SECONDS
+
+    def list(self, request, *args, **kwargs):
+        cache = response_cache()
+        if cache is None:
+            return super().list(request, *args, **kwargs)
+
+        key = self.get_cache_key()
+        try:
+            data = cache.get(key)
+        except Exception:
+            logger.warning("Response cache read failed", exc_info=True)
+            return super().list(request, *args, **kwargs)
+        if data is not None:
+            metrics.cache_requests.inc('response', 'hit')
+            return Response(data)
+        metrics.cache_requests.inc('response', 'miss')
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200 and isinstance(response, Response):
+            try:
+                cache.set(key, response.data, self.get_cache_timeout())
+            except Exception:
+                logger.warning("Response cache write failed", exc_info=True)
+        return response
+
+    async def alist(self, request, *args, **kwargs):
+        cache = response_cache()
+        if cache is None:
+            return await super().alist(request, *args, **kwargs)
+
+        # get_cache_key() reads the version, which the async ORM must fetch
+        await self.acollection_version()
+        key = self.get_cache_key()
+        try:
+            data = await cache.aget(key)
+        except Exception:
+            logger.warning("Response cache read failed", exc_info=True)
+            return await super().alist(request, *args, **kwargs)
+        if data is not None:
+            metrics.cache_requests.inc('response', 'hit')
+            return Response(data)
+        metrics.cache_requests.inc('response', 'miss')
+
+        response = await super().alist(request, *args, **kwargs)
+        if response.status_code == 200 and isinstance(response, Response):
+            try:
+                await cache.aset(key, response.data, self.get_cache_timeout())
+            except Exception:
+                logger.warning("Response cache write failed", exc_info=True)
+        return response
@@ -0,0 +1,181 @@
+"""
+Full-text search over model fields, kept in a side table.
+
+A `SearchIndex` stores one row per model instance, keyed by its primary
+key:
+
+- on SQLite, an FTS5 virtual table with prefix indexes, ranked by bm25;
+- on PostgreSQL, a table of `tsvector` documents with a GIN index,
+  ranked by ts_rank.
+
+Each app declares its indexes in `<app>/search.py` and keeps them current
+from model signals. The tables are created by the apps' migrations, which
+spell out their DDL. On other databases `search()` returns None and
+`SearchMixin` falls back to unranked `icontains` filtering.
+
+Query text is split into words and every word must match as a prefix, so
+"ali smi" finds "Alice Smith". Scoring costs about a microsecond per match
+on SQLite, so a query is ranked only when it has at most
+`SEARCH_RANK_LIMIT` matches, counted first on the index alone. A broader
+query, such as a first name or a two-letter prefix on 100k rows, is
+returned in primary key order instead: every match is still reachable by
+paging, but without a best-first order, which few matches sharing one
+common word would not make meaningful anyway.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from rest_framework.response import Response
+
+from .readers import FastReadMixin
+
+WORD_RE = re.compile(r'\w+')
+
+
+def query_words(text):
+    return WORD_RE.findall(text or '')
+
+
+class SearchIndex:
+    """
+    Full-text index over `fields` of `model`, stored in `table`.
+    """
+
+    def __init__(self, model, table, fields):
+        self.model = model
+        self.table = table
+        self.fields = list(fields)
+
+    @staticmethod
+    def supported(vendor=None):
+        return (vendor or connection.vendor) in ('sqlite', 'postgresql')
+
+    def _pg_document(self, placeholders=False):
+        parts = ['%s' if placeholders else f"coalesce({field}, '')" for field in self.fields]
+        return "to_tsvector('simple', {})".format(" || ' ' || ".join(parts))
+
+    # --- maintenance, called from signal handlers ---
+
+    def add(self, instances):
+        """
+        Index (or re-index) `instances`.
+        """
+        if not self.supported():
+            return
+        rows = [
+            (instance.pk, *[str(getattr(instance, field) or '') for field in self.fields])
+            for instance in instances
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                # FTS5 has no upsert; delete the old row first
+                cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [row[:1] for row in rows])
+                placeholders = ', '.join(['%s'] * (len(self.fields) + 1))
+                cursor.executemany(
+                    f"INSERT INTO {self.table} (rowid, {', '.join(self.fields)}) VALUES ({placeholders})", rows
+                )
+            else:
+                cursor.executemany(
+                    f'INSERT INTO {self.table} (id, document) VALUES (%s, {self._pg_document(placeholders=True)}) '
+                    f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+                    rows,
+                )
+
+    def remove(self, pks):
+        if not self.supported() or not pks:
+            return
+        key = 'rowid' if connection.vendor == 'sqlite' else 'id'
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE {key} = %s', [(pk,) for pk in pks])
+
+    # --- queries ---
+
+    def search(self, text, queryset=None, offset=0, limit=50):
+        """
+        Return the primary keys of the matches for `text`, best first (see
+        the module docstring), or None when the database has no full-text
+        support.
+
+        When `queryset` is filtered (e.g. scoped to the current user), only
+        its rows are ranked, so paging is not thrown off by hidden rows.
+        """
+        if not self.supported():
+            return None
+        words = query_words(text)
+        if not words:
+            return []
+
+        key = 'rowid' if connection.vendor == 'sqlite' else 'id'
+        scope, scope_params = '', ()
+        if queryset is not None and queryset.query.has_filters():
+            scope_sql, scope_params = queryset.order_by().values('pk').query.sql_with_params()
+            scope = f' AND {key} IN ({scope_sql})'
+
+        if connection.vendor == 'sqlite':
+            match = ' '.join(f'"{word}"*' for word in words)
+            matches = f'{self.table} WHERE {self.table} MATCH %s{scope}'
+            rank = 'rank, rowid'
+        else:
+            match = ' & '.join(f'{word}:*' for word in words)
+            matches = f"{self.table}, to_tsquery('simple', %s) query WHERE document @@ query{scope}"
+            rank = 'ts_rank(document, query) DESC, id'
+        params = [match, *scope_params]
+        rank_limit = settings.SEARCH_RANK_LIMIT
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM (SELECT 1 FROM {matches} LIMIT %s)', [*params, rank_limit + 1])
+            order = rank if cursor.fetchone()[0] <= rank_limit else key
+            cursor.execute(f'SELECT {key} FROM {matches} ORDER BY {order} LIMIT %s OFFSET %s', [*params, limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+
+    def fallback_filter(self, queryset, text):
+        """
+        Unranked equivalent of `search()` for databases without full-text support.
+        """
+        for word in query_words(text):
+            matches = Q()
+            for field in self.fields:
+                matches |= Q(**{f'{field}__icontains': word})
+            queryset = queryset.filter(matches)
+        return queryset
+
+
+class SearchMixin:
+    """
+    Viewset mixin adding `?q=` search to `list`.
+
+    Matches are returned best first in the usual `{next, previous, results}`
+    envelope; the cursor carries an offset into the ranked results. The
+    page is rendered by `FastReadMixin`'s read serializer when the view has
+    one, else by the regular serializer. Subclasses set `search_index` to
+    a `SearchIndex`.
+    """
+    search_index = None
+    search_param = 'q'
+
+    def list(self, request, *args, **kwargs):
+        text = request.query_params.get(self.search_param)
+        if text is None or self.search_index is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not self.search_index.supported():
+            page = self.paginate_queryset(self.search_index.fallback_filter(queryset, text))
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        paginator = self.paginator
+        offset, limit = paginator.ranked_window(request)
+        pks = self.search_index.search(text, queryset, offset, limit + 1)
+        page_pks = pks[:limit]
+        if isinstance(self, FastReadMixin) and self.reads_values():
+            reader = self.read_serializer_class
+            rows = {row[reader.pk_name()]: row for row in reader.values(queryset.filter(pk__in=page_pks))}
+            data = reader([rows[pk] for pk in page_pks if pk in rows], many=True).data
+        else:
+            objects = queryset.in_bulk(page_pks)
+            data = self.get_serializer([objects[pk] for pk in page_pks if pk in objects], many=True).data
+        return Response(paginator.ranked_envelope(offset, limit, len(pks) > limit, data))
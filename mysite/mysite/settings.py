@@ -10,10 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
 import socket
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,7 +28,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-^=6-_k)oh!n9-fpcd1qd0rf(!8y2!!8cc*so1if(!*ydv@*_dc'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# DJANGO_DEBUG=0 turns it off, e.g. for the load tests in benchmarks/.
+DEBUG = os.environ.get('DJANGO_DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = ["*"]
 
@@ -74,6 +78,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it sees every query; removes itself unless QUERY_INSPECTOR is enabled
+    'mysite.querybudget.QueryInspectorMiddleware',
+    # Profiles admin requests sent with `X-Profile: 1` and a sample of the rest
+    'mysite.profiling.ProfilingMiddleware',
+    # Request latency, DB and serializer time for /metrics
+    'mysite.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -108,13 +118,111 @@ WSGI_APPLICATION = 'mysite.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
+# DB_ENGINE selects the profile: 'sqlite' (default) or 'postgresql'.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'mysite'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            # Keep connections open across requests, but check them before
+            # reuse so a server restart does not fail the next request.
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '5')),
+            },
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+    if os.environ.get('SQLITE_TUNING', '1') == '1':
+        # See mysite/db_backends/sqlite3/base.py
+        DATABASES['default'].update({
+            'ENGINE': 'mysite.db_backends.sqlite3',
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+                    'mmap_size': 128 * 1024 * 1024,
+                    # Negative values are KiB: 64 MiB page cache per connection
+                    'cache_size': -64 * 1024,
+                    'temp_store': 'MEMORY',
+                },
+            },
+        })
+    else:
+        DATABASES['default']['ENGINE'] = 'django.db.backends.sqlite3'
+else:
+    raise ImproperlyConfigured(f"Unknown DB_ENGINE {DB_ENGINE!r}; use 'sqlite' or 'postgresql'.")
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mysite-default',
     }
 }
 
+# List responses, keyed by user scope, query and data version (mysite/response_cache.py).
+# Stale entries are never read, so a per-process locmem cache is safe; file
+# or redis share the entries between workers.
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'locmem')
+RESPONSE_CACHE_ALIAS = 'responses'
+# Lists changed more recently than this get no ETag and are cached for this
+# long only, which bounds staleness from out-of-order commits (see
+# mysite/conditional.py)
+RESPONSE_CACHE_SETTLE_SECONDS = int(os.environ.get('RESPONSE_CACHE_SETTLE_SECONDS', '10'))
+RESPONSE_CACHE_OPTIONS = {
+    'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '300')),
+    'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '1000'))},
+}
+if RESPONSE_CACHE_BACKEND == 'locmem':
+    CACHES[RESPONSE_CACHE_ALIAS] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'mysite-responses',
+        **RESPONSE_CACHE_OPTIONS,
+    }
+elif RESPONSE_CACHE_BACKEND == 'file':
+    CACHES[RESPONSE_CACHE_ALIAS] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', BASE_DIR / '.cache' / 'responses'),
+        **RESPONSE_CACHE_OPTIONS,
+    }
+elif RESPONSE_CACHE_BACKEND == 'redis':
+    # Any Redis-protocol server will do, e.g. a local redis-server or KeyDB
+    CACHES[RESPONSE_CACHE_ALIAS] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+        'TIMEOUT': RESPONSE_CACHE_OPTIONS['TIMEOUT'],
+    }
+elif RESPONSE_CACHE_BACKEND == 'off':
+    RESPONSE_CACHE_ALIAS = None
+else:
+    raise ImproperlyConfigured(
+        f"Unknown RESPONSE_CACHE_BACKEND {RESPONSE_CACHE_BACKEND!r}; use 'locmem', 'file', 'redis' or 'off'."
+    )
+
+# Dashboard stats are cached until a Student/Advisor/FinalProject write
+# invalidates them; the timeout is only a safety net.
+DASHBOARD_STATS_TIMEOUT = 60 * 60
+# Serve the previous stats while a background thread recomputes them after a write.
+DASHBOARD_STATS_BACKGROUND_REBUILD = os.environ.get('DASHBOARD_STATS_BACKGROUND_REBUILD', '') == '1'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -160,21 +268,99 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'mysite.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'mysite.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'mysite.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.environ.get('API_PAGE_SIZE', '50')),
+}
+# 'auto' renders and parses JSON with orjson when it is installed; 'stdlib' forces DRF's json module
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+# Upper bound for the `?page_size=` query parameter on list endpoints
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', '500'))
+# `?q=` queries with more matches than this come back unranked (see mysite/search.py)
+SEARCH_RANK_LIMIT = int(os.environ.get('SEARCH_RANK_LIMIT', '2000'))
+
+# Access tokens carry role claims (see users/tokens.py) and are trusted
+# without a database lookup on reads, so keep them short-lived.
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', '5'))),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    'TOKEN_OBTAIN_SERIALIZER': 'users.tokens.RoleTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.tokens.RoleTokenRefreshSerializer',
+    'TOKEN_USER_CLASS': 'users.tokens.RoleTokenUser',
+}
+# Cache alias holding revoked token ids; use a shared cache when running several processes
+JWT_DENYLIST_CACHE = 'default'
+
+# --- Query inspection ---
+# See mysite.querybudget.DEFAULTS. The test runner enables it with
+# ENFORCE_BUDGETS, so the views' `query_budgets` are checked by every test.
+QUERY_INSPECTOR = {
+    'ENABLED': os.environ.get('QUERY_INSPECTOR', '') == '1',
+    'REPEAT_THRESHOLD': int(os.environ.get('QUERY_INSPECTOR_REPEAT_THRESHOLD', '5')),
+}
+TEST_RUNNER = 'mysite.testing.QueryBudgetTestRunner'
+
+# --- Async reads ---
+# Serve list/retrieve and the dashboard on the event loop under ASGI; see
+# mysite/asyncviews.py. mysite/asgi.py turns it on; WSGI keeps sync views.
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', '') == '1'
+
+# --- Metrics ---
+# /metrics serves mysite.metrics in the Prometheus text format to scrapers
+# sending `Authorization: Bearer <METRICS_TOKEN>`. Left empty, /metrics is
+# a 404 outside DEBUG.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# --- Request profiling ---
+# See mysite.profiling.DEFAULTS. Traces are kept under DIRECTORY and
+# listed at /api/dashboard/profiles/.
+PROFILING = {
+    'SAMPLE_RATE': float(os.environ.get('PROFILING_SAMPLE_RATE', '0')),
+    'DIRECTORY': os.environ.get('PROFILING_DIRECTORY', BASE_DIR / '.profiles'),
+    'MAX_TRACES': int(os.environ.get('PROFILING_MAX_TRACES', '50')),
+}
+
+# --- API Request Logging ---
+# See mysite.middleware.DEFAULTS for the available keys.
+API_LOGGING = {
+    'SAMPLE_RATE': float(os.environ.get('API_LOGGING_SAMPLE_RATE', '1.0')),
+    'MAX_BODY_BYTES': 4096,
+    'INCLUDE_PATHS': ['/api/'],
+    'EXCLUDE_PATHS': ['/api/token/', '/api/register/', '/api/password/'],
+    'REDACT_KEYS': ['password', 'token', 'refresh', 'access'],
 }
 
 # --- Logging Configuration ---
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'mysite.log_handlers.JSONFormatter',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
         },
+        # Queue-backed: API records are formatted and written on a background thread
+        'api': {
+            'class': 'mysite.log_handlers.BackgroundQueueHandler',
+            'formatter': 'json',
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -191,6 +377,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'mysite.middleware': {
+            'handlers': ['api'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 # --- End Logging Configuration ---
@@ -0,0 +1,197 @@
+"""
+Sparse fieldsets: `?fields=` and `?expand=` on list and detail routes.
+
+- `?fields=id,title,advisor` returns only those fields and loads only
+  those columns (`QuerySet.only()`).
+- Relations are returned as primary keys unless named in `?expand=`,
+  e.g. `?fields=id,advisor&expand=advisor`.
+- Dotted paths select fields of an expanded relation and imply the
+  expansion: `?fields=id,students.first_name,students.last_name`.
+
+Without either parameter the response is exactly what the serializer
+returns by default, including its `default_expand` relations.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+from . import metrics
+
+
+def split_param(value):
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class FieldSelection:
+    """
+    Fields and expansions requested for one serializer level.
+
+    `fields` is None for "every field"; `expand` is None for "the
+    serializer's default expansions".
+    """
+
+    def __init__(self, fields=None, expand=None, nested=None):
+        self.fields = fields
+        self.expand = expand
+        self.nested = nested or {}
+
+    @classmethod
+    def parse(cls, fields=None, expand=None):
+        """
+        Build a selection from lists of dotted paths (or None).
+        """
+        nested_fields, nested_expand = defaultdict(list), defaultdict(list)
+        top = None if fields is None else set()
+        for path in fields or ():
+            name, _, rest = path.partition('.')
+            top.add(name)
+            if rest:
+                nested_fields[name].append(rest)
+
+        # Choosing fields turns the default expansions off
+        expanded = None if fields is None and expand is None else set(nested_fields)
+        for path in expand or ():
+            name, _, rest = path.partition('.')
+            expanded.add(name)
+            if rest:
+                nested_expand[name].append(rest)
+
+        nested = {
+            name: cls.parse(nested_fields.get(name), nested_expand.get(name))
+            for name in set(nested_fields) | set(nested_expand)
+        }
+        return cls(top, expanded, nested)
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return self.expand is not None and name in self.expand
+
+    def child(self, name):
+        return self.nested.get(name, ALL_FIELDS)
+
+    def columns(self, model):
+        """
+        The selected names that are columns of `model`, for `only()`.
+        """
+        columns = []
+        for name in self.fields or ():
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.append(name)
+        return columns
+
+
+ALL_FIELDS = FieldSelection()
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Serializer mixin honouring a `FieldSelection`, passed as the
+    `selection` argument or in the context under 'selection'.
+
+    `expandable_fields` maps relation names to the serializer used when
+    they are expanded; `default_expand` lists those expanded when the
+    client does not choose.
+    """
+    expandable_fields = {}
+    default_expand = ()
+
+    def __init__(self, *args, selection=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selection = selection or self.context.get('selection') or ALL_FIELDS
+
+        if self.selection.fields is not None:
+            unknown = self.selection.fields - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError({'fields': [f"Unknown field '{name}'." for name in sorted(unknown)]})
+            for name in set(self.fields) - self.selection.fields:
+                self.fields.pop(name)
+
+        if self.selection.expand is None:
+            self.expanded = set(self.default_expand)
+        else:
+            unknown = self.selection.expand - set(self.expandable_fields)
+            if unknown:
+                raise serializers.ValidationError({'expand': [f"Cannot expand '{name}'." for name in sorted(unknown)]})
+            self.expanded = self.selection.expand
+
+    def to_representation(self, instance):
+        return metrics.serialize(self.represent, instance)
+
+    def represent(self, instance):
+        representation = super().to_representation(instance)
+        for name in self.expanded:
+            if name not in representation:
+                continue
+            value = getattr(instance, name)
+            if value is None:
+                continue
+            many = hasattr(value, 'all')
+            serializer_class = self.expandable_fields[name]
+            representation[name] = serializer_class(
+                value.all() if many else value, many=many, selection=self.selection.child(name),
+            ).data
+        return representation
+
+
+class SparseFieldsMixin:
+    """
+    Viewset mixin reading `?fields=`/`?expand=` on `sparse_actions` and
+    narrowing the queryset's columns to match.
+
+    Viewsets that embed relations call `prefetch_selected()` from
+    `get_queryset()` so only the requested relations are loaded.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def get_field_selection(self):
+        if not hasattr(self, '_field_selection'):
+            params = self.request.query_params
+            if self.action in self.sparse_actions and ('fields' in params or 'expand' in params):
+                self._field_selection = FieldSelection.parse(
+                    split_param(params.get('fields')), split_param(params.get('expand')),
+                )
+            else:
+                self._field_selection = ALL_FIELDS
+        return self._field_selection
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['selection'] = self.get_field_selection()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        selection = self.get_field_selection()
+        if selection.fields is not None:
+            queryset = queryset.only(*selection.columns(queryset.model))
+        return queryset
+
+    def prefetch_selected(self, queryset, relations):
+        """
+        Prefetch the `relations` the selection includes: expanded ones with
+        the selected columns, the rest as primary keys only. Unexpanded
+        foreign keys need nothing beyond their own column.
+        """
+        selection = self.get_field_selection()
+        lookups = []
+        for name in relations:
+            if not selection.includes(name):
+                continue
+            field = queryset.model._meta.get_field(name)
+            related = field.related_model._default_manager.all()
+            if selection.expands(name):
+                columns = selection.child(name).columns(field.related_model)
+                lookups.append(Prefetch(name, queryset=related.only(*columns) if columns else related))
+            elif field.many_to_many or field.one_to_many:
+                lookups.append(Prefetch(name, queryset=related.only('pk')))
+        return queryset.prefetch_related(*lookups)
@@ -0,0 +1,25 @@
+"""
+Test runner checking the views' query budgets on every request the tests make.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner with the query inspector enabled and `query_budgets`
+    enforced, so a request over its view's budget fails the test with
+    the statements it repeated and where they came from.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.query_inspector = override_settings(QUERY_INSPECTOR={
+            **settings.QUERY_INSPECTOR, 'ENABLED': True, 'ENFORCE_BUDGETS': True,
+        })
+        self.query_inspector.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.query_inspector.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,605 @@
+import datetime
+import decimal
+import io
+import logging
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+from django.urls import include, path
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from . import profiling
+from .asyncviews import AsyncReadRouter, async_reads, dispatch
+from .db_backends.sqlite3.base import DatabaseWrapper
+from .fastjson import FastJSONParser, FastJSONRenderer
+from .log_handlers import BackgroundQueueHandler
+from .metrics import Counter, Histogram, MetricsMiddleware, Registry, registry
+from .middleware import APILoggingMiddleware
+from .querybudget import QueryBudgetExceeded, QueryInspectorMiddleware, query_stats, statement_shape
+from advisors.models import Advisor
+from advisors.views import AdvisorViewSet
+from dashboard.views import DashboardStatsView
+from projects.models import FinalProject
+from projects.views import FinalProjectViewSet
+from students.models import Student
+from students.views import StudentViewSet
+from users.models import UserProfile
+from users.tokens import RoleTokenObtainPairSerializer
+
+
+class APILoggingMiddlewareTests(SimpleTestCase):
+    """
+    Tests for sampling, path filtering and body capping in APILoggingMiddleware.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_middleware(self, request, response):
+        return APILoggingMiddleware(lambda request: response)(request)
+
+    def test_logs_capped_bodies_without_parsing(self):
+        request = self.factory.post('/api/projects/', {'title': 'x'}, content_type='application/json')
+        with self.assertLogs('mysite.middleware', 'INFO') as logs:
+            self.run_middleware(request, JsonResponse({'id': 1}))
+        api = logs.records[0].api
+        self.assertEqual(api['request_body'], '{"title": "x"}')
+        self.assertEqual(api['response_body'], '{"id": 1}')
+        self.assertEqual(api['response_status'], 200)
+
+    @override_settings(API_LOGGING={'MAX_BODY_BYTES': 10})
+    def test_large_bodies_are_not_read(self):
+        request = self.factory.get('/api/projects/')
+        with self.assertLogs('mysite.middleware', 'INFO') as logs:
+            self.run_middleware(request, JsonResponse({'items': list(range(100))}))
+        self.assertRegex(logs.records[0].api['response_body'], r'^<\d+ bytes omitted>$')
+
+    def test_streaming_response_is_not_consumed(self):
+        chunks = iter([b'a', b'b'])
+        response = StreamingHttpResponse(chunks, content_type='text/csv')
+        with self.assertLogs('mysite.middleware', 'INFO') as logs:
+            self.run_middleware(self.factory.get('/api/students/export/'), response)
+        self.assertEqual(logs.records[0].api['response_body'], '<streaming>')
+        self.assertEqual(b''.join(response.streaming_content), b'ab')
+
+    @override_settings(API_LOGGING={'EXCLUDE_PATHS': ['/api/token/']})
+    def test_path_filters(self):
+        logger = logging.getLogger('mysite.middleware')
+        with self.assertNoLogs(logger, 'INFO'):
+            self.run_middleware(self.factory.get('/admin/'), HttpResponse())
+            self.run_middleware(self.factory.post('/api/token/'), HttpResponse())
+
+    def test_token_requests_are_not_logged(self):
+        request = self.factory.post('/api/token/', {'username': 'lecturer', 'password': 'password123'}, content_type='application/json')
+        with self.assertNoLogs('mysite.middleware', 'INFO'):
+            self.run_middleware(request, JsonResponse({'refresh': 'r.r.r', 'access': 'a.a.a'}))
+
+    @override_settings(API_LOGGING={'EXCLUDE_PATHS': []})
+    def test_credentials_are_redacted(self):
+        request = self.factory.post('/api/token/', {'username': 'lecturer', 'password': 'pass\\"word123'}, content_type='application/json')
+        with self.assertLogs('mysite.middleware', 'INFO') as logs:
+            self.run_middleware(request, JsonResponse({'refresh': 'r.r.r', 'access': 'a.a.a'}))
+        api = logs.records[0].api
+        self.assertEqual(api['request_body'], '{"username": "lecturer", "password": "<redacted>"}')
+        self.assertEqual(api['response_body'], '{"refresh": "<redacted>", "access": "<redacted>"}')
+
+    @override_settings(API_LOGGING={'SAMPLE_RATE': 0})
+    def test_sampling(self):
+        with self.assertNoLogs('mysite.middleware', 'INFO'):
+            self.run_middleware(self.factory.get('/api/projects/'), HttpResponse())
+
+
+class BackgroundQueueHandlerTests(SimpleTestCase):
+
+    def test_full_queue_drops_records(self):
+        handler = BackgroundQueueHandler(maxsize=1)
+        handler.listener.stop()  # nothing drains the queue
+        record = logging.makeLogRecord({'msg': 'x'})
+        handler.handle(record)
+        handler.handle(record)
+        self.assertEqual(handler.dropped, 1)
+
+
+class TunedSQLiteBackendTests(SimpleTestCase):
+    """
+    Tests for the PRAGMAs and transaction mode of the tuned SQLite backend.
+    """
+
+    def wrapper(self, path, **options):
+        settings_dict = {**connection.settings_dict, 'NAME': str(path), 'OPTIONS': options}
+        return DatabaseWrapper(settings_dict, alias='tuned-test')
+
+    def test_pragmas_apply_to_each_connection(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db = self.wrapper(
+                Path(directory) / 'tuned.sqlite3',
+                pragmas={'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 1234},
+            )
+            try:
+                with db.cursor() as cursor:
+                    self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+                    self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)
+                    self.assertEqual(cursor.execute('PRAGMA busy_timeout').fetchone()[0], 1234)
+            finally:
+                db.close()
+
+    def test_backend_options_are_not_passed_to_connect(self):
+        db = self.wrapper(':memory:', pragmas={'synchronous': 'NORMAL'}, transaction_mode='immediate')
+        params = db.get_connection_params()
+        self.assertNotIn('pragmas', params)
+        self.assertNotIn('transaction_mode', params)
+        self.assertEqual(db.transaction_mode, 'IMMEDIATE')
+
+    def test_transactions_begin_with_transaction_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db = self.wrapper(Path(directory) / 'tuned.sqlite3', transaction_mode='IMMEDIATE')
+            db.force_debug_cursor = True
+            try:
+                db.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+                db.rollback()
+                self.assertEqual(db.queries_log[0]['sql'], 'BEGIN IMMEDIATE')
+            finally:
+                db.close()
+
+    def test_rejects_unknown_transaction_mode(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.wrapper(':memory:', transaction_mode='LAZY')
+
+
+class FastJSONTests(SimpleTestCase):
+    """
+    The orjson-backed renderer and parser must behave exactly like DRF's.
+    """
+    payload = ReturnDict({
+        'gpa': '3.50',
+        'raw_decimal': decimal.Decimal('3.50'),
+        'date_of_birth': datetime.date(2001, 2, 3),
+        'updated': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        'naive': datetime.datetime(2024, 5, 1, 12, 30),
+        'time': datetime.time(9, 5, 1, 500000),
+        'status': 'studying',
+        'name': 'ສົມພອນ',
+        'separators': 'a\u2028b\u2029c',
+        'token': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Staff'),
+        'ids': (1, 2, 3),
+        1: None,
+        'nested': [{'ok': True, 'ratio': 0.25}],
+    }, serializer=None)
+
+    def test_renders_same_bytes(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_indent_and_oversized_ints_fall_back(self):
+        self.assertEqual(
+            FastJSONRenderer().render(self.payload, 'application/json; indent=4'),
+            JSONRenderer().render(self.payload, 'application/json; indent=4'),
+        )
+        self.assertEqual(FastJSONRenderer().render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    @override_settings(JSON_BACKEND='stdlib')
+    def test_stdlib_backend(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_parses_like_drf(self):
+        body = '{"name": "ສົມ", "gpa": 3.5, "ids": [1, 2], "id": 9223372036854775807, "none": null}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_parse_errors_match(self):
+        for body in (b'{"gpa": NaN}', b'{"broken": ', b''):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as fast:
+                    FastJSONParser().parse(io.BytesIO(body))
+                with self.assertRaises(ParseError) as stdlib:
+                    JSONParser().parse(io.BytesIO(body))
+                self.assertEqual(str(fast.exception), str(stdlib.exception))
+
+
+class QueryInspectorTests(APITestCase):
+    """
+    Tests for N+1 reporting, histograms and budgets in QueryInspectorMiddleware.
+    The test runner enables it with ENFORCE_BUDGETS.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        self.advisors = [Advisor.objects.create(email=f'a{n}@test.com', first_name='A', last_name=str(n)) for n in range(6)]
+
+    def test_statement_shape_ignores_literals_and_list_lengths(self):
+        self.assertEqual(
+            statement_shape('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "name" = \'x\' LIMIT 21'),
+            statement_shape('SELECT * FROM "t" WHERE "id" IN (%s) AND "name" = \'yy\' LIMIT 1'),
+        )
+
+    def test_repeated_statements_are_reported_with_their_origin(self):
+        def n_plus_one(request):
+            for advisor in self.advisors:
+                Advisor.objects.get(pk=advisor.pk)
+            return HttpResponse()
+
+        with self.assertLogs('mysite.querybudget', 'WARNING') as logs:
+            response = QueryInspectorMiddleware(n_plus_one)(RequestFactory().get('/api/advisors/'))
+        self.assertEqual(response['X-Query-Count'], '6')
+        [group] = logs.records[0].queries
+        self.assertEqual(group['count'], 6)
+        self.assertIn('FROM "advisors_advisor"', group['sql'])
+        self.assertEqual(len(group['origins']), 1)
+        self.assertTrue(group['origins'][0].startswith('mysite/tests.py:'))
+        self.assertTrue(group['origins'][0].endswith(' in n_plus_one'))
+
+    def test_views_over_budget_fail(self):
+        with mock.patch.object(AdvisorViewSet, 'query_budgets', {'list': 1}):
+            with self.assertRaisesMessage(QueryBudgetExceeded, 'ran over its budget of 1 queries'), \
+                    self.assertLogs('django.request', 'ERROR'):
+                self.client.get('/api/advisors/')
+
+    def test_histograms_per_view(self):
+        before = query_stats().get('advisor-list', {}).get('queries', {}).get('count', 0)
+        response = self.client.get('/api/advisors/')
+        count = int(response['X-Query-Count'])
+        histogram = query_stats()['advisor-list']['queries']
+        self.assertEqual(histogram['count'], before + 1)
+        self.assertEqual(histogram['buckets']['+Inf'], histogram['count'])
+
+        response = self.client.get('/api/dashboard/queries/')
+        self.assertTrue(response.data['enabled'])
+        self.assertGreaterEqual(response.data['views']['advisor-list']['queries']['sum'], count)
+
+    @override_settings(QUERY_INSPECTOR={'ENABLED': False})
+    def test_disabled_inspector_leaves_the_chain(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInspectorMiddleware(lambda request: HttpResponse())
+
+
+class MetricsTests(APITestCase):
+    """
+    Tests for the /metrics registry, its exposition and the recorded series.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        Advisor.objects.create(email='a@test.com', first_name='A', last_name='B')
+
+    def sample(self, text, line_start):
+        """
+        The value of the exposition line starting with `line_start`, or 0.
+        """
+        for line in text.splitlines():
+            if line.startswith(line_start + ' '):
+                return float(line.rsplit(' ', 1)[1])
+        return 0
+
+    def test_exposition_format(self):
+        local = Registry()
+        hits = Counter(local, 'hits_total', 'Hits.', ['path'])
+        latency = Histogram(local, 'latency_seconds', 'Latency.', ['path'], buckets=(0.1, 1))
+        hits.inc('/a"b', amount=2)
+        for value in (0.05, 0.5, 5):
+            latency.observe(value, '/a')
+        self.assertEqual(local.exposition(), '\n'.join([
+            '# HELP hits_total Hits.',
+            '# TYPE hits_total counter',
+            'hits_total{path="/a\\"b"} 2',
+            '# HELP latency_seconds Latency.',
+            '# TYPE latency_seconds histogram',
+            'latency_seconds_bucket{path="/a",le="0.1"} 1',
+            'latency_seconds_bucket{path="/a",le="1"} 2',
+            'latency_seconds_bucket{path="/a",le="+Inf"} 3',
+            'latency_seconds_sum{path="/a"} 5.55',
+            'latency_seconds_count{path="/a"} 3',
+        ]) + '\n')
+
+    def test_thread_shards_are_merged(self):
+        local = Registry()
+        hits = Counter(local, 'hits_total', 'Hits.')
+        threads = [threading.Thread(target=lambda: [hits.inc() for _ in range(100)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        hits.inc()
+        self.assertIn('hits_total 401\n', local.exposition())
+        # Finished threads are folded into one retired total
+        self.assertEqual(len(local.shards), 1)
+        self.assertIn('hits_total 401\n', local.exposition())
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_requests_are_recorded_by_route(self):
+        before = registry.exposition()
+        self.client.get('/api/advisors/')
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer scrape-secret')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        for line_start in [
+            'http_request_duration_seconds_count{route="api/advisors/",method="GET",status="200"}',
+            'serializer_duration_seconds_count{view="advisor",action="list"}',
+        ]:
+            with self.subTest(line_start):
+                self.assertEqual(self.sample(text, line_start), self.sample(before, line_start) + 1)
+        queries = 'db_queries_total{route="api/advisors/"}'
+        self.assertGreater(self.sample(text, queries), self.sample(before, queries))
+
+    def test_response_cache_hits_are_counted(self):
+        caches['responses'].clear()
+        hit = 'cache_requests_total{cache="response",result="hit"}'
+        miss = 'cache_requests_total{cache="response",result="miss"}'
+        before = registry.exposition()
+        self.client.get('/api/projects/')
+        self.client.get('/api/projects/')
+        text = registry.exposition()
+        self.assertEqual(self.sample(text, miss), self.sample(before, miss) + 1)
+        self.assertEqual(self.sample(text, hit), self.sample(before, hit) + 1)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_protects_the_endpoint(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_endpoint_is_hidden_without_a_token(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class ProfilingTests(APITestCase):
+    """
+    Tests for header-triggered and sampled profiles, their ring buffer and
+    the admin-only listing.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        config = override_settings(PROFILING={'DIRECTORY': self.directory.name, 'MAX_TRACES': 2})
+        config.enable()
+        self.addCleanup(config.disable)
+        self.admin = self.create_user('admin')
+        self.staff = self.create_user('staff')
+        Advisor.objects.create(email='a@test.com', first_name='A', last_name='B')
+
+    def create_user(self, role):
+        user = User.objects.create_user(username=role, password='password123')
+        UserProfile.objects.create(user=user, role=role)
+        return user
+
+    def authenticate(self, user):
+        token = RoleTokenObtainPairSerializer.get_token(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_admins_trigger_profiles_with_the_header(self):
+        self.authenticate(self.admin)
+        response = self.client.get('/api/advisors/', HTTP_X_PROFILE='1')
+        trace_id = response['X-Profile-Id']
+
+        [trace] = self.client.get('/api/dashboard/profiles/').data
+        self.assertEqual(trace['id'], trace_id)
+        self.assertEqual((trace['path'], trace['status'], trace['trigger']), ('/api/advisors/', 200, 'header'))
+        self.assertEqual(trace['user_id'], str(self.admin.pk))
+
+        report = self.client.get(f'/api/dashboard/profiles/{trace_id}/').data['report']
+        self.assertIn('Ordered by: cumulative time', report)
+        self.assertIn('viewsets.py', report)
+        report = self.client.get(f'/api/dashboard/profiles/{trace_id}/?sort=tottime').data['report']
+        self.assertIn('Ordered by: internal time', report)
+        download = self.client.get(f'/api/dashboard/profiles/{trace_id}/?download=1')
+        self.assertEqual(download['Content-Disposition'], f'attachment; filename="{trace_id}.prof"')
+
+    def test_busy_or_failing_profiler_serves_the_request(self):
+        self.authenticate(self.admin)
+        with profiling.PROFILER_LOCK:
+            response = self.client.get('/api/advisors/', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+
+        with mock.patch('cProfile.Profile.enable', side_effect=ValueError('Another profiling tool is already active')):
+            response = self.client.get('/api/advisors/', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertFalse(profiling.PROFILER_LOCK.locked())
+
+        with mock.patch.object(profiling, 'save_trace', side_effect=ValueError):
+            response = self.client.get('/api/advisors/', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+
+    def test_header_is_ignored_for_other_users(self):
+        self.authenticate(self.staff)
+        response = self.client.get('/api/advisors/', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(self.client.get('/api/dashboard/profiles/').status_code, 403)
+
+    def test_sampled_profiles_are_a_ring_buffer(self):
+        self.authenticate(self.staff)
+        with override_settings(PROFILING={'DIRECTORY': self.directory.name, 'MAX_TRACES': 2, 'SAMPLE_RATE': 1}):
+            trace_ids = [self.client.get('/api/advisors/')['X-Profile-Id'] for _ in range(3)]
+            self.assertNotIn('X-Profile-Id', self.client.get('/metrics'))
+
+        self.authenticate(self.admin)
+        listed = [trace['id'] for trace in self.client.get('/api/dashboard/profiles/').data]
+        self.assertEqual(listed, trace_ids[:0:-1])
+        self.assertEqual(len(list(Path(self.directory.name).iterdir())), 4)
+        self.assertEqual(self.client.get(f'/api/dashboard/profiles/{trace_ids[0]}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/dashboard/profiles/..%2F..%2Fsettings/').status_code, 404)
+
+
+class AsyncMiddlewareTests(SimpleTestCase):
+    """
+    The project middleware run natively under ASGI.
+    """
+    databases = {'default'}
+
+    def test_api_logging(self):
+        async def view(request):
+            return JsonResponse({'id': 1})
+
+        middleware = APILoggingMiddleware(view)
+        with self.assertLogs('mysite.middleware', 'INFO') as logs:
+            response = async_to_sync(middleware)(AsyncRequestFactory().get('/api/projects/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(logs.records[0].api['response_body'], '{"id": 1}')
+
+    def test_metrics_count_queries_of_the_async_orm(self):
+        async def view(request):
+            # Runs in a worker thread, out of reach of connection.execute_wrapper()
+            await Advisor.objects.acount()
+            return HttpResponse()
+
+        line = 'db_queries_total{route="<unresolved>"}'
+        before = registry.exposition()
+        async_to_sync(MetricsMiddleware(view))(AsyncRequestFactory().get('/api/advisors/'))
+        self.assertEqual(
+            MetricsTests.sample(None, registry.exposition(), line), MetricsTests.sample(None, before, line) + 1,
+        )
+
+
+class AsyncReadViewTests(APITestCase):
+    """
+    Tests for the async list/retrieve/dashboard paths served under ASGI.
+    Their responses must match the synchronous views byte for byte.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with override_settings(ASYNC_READ_VIEWS=True):
+            router = AsyncReadRouter()
+            router.register('projects', FinalProjectViewSet, basename='project')
+            router.register('advisors', AdvisorViewSet, basename='advisor')
+            router.register('students', StudentViewSet, basename='student')
+            cls.urlconf = type('AsyncURLConf', (), {'urlpatterns': [
+                path('api/', include(router.urls)),
+                path('api/dashboard/', async_reads(DashboardStatsView.as_view())),
+            ]})
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.staff = self.create_user('staff')
+        self.admin = self.create_user('admin')
+        advisors = [
+            Advisor.objects.create(email=f'a{n}@test.com', first_name='A', last_name=str(n), leading_quota=5)
+            for n in range(3)
+        ]
+        students = [
+            Student.objects.create(
+                student_id=f's{n}', email=f's{n}@test.com', first_name='S', last_name=str(n),
+                major='CS', year_enrolled=2020, gpa='3.50',
+            )
+            for n in range(3)
+        ]
+        self.project = FinalProject.objects.create(title='Async', advisor=advisors[0])
+        self.project.students.set(students[:2])
+        self.project.committee_members.set(advisors[1:])
+        FinalProject.objects.create(title='Solo', advisor=advisors[1])
+        self.advisor = advisors[0]
+
+    def create_user(self, role):
+        user = User.objects.create_user(username=role, password='password123')
+        UserProfile.objects.create(user=user, role=role)
+        return user
+
+    def token(self, user):
+        return f'Bearer {RoleTokenObtainPairSerializer.get_token(user).access_token}'
+
+    def both(self, path, user, **headers):
+        """
+        Return the (sync, async) responses to GET `path` and how many
+        requests took the async path.
+        """
+        if 'Authorization' not in headers:
+            headers['Authorization'] = self.token(user)
+        caches['responses'].clear()
+        sync = self.client.get(path, headers=headers)
+        caches['responses'].clear()
+        with mock.patch('mysite.asyncviews.dispatch', side_effect=dispatch) as spy, \
+                self.settings(ROOT_URLCONF=self.urlconf):
+            response = async_to_sync(self.async_client.get)(path, headers=headers)
+        return sync, response, spy.await_count
+
+    def test_reads_match_the_sync_views(self):
+        paths = [
+            '/api/projects/', f'/api/projects/{self.project.pk}/', '/api/projects/?page_size=1',
+            '/api/advisors/', f'/api/advisors/{self.advisor.pk}/', '/api/students/',
+            '/api/projects/999999/',
+        ]
+        for path_ in paths:
+            with self.subTest(path_):
+                sync, response, async_requests = self.both(path_, self.staff)
+                self.assertEqual(async_requests, 1)
+                self.assertEqual(response.status_code, sync.status_code)
+                self.assertEqual(response.content, sync.content)
+                self.assertEqual(response.get('ETag'), sync.get('ETag'))
+
+    def test_next_page(self):
+        first = self.client.get('/api/projects/?page_size=1', HTTP_AUTHORIZATION=self.token(self.staff))
+        sync, response, async_requests = self.both(first.data['next'], self.staff)
+        self.assertEqual(async_requests, 1)
+        self.assertEqual(response.content, sync.content)
+        self.assertEqual(response.json()['results'][0]['title'], 'Solo')
+
+    @override_settings(RESPONSE_CACHE_SETTLE_SECONDS=0)
+    def test_revalidation(self):
+        sync, response, _ = self.both('/api/projects/', self.staff)
+        _, response, async_requests = self.both('/api/projects/', self.staff, **{'If-None-Match': sync['ETag']})
+        self.assertEqual(async_requests, 1)
+        self.assertEqual(response.status_code, 304)
+
+    def test_dashboard(self):
+        sync, response, async_requests = self.both('/api/dashboard/', self.admin)
+        self.assertEqual(async_requests, 1)
+        self.assertEqual(response.content, sync.content)
+        _, response, _ = self.both('/api/dashboard/', self.staff)
+        self.assertEqual(response.status_code, 200)
+        _, response, _ = self.both('/api/dashboard/', self.create_user('student'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_other_requests_run_the_sync_view(self):
+        for path_, headers in [
+            ('/api/projects/?fields=id,title', {}),
+            (f'/api/students/{Student.objects.first().pk}/', {}),
+            # Without role claims authentication loads the user row
+            ('/api/projects/', {'Authorization': f'Bearer {RefreshToken.for_user(self.staff).access_token}'}),
+        ]:
+            with self.subTest(path_):
+                sync, response, async_requests = self.both(path_, self.staff, **headers)
+                self.assertEqual(async_requests, 0)
+                self.assertEqual(response.content, sync.content)
+
+        with self.settings(ROOT_URLCONF=self.urlconf):
+            response = async_to_sync(self.async_client.post)(
+                '/api/projects/', {'title': 'Posted', 'description': 'Posted', 'students': []},
+                content_type='application/json',
+                headers={'Authorization': self.token(self.staff)},
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_unauthenticated(self):
+        sync, response, async_requests = self.both('/api/projects/', None, Authorization='')
+        self.assertEqual(async_requests, 1)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.content, sync.content)
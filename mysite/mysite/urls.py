@@ -27,6 +27,7 @@ from django.views.generic.base import RedirectView
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from mysite.metrics import metrics_view
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -68,4 +69,7 @@ urlpatterns = [
     path('api/', include('advisors.urls')),
     path('api/', include('projects.urls')),
     path('api/', include('dashboard.urls')), # For dashboard stats
+
+    # Prometheus scrape endpoint
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -0,0 +1,167 @@
+"""
+Set-based bulk assignment of advisors and committees to projects.
+
+A whole batch of (project, advisor, committee) assignments is validated
+against in-memory quota tallies and written with a fixed number of
+statements, independent of the batch size: one CASE update for the
+advisor FKs, one DELETE and one bulk INSERT for the committee through
+table, one CASE update for the advisors' load counters and one update of
+the projects' `updated_at` stamps. Everything runs in one transaction and
+nothing is written if any assignment fails.
+
+These writes bypass model signals, so `projects_assigned` is sent for
+the caches that would otherwise listen to post_save/m2m_changed.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from advisors.models import Advisor
+from advisors.quotas import advisor_loads
+from .models import FinalProject
+from .signals import projects_assigned, projects_embedding, shifted
+
+CommitteeMembership = FinalProject.committee_members.through
+
+
+class AssignmentError(Exception):
+    """
+    Raised with per-assignment error details when a batch is rejected.
+    """
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _case(values, field='pk'):
+    return Case(
+        *[When(**{field: key}, then=Value(value)) for key, value in values.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+@transaction.atomic
+def bulk_assign(assignments):
+    """
+    Apply `assignments`, a list of dicts with a `project` id and optionally
+    `advisor` (id or None) and `committee_members` (list of ids, replacing
+    the current committee). Keys left out are not changed.
+
+    Returns the number of projects updated; raises AssignmentError with
+    [{'index': i, 'errors': {...}}] if any assignment is invalid.
+    """
+    errors = {}
+
+    def add_error(index, field, message):
+        errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+    project_ids = [assignment['project'] for assignment in assignments]
+    for index, count in enumerate(Counter(project_ids)[pk] for pk in project_ids):
+        if count > 1:
+            add_error(index, 'project', 'Project appears more than once in this batch.')
+
+    projects = FinalProject.objects.select_for_update().only('pk', 'advisor_id').in_bulk(project_ids)
+    committees = {pk: {} for pk in projects}
+    for row_id, project_id, advisor_id in CommitteeMembership.objects.filter(
+        finalproject_id__in=projects
+    ).values_list('pk', 'finalproject_id', 'advisor_id'):
+        committees[project_id][advisor_id] = row_id
+
+    # Every advisor whose load may change, including those being replaced
+    advisor_ids = set()
+    for assignment in assignments:
+        if assignment.get('advisor') is not None:
+            advisor_ids.add(assignment['advisor'])
+        advisor_ids.update(assignment.get('committee_members') or [])
+    for project in projects.values():
+        if project.advisor_id is not None:
+            advisor_ids.add(project.advisor_id)
+    for members in committees.values():
+        advisor_ids.update(members)
+    advisors = advisor_loads(advisor_ids, lock=True)
+
+    # --- Work out the changes and tally the loads in memory ---
+    leading_delta, committee_delta = Counter(), Counter()
+    leading_added_by, committee_added_by = {}, {}
+    new_advisors, rows_to_delete, rows_to_create = {}, [], []
+
+    for index, assignment in enumerate(assignments):
+        project = projects.get(assignment['project'])
+        if project is None:
+            add_error(index, 'project', f"Project {assignment['project']} does not exist.")
+            continue
+
+        if 'advisor' in assignment and assignment['advisor'] != project.advisor_id:
+            advisor_id = assignment['advisor']
+            if advisor_id is not None and advisor_id not in advisors:
+                add_error(index, 'advisor', f'Advisor {advisor_id} does not exist.')
+            else:
+                new_advisors[project.pk] = advisor_id
+                if project.advisor_id is not None:
+                    leading_delta[project.advisor_id] -= 1
+                if advisor_id is not None:
+                    leading_delta[advisor_id] += 1
+                    leading_added_by.setdefault(advisor_id, []).append(index)
+
+        if 'committee_members' in assignment:
+            wanted = set(assignment['committee_members'])
+            current = committees[project.pk]
+            unknown = sorted(wanted - set(advisors))
+            if unknown:
+                add_error(index, 'committee_members', f'Advisors {unknown} do not exist.')
+                continue
+            for advisor_id in set(current) - wanted:
+                rows_to_delete.append(current[advisor_id])
+                committee_delta[advisor_id] -= 1
+            for advisor_id in sorted(wanted - set(current)):
+                rows_to_create.append(CommitteeMembership(finalproject_id=project.pk, advisor_id=advisor_id))
+                committee_delta[advisor_id] += 1
+                committee_added_by.setdefault(advisor_id, []).append(index)
+
+    for advisor_id, indexes in leading_added_by.items():
+        advisor = advisors[advisor_id]
+        total = advisor.leading_count + leading_delta[advisor_id]
+        if leading_delta[advisor_id] > 0 and total > advisor.leading_quota:
+            for index in indexes:
+                add_error(index, 'advisor', f'Advisor {advisor} would lead {total} projects, over their limit of {advisor.leading_quota}.')
+    for advisor_id, indexes in committee_added_by.items():
+        advisor = advisors[advisor_id]
+        total = advisor.committee_count + committee_delta[advisor_id]
+        if committee_delta[advisor_id] > 0 and total > advisor.committee_quota:
+            for index in indexes:
+                add_error(index, 'committee_members', f'Advisor {advisor} would sit on {total} committees, over their limit of {advisor.committee_quota}.')
+
+    if errors:
+        raise AssignmentError([{'index': index, 'errors': errors[index]} for index in sorted(errors)])
+
+    # --- Write everything set-based ---
+    if new_advisors:
+        FinalProject.objects.filter(pk__in=new_advisors).update(advisor_id=Case(
+            *[When(pk=pk, then=Value(advisor_id)) for pk, advisor_id in new_advisors.items()],
+            output_field=IntegerField(),
+        ))
+    if rows_to_delete:
+        CommitteeMembership.objects.filter(pk__in=rows_to_delete).delete()
+    if rows_to_create:
+        CommitteeMembership.objects.bulk_create(rows_to_create, batch_size=1000)
+
+    leading_delta = {pk: delta for pk, delta in leading_delta.items() if delta}
+    committee_delta = {pk: delta for pk, delta in committee_delta.items() if delta}
+    changed = set(leading_delta) | set(committee_delta)
+    now = timezone.now()
+    if changed:
+        Advisor.objects.filter(pk__in=changed).update(
+            leading_count=shifted('leading_count', _case(leading_delta)),
+            committee_count=shifted('committee_count', _case(committee_delta)),
+            updated_at=now,
+        )
+    # The batch, and every other project embedding an advisor whose load changed
+    FinalProject.objects.filter(
+        Q(pk__in=list(projects)) | Q(pk__in=projects_embedding(Advisor.objects.filter(pk__in=changed)).values('pk'))
+    ).update(updated_at=now)
+
+    projects_assigned.send(sender=FinalProject, project_ids=list(projects), advisor_ids=sorted(changed))
+    return len(projects)
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.13 on 2026-10-18 20:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisors', '0002_advisor_load_counters'),
+        ('projects', '0001_initial'),
+        ('students', '0002_student_status_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='finalproject',
+            index=models.Index(fields=['status'], name='project_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='finalproject',
+            index=models.Index(fields=['advisor', 'status'], name='project_advisor_status_idx'),
+        ),
+        # The composite index above leads with advisor_id, so the FK's own index is redundant
+        migrations.AlterField(
+            model_name='finalproject',
+            name='advisor',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leading_projects', to='advisors.advisor'),
+        ),
+        # Auto-created M2M tables cannot declare Meta.indexes. These cover the
+        # reverse lookups "projects of advisor/student X" used by visible_to()
+        # and the committee load counts without touching the table rows.
+        migrations.RunSQL(
+            'CREATE INDEX project_committee_advisor_idx '
+            'ON projects_finalproject_committee_members (advisor_id, finalproject_id)',
+            'DROP INDEX project_committee_advisor_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX project_students_student_idx '
+            'ON projects_finalproject_students (student_id, finalproject_id)',
+            'DROP INDEX project_students_student_idx',
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# The search index DDL as of this migration, spelled out so later changes
+# to projects/search.py do not alter it
+TABLE = 'projects_finalproject_fts'
+COLUMNS = 'title, description'
+PG_DOCUMENT = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {TABLE} USING fts5("
+            f"{COLUMNS}, prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f'INSERT INTO {TABLE} (rowid, {COLUMNS}) SELECT id, {COLUMNS} FROM projects_finalproject')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'CREATE TABLE {TABLE} (id bigint PRIMARY KEY, document tsvector NOT NULL)')
+        schema_editor.execute(f'CREATE INDEX {TABLE}_document_idx ON {TABLE} USING GIN (document)')
+        schema_editor.execute(f'INSERT INTO {TABLE} (id, document) SELECT id, {PG_DOCUMENT} FROM projects_finalproject')
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -2,10 +2,51 @@ from django.db import models
 from students.models import Student
 from advisors.models import Advisor
 
+class FinalProjectQuerySet(models.QuerySet):
+    def visible_to(self, context):
+        """
+        Restrict the queryset to the projects visible to `context`, a
+        `users.roles.RoleContext`.
+
+        - Admin/Staff see all projects.
+        - Students see projects they are assigned to.
+        - Lecturers see projects they are advising or are a committee member of.
+
+        Every role the user holds is folded into a single WHERE clause over
+        the M2M join tables, so the result stays an ordinary queryset that
+        can be filtered, ordered, paginated and used by `get_object()`.
+        """
+        if context.is_admin_or_staff:
+            return self
+
+        visible = models.Q()
+        if context.student_id is not None:
+            visible |= models.Q(pk__in=FinalProject.students.through.objects.filter(
+                student_id=context.student_id
+            ).values('finalproject_id'))
+
+        if context.advisor_id is not None:
+            visible |= models.Q(advisor_id=context.advisor_id)
+            visible |= models.Q(pk__in=FinalProject.committee_members.through.objects.filter(
+                advisor_id=context.advisor_id
+            ).values('finalproject_id'))
+
+        if not visible:
+            return self.none()
+        return self.filter(visible)
+
+    def with_related(self):
+        """
+        Eager-load everything FinalProjectSerializer embeds, so listing N
+        projects costs a fixed number of queries instead of 3N.
+        """
+        return self.select_related('advisor').prefetch_related('students', 'committee_members')
+
 class FinalProject(models.Model):
     title = models.CharField(max_length=255)
     students = models.ManyToManyField(Student, related_name='projects')
-    advisor = models.ForeignKey(Advisor, on_delete=models.SET_NULL, null=True, related_name='leading_projects')
+    # Indexed by project_advisor_status_idx, whose leading column is advisor_id
+    advisor = models.ForeignKey(Advisor, on_delete=models.SET_NULL, null=True, related_name='leading_projects', db_index=False)
     committee_members = models.ManyToManyField(Advisor, related_name='committee_projects', blank=True)
     description = models.TextField()
     submission_date = models.DateField(null=True, blank=True)
@@ -16,6 +57,18 @@ class FinalProject(models.Model):
         ('pending_review', 'ລໍຖ້າກວດສອບ'),
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
+    # Version stamp for ETags. The API embeds students and advisors, so
+    # changes to them and to the M2M links bump it too (see signals.py).
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = FinalProjectQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status'], name='project_status_idx'),
+            # Advisor scoping and leading-load counts, optionally by status
+            models.Index(fields=['advisor', 'status'], name='project_advisor_status_idx'),
+        ]
 
     # You might want to add a FileField for document uploads later
     # documentation = models.FileField(upload_to='project_documents/', null=True, blank=True)
@@ -0,0 +1,21 @@
+"""
+Full-text index over project titles and descriptions, kept current from
+model signals. `bulk_assign` only moves advisors, so it needs no hook.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from mysite.search import SearchIndex
+from .models import FinalProject
+
+project_index = SearchIndex(FinalProject, 'projects_finalproject_fts', ['title', 'description'])
+
+
+@receiver(post_save, sender=FinalProject)
+def index_project(sender, instance, **kwargs):
+    project_index.add([instance])
+
+
+@receiver(post_delete, sender=FinalProject)
+def unindex_project(sender, instance, **kwargs):
+    project_index.remove([instance.pk])
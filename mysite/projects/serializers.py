@@ -1,9 +1,13 @@
+from django.db import transaction
 from rest_framework import serializers
 from .models import FinalProject, Student, Advisor
-from students.serializers import StudentSerializer
-from advisors.serializers import AdvisorSerializer
+from students.serializers import StudentReadSerializer, StudentSerializer
+from advisors.serializers import AdvisorReadSerializer, AdvisorSerializer
+from advisors.quotas import quota_errors
+from mysite.readers import ValuesSerializer
+from mysite.sparse import SparseFieldsSerializerMixin
 
-class FinalProjectSerializer(serializers.ModelSerializer):
+class FinalProjectSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     # Use PrimaryKeyRelatedField for writing, allowing assignment by ID.
     students = serializers.PrimaryKeyRelatedField(
         many=True, 
@@ -11,7 +15,8 @@ class FinalProjectSerializer(serializers.ModelSerializer):
     )
     advisor = serializers.PrimaryKeyRelatedField(
         queryset=Advisor.objects.all(),
-        allow_null=True # Allow projects to be created without an advisor initially
+        allow_null=True, # Allow projects to be created without an advisor initially
+        required=False
     )
     committee_members = serializers.PrimaryKeyRelatedField(
         many=True,
@@ -19,52 +24,92 @@ class FinalProjectSerializer(serializers.ModelSerializer):
         required=False # Committee members are optional
     )
 
+    # Written as ids, read as nested objects unless `?fields=`/`?expand=` say otherwise.
+    # The nested lookups read from the prefetch cache when the instance comes
+    # from `FinalProject.objects.with_related()`, so callers serializing many
+    # projects should always load them through it.
+    expandable_fields = {
+        'students': StudentSerializer,
+        'advisor': AdvisorSerializer,
+        'committee_members': AdvisorSerializer,
+    }
+    default_expand = ('students', 'advisor', 'committee_members')
+
     class Meta:
         model = FinalProject
         fields = [
             'id', 'title', 'description', 'submission_date', 
-            'status', 'students', 'advisor', 'committee_members'
+            'status', 'students', 'advisor', 'committee_members', 'updated_at'
         ]
 
-    def validate(self, data):
+    def new_assignments(self, data):
         """
-        Check advisor and committee member quotas.
+        Return (leading, committee): the advisors whose leading or committee
+        load would grow if `data` were saved over `self.instance`.
         """
-        # --- 1. Check Advisor Leading Quota ---
+        leading = []
         advisor = data.get('advisor')
-        if advisor:
-            is_new_assignment = not (self.instance and self.instance.advisor == advisor)
-            if is_new_assignment:
-                current_projects_count = FinalProject.objects.filter(advisor=advisor).count()
-                if current_projects_count >= advisor.leading_quota:
-                    raise serializers.ValidationError({
-                        'advisor': f'Advisor {advisor} has reached their leading project limit of {advisor.leading_quota}.'
-                    })
+        if advisor and not (self.instance and self.instance.advisor_id == advisor.pk):
+            leading.append(advisor)
 
-        # --- 2. Check Committee Member Quotas ---
-        committee = data.get('committee_members')
-        if committee:
-            for member in committee:
-                # Only check quota if the member is being newly added to the committee
-                is_new_member = not (self.instance and member in self.instance.committee_members.all())
-                if is_new_member:
-                    committee_count = FinalProject.objects.filter(committee_members=member).count()
-                    if committee_count >= member.committee_quota:
-                        raise serializers.ValidationError({
-                            'committee_members': f'Advisor {member} has reached their committee limit of {member.committee_quota}.'
-                        })
-        
-        return data
+        committee = []
+        members = data.get('committee_members')
+        if members:
+            # Reads the prefetch cache when the instance came from `with_related()`
+            current = {member.pk for member in self.instance.committee_members.all()} if self.instance else set()
+            committee = [member for member in members if member.pk not in current]
 
-    def to_representation(self, instance):
+        return leading, committee
+
+    def validate(self, data):
         """
-        Customize the output representation to show nested objects for reading.
+        Check advisor and committee member quotas.
+
+        All affected advisors are read in a single query. The check is
+        repeated under row locks in `create`/`update`, since another request
+        may take the last seat between validation and saving.
         """
-        representation = super().to_representation(instance)
-        # For reading, we want to show the full student and advisor objects
-        representation['students'] = StudentSerializer(instance.students.all(), many=True).data
-        if instance.advisor:
-            representation['advisor'] = AdvisorSerializer(instance.advisor).data
-        if instance.committee_members:
-            representation['committee_members'] = AdvisorSerializer(instance.committee_members.all(), many=True).data
-        return representation
+        errors = quota_errors(*self.new_assignments(data))
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
+    def enforce_quotas(self, validated_data):
+        errors = quota_errors(*self.new_assignments(validated_data), lock=True)
+        if errors:
+            raise serializers.ValidationError(errors)
+
+    @transaction.atomic
+    def create(self, validated_data):
+        self.enforce_quotas(validated_data)
+        return super().create(validated_data)
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        self.enforce_quotas(validated_data)
+        return super().update(instance, validated_data)
+
+class FinalProjectReadSerializer(ValuesSerializer):
+    """
+    FinalProjectSerializer's default output, nested objects included, built
+    from `.values()` rows: the advisor is joined into the main query and
+    students and committee members cost one query each per page.
+    """
+    serializer_class = FinalProjectSerializer
+    nested = {
+        'students': StudentReadSerializer,
+        'advisor': AdvisorReadSerializer,
+        'committee_members': AdvisorReadSerializer,
+    }
+
+class ProjectAssignmentSerializer(serializers.Serializer):
+    project = serializers.IntegerField()
+    advisor = serializers.IntegerField(allow_null=True, required=False)
+    committee_members = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+class BulkAssignmentSerializer(serializers.Serializer):
+    """
+    Input for the bulk assignment endpoint. Ids are resolved in bulk by
+    `assignment.bulk_assign`, not one related-field lookup per row.
+    """
+    assignments = ProjectAssignmentSerializer(many=True, allow_empty=False, max_length=5000)
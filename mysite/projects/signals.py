@@ -0,0 +1,162 @@
+"""
+Keep `Advisor.leading_count` and `Advisor.committee_count` in step with
+FinalProject writes.
+
+Every adjustment is a relative `F()` update, so concurrent writers never
+overwrite each other's increments. Bulk operations that bypass model
+signals (`QuerySet.update()`, raw through-table writes) must adjust the
+counters themselves; `manage.py recount_advisor_loads` repairs any drift.
+
+The same handlers keep the `updated_at` version stamps honest: projects
+embed their students and advisors (load counters included), so any
+change to those, or to the M2M links, also bumps the projects showing
+them. Deletes and M2M changes run in a transaction, so the bumps done by
+the pre_* handlers commit together with the change itself.
+"""
+from django.db.models import F, Q, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from advisors.models import Advisor
+from students.models import Student
+from .models import FinalProject
+
+CommitteeMembership = FinalProject.committee_members.through
+StudentMembership = FinalProject.students.through
+
+# Sent at the end of `assignment.bulk_assign`, inside its transaction, whose
+# set-based writes send no post_save/m2m_changed.
+# Arguments: project_ids, advisor_ids (advisors whose load changed).
+projects_assigned = Signal()
+
+
+def projects_embedding(advisors):
+    """
+    The projects led or sat on by any advisor in `advisors`, a queryset.
+    """
+    advisor_ids = advisors.values('pk')
+    return FinalProject.objects.filter(
+        Q(advisor_id__in=advisor_ids)
+        | Q(pk__in=CommitteeMembership.objects.filter(advisor_id__in=advisor_ids).values('finalproject_id'))
+    )
+
+
+def update_advisors(advisors, **changes):
+    """
+    Apply `changes` to the `advisors` queryset, bumping the version stamp
+    of the advisors and of every project embedding them.
+    """
+    now = timezone.now()
+    projects_embedding(advisors).update(updated_at=now)
+    advisors.update(updated_at=now, **changes)
+
+
+def shifted(counter, delta):
+    """
+    `counter + delta` for an update, floored at 0. The counters may have
+    drifted low (see recount_advisor_loads), and the column's CHECK
+    constraint would then fail the write that decrements them.
+    """
+    return Greatest(F(counter) + delta, Value(0))
+
+
+def adjust_leading(advisor_id, delta):
+    if advisor_id is not None:
+        update_advisors(Advisor.objects.filter(pk=advisor_id), leading_count=shifted('leading_count', delta))
+
+
+@receiver(post_init, sender=FinalProject)
+def remember_advisor(sender, instance, **kwargs):
+    # Reading a deferred advisor_id (`?fields=` loads rows with only())
+    # would refetch it, once per row
+    if instance.pk and 'advisor_id' not in instance.get_deferred_fields():
+        instance._saved_advisor_id = instance.advisor_id
+    else:
+        instance._saved_advisor_id = None
+
+
+@receiver(post_save, sender=FinalProject)
+def update_leading_count(sender, instance, created, **kwargs):
+    if 'advisor_id' in instance.get_deferred_fields():
+        # Saving a partially loaded row leaves the advisor untouched
+        return
+    previous = instance._saved_advisor_id
+    if instance.advisor_id != previous:
+        adjust_leading(previous, -1)
+        adjust_leading(instance.advisor_id, +1)
+    instance._saved_advisor_id = instance.advisor_id
+
+
+@receiver(pre_delete, sender=FinalProject)
+def release_committee_seats(sender, instance, **kwargs):
+    # The through rows are removed by a cascade that sends no m2m_changed,
+    # so release the seats while the rows still exist.
+    update_advisors(Advisor.objects.filter(
+        pk__in=CommitteeMembership.objects.filter(finalproject=instance).values('advisor_id')
+    ), committee_count=shifted('committee_count', -1))
+
+
+@receiver(post_delete, sender=FinalProject)
+def release_leading_seat(sender, instance, **kwargs):
+    adjust_leading(instance._saved_advisor_id, -1)
+
+
+@receiver(m2m_changed, sender=CommitteeMembership)
+def update_committee_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        # Django only reports the rows it actually inserted
+        if reverse:
+            update_advisors(Advisor.objects.filter(pk=instance.pk), committee_count=shifted('committee_count', len(pk_set)))
+        else:
+            update_advisors(Advisor.objects.filter(pk__in=pk_set), committee_count=shifted('committee_count', 1))
+
+    elif action in ('pre_remove', 'pre_clear'):
+        # pk_set may name rows that don't exist, so count what is really removed
+        if reverse:
+            removed = CommitteeMembership.objects.filter(advisor=instance)
+            if pk_set is not None:
+                removed = removed.filter(finalproject__in=pk_set)
+            update_advisors(Advisor.objects.filter(pk=instance.pk), committee_count=shifted('committee_count', -removed.count()))
+        else:
+            removed = CommitteeMembership.objects.filter(finalproject=instance)
+            if pk_set is not None:
+                removed = removed.filter(advisor__in=pk_set)
+            update_advisors(Advisor.objects.filter(
+                pk__in=removed.values('advisor_id')
+            ), committee_count=shifted('committee_count', -1))
+
+
+@receiver(m2m_changed, sender=StudentMembership)
+@receiver(m2m_changed, sender=CommitteeMembership)
+def touch_linked_projects(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('pre_add', 'pre_remove', 'pre_clear'):
+        return
+    if not reverse:
+        projects = FinalProject.objects.filter(pk=instance.pk)
+    elif pk_set is not None:
+        projects = FinalProject.objects.filter(pk__in=pk_set)
+    else:
+        # Reverse clear(): the links are still there to say which projects
+        column = 'student' if sender is StudentMembership else 'advisor'
+        projects = FinalProject.objects.filter(
+            pk__in=sender.objects.filter(**{column: instance}).values('finalproject_id')
+        )
+    projects.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Student)
+@receiver(pre_delete, sender=Student)
+def touch_student_projects(sender, instance, **kwargs):
+    if not kwargs.get('created'):
+        FinalProject.objects.filter(
+            pk__in=StudentMembership.objects.filter(student=instance).values('finalproject_id')
+        ).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Advisor)
+@receiver(pre_delete, sender=Advisor)
+def touch_advisor_projects(sender, instance, **kwargs):
+    if not kwargs.get('created'):
+        projects_embedding(Advisor.objects.filter(pk=instance.pk)).update(updated_at=timezone.now())
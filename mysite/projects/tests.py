@@ -1,11 +1,30 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
+
 from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 from advisors.models import Advisor
+from advisors.quotas import actual_loads
+from advisors.serializers import AdvisorReadSerializer, AdvisorSerializer
+from students.serializers import StudentReadSerializer, StudentSerializer
+from .serializers import FinalProjectReadSerializer, FinalProjectSerializer
 from students.models import Student
 from .models import FinalProject
 from users.models import UserProfile
+from users.roles import RoleContext, build_role_context
 
 class ProjectAPITests(APITestCase):
     """
@@ -98,3 +117,626 @@ class ProjectAPITests(APITestCase):
         response = self.client.post('/api/projects/', project_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(FinalProject.objects.count(), 2)
+
+    def test_update_keeps_existing_committee_member_over_quota(self):
+        """
+        Re-submitting a project with its current committee does not count
+        existing members against their quota.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        url = f'/api/projects/{self.existing_project.id}/'
+        data = {
+            'title': 'Renamed', 'description': '...', 'advisor': self.advisor.id,
+            'students': [self.student_profile.id], 'committee_members': [self.advisor.id]
+        }
+        response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.existing_project.refresh_from_db()
+        self.assertEqual(self.existing_project.title, 'Renamed')
+
+
+class ProjectListQueryCountTests(APITestCase):
+    """
+    Regression tests for the N+1 queries on the project list endpoint.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        self.project_count = 0
+
+    def create_projects(self, count):
+        for _ in range(count):
+            i = self.project_count = self.project_count + 1
+            student = Student.objects.create(student_id=f's{i}', email=f's{i}@test.com', first_name='S', last_name=str(i), major='CS', year_enrolled=2020)
+            advisor = Advisor.objects.create(email=f'a{i}@test.com', first_name='A', last_name=str(i), leading_quota=5, committee_quota=5)
+            member = Advisor.objects.create(email=f'c{i}@test.com', first_name='C', last_name=str(i), leading_quota=5, committee_quota=5)
+            project = FinalProject.objects.create(title=f'P{i}', description='...', advisor=advisor)
+            project.students.add(student)
+            project.committee_members.add(member)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        """
+        Listing projects must not issue extra queries per project.
+        """
+        self.create_projects(1)
+        baseline = self.count_list_queries()
+        self.create_projects(10)
+        self.assertEqual(self.count_list_queries(), baseline)
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        """
+        Keyset pagination walks every project once, with the same query count per page.
+        """
+        self.create_projects(5)
+        url, seen, counts = '/api/projects/?page_size=2', [], []
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            counts.append(len(ctx.captured_queries))
+            seen.extend(project['id'] for project in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, sorted(FinalProject.objects.values_list('id', flat=True)))
+        self.assertEqual(len(set(counts)), 1)
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        self.create_projects(4)
+        response = self.client.get('/api/projects/?page_size=100')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_list_embeds_related_objects(self):
+        """
+        The eager-loaded list still renders the nested students, advisor and committee.
+        """
+        self.create_projects(2)
+        response = self.client.get('/api/projects/')
+        project = response.data['results'][0]
+        self.assertEqual(project['students'][0]['student_id'], 's1')
+        self.assertEqual(project['advisor']['email'], 'a1@test.com')
+        self.assertEqual(project['committee_members'][0]['email'], 'c1@test.com')
+
+
+class ProjectVisibilityTests(APITestCase):
+    """
+    Tests for role-scoped project visibility on list and detail routes.
+    """
+
+    def setUp(self):
+        # A lecturer who is also enrolled as a student
+        self.user = User.objects.create_user(username='dual', password='password123')
+        UserProfile.objects.create(user=self.user, role='lecturer')
+        self.student = Student.objects.create(user=self.user, student_id='s1', email='s1@test.com', first_name='S', last_name='1', major='CS', year_enrolled=2020)
+        self.advisor = Advisor.objects.create(user=self.user, email='a1@test.com', first_name='A', last_name='1', leading_quota=5, committee_quota=5)
+        other_advisor = Advisor.objects.create(email='a2@test.com', first_name='A', last_name='2', leading_quota=5, committee_quota=5)
+
+        self.as_student = FinalProject.objects.create(title='As student', description='...', advisor=other_advisor)
+        self.as_student.students.add(self.student)
+        self.as_advisor = FinalProject.objects.create(title='As advisor', description='...', advisor=self.advisor)
+        self.as_committee = FinalProject.objects.create(title='As committee', description='...', advisor=other_advisor)
+        self.as_committee.committee_members.add(self.advisor)
+        self.unrelated = FinalProject.objects.create(title='Unrelated', description='...', advisor=other_advisor)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_list_combines_all_roles(self):
+        """
+        A user holding several roles sees the projects from each of them, once.
+        """
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCountEqual(
+            [project['id'] for project in response.data['results']],
+            [self.as_student.id, self.as_advisor.id, self.as_committee.id]
+        )
+
+    def test_visibility_is_a_single_plain_query(self):
+        """
+        The scoped queryset is one SELECT without UNION, so it stays filterable.
+        """
+        queryset = FinalProject.objects.visible_to(build_role_context(self.user))
+        self.assertNotIn('UNION', str(queryset.query))
+        self.assertTrue(queryset.filter(pk=self.as_committee.pk).exists())
+
+    def test_retrieve_visible_and_hidden_projects(self):
+        """
+        Detail routes go through the same scoping: visible projects load, others 404.
+        """
+        response = self.client.get(f'/api/projects/{self.as_committee.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(f'/api/projects/{self.unrelated.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_user_without_roles_sees_nothing(self):
+        """
+        A user with no student or advisor profile gets an empty list.
+        """
+        nobody = User.objects.create_user(username='nobody', password='password123')
+        UserProfile.objects.create(user=nobody, role='student')
+        self.assertFalse(FinalProject.objects.visible_to(build_role_context(nobody)).exists())
+
+
+class ProjectSearchTests(APITestCase):
+    """
+    Tests for `?q=` full-text search over projects.
+    """
+    setUp = ProjectVisibilityTests.setUp
+
+    def test_search_respects_visibility(self):
+        response = self.client.get('/api/projects/', {'q': 'as'})
+        self.assertEqual(
+            {project['id'] for project in response.data['results']},
+            {self.as_student.pk, self.as_advisor.pk, self.as_committee.pk},
+        )
+        response = self.client.get('/api/projects/', {'q': 'unrel'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_best_match_first(self):
+        self.as_advisor.description = 'Reports to the committee every month'
+        self.as_advisor.save()
+        response = self.client.get('/api/projects/', {'q': 'committee'})
+        self.assertEqual([project['id'] for project in response.data['results']], [self.as_committee.pk, self.as_advisor.pk])
+
+
+class SparseFieldsTests(APITestCase):
+    """
+    Tests for `?fields=` and `?expand=` on the project routes.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.advisor = Advisor.objects.create(email='a1@test.com', first_name='A', last_name='1', phone_number='555', leading_quota=5, committee_quota=5)
+        self.student = Student.objects.create(student_id='s1', email='s1@test.com', first_name='S', last_name='1', major='CS', year_enrolled=2020, address='Somewhere')
+        self.project = FinalProject.objects.create(title='P1', description='Long text', advisor=self.advisor)
+        self.project.students.add(self.student)
+        self.project.committee_members.add(self.advisor)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+
+    def get(self, **params):
+        response = self.client.get('/api/projects/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response.data['results'][0]
+
+    def test_default_response_is_unchanged(self):
+        project = self.get()
+        self.assertEqual(project['advisor']['phone_number'], '555')
+        self.assertEqual(project['students'][0]['address'], 'Somewhere')
+        self.assertEqual(project['committee_members'][0]['id'], self.advisor.pk)
+
+    def test_fields_return_ids_and_load_only_selected_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            project = self.get(fields='id,title,advisor,students')
+        self.assertEqual(project, {'id': self.project.pk, 'title': 'P1', 'students': [self.student.pk], 'advisor': self.advisor.pk})
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('FROM "advisors_advisor"', sql)
+        self.assertNotIn('"address"', sql)
+
+    def test_fields_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as one:
+            self.get(fields='id,title')
+        FinalProject.objects.bulk_create([FinalProject(title=f'P{n}', description='', advisor=self.advisor) for n in range(12)])
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get('/api/projects/', {'fields': 'id,title'})
+        self.assertEqual(len(response.data['results']), 13)
+        self.assertEqual(len(many.captured_queries), len(one.captured_queries))
+
+    def test_dotted_fields_expand_with_selected_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            project = self.get(fields='id,students.first_name,advisor.last_name')
+        self.assertEqual(project, {
+            'id': self.project.pk,
+            'students': [{'first_name': 'S'}],
+            'advisor': {'last_name': '1'},
+        })
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('"address"', sql)
+        self.assertNotIn('"phone_number"', sql)
+        self.assertNotIn('committee_members', sql)
+
+    def test_expand_without_fields(self):
+        project = self.get(expand='advisor')
+        self.assertEqual(project['advisor']['email'], 'a1@test.com')
+        self.assertEqual(project['students'], [self.student.pk])
+        self.assertEqual(project['committee_members'], [self.advisor.pk])
+        self.assertEqual(project['description'], 'Long text')
+
+    def test_detail_route(self):
+        response = self.client.get(f'/api/projects/{self.project.pk}/', {'fields': 'id,status'})
+        self.assertEqual(response.data, {'id': self.project.pk, 'status': 'in_progress'})
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get('/api/projects/', {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+        response = self.client.get('/api/projects/', {'expand': 'title'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', response.data)
+
+
+class ReadSerializerTests(APITestCase):
+    """
+    The `.values()` read serializers render exactly what the DRF serializers do.
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(username='owner', password='password123')
+        self.students = [
+            Student.objects.create(user=user, student_id='s1', email='s1@test.com', first_name='S', last_name='1', major='CS', year_enrolled=2020, gpa='3.5', date_of_birth='2001-02-03', address='Somewhere'),
+            Student.objects.create(student_id='s2', email='s2@test.com', first_name='ສົມ', last_name='2', major='CS', year_enrolled=2021),
+        ]
+        self.advisors = [
+            Advisor.objects.create(email=f'a{i}@test.com', first_name='A', last_name=str(i), leading_quota=5, committee_quota=5)
+            for i in range(3)
+        ]
+        project = FinalProject.objects.create(title='P1', description='...', advisor=self.advisors[0], submission_date='2024-05-01')
+        project.students.set(self.students)
+        project.committee_members.set(self.advisors[1:])
+        FinalProject.objects.create(title='Unassigned', description='...')
+
+    def assertSameOutput(self, read_serializer, serializer, queryset):
+        rows = read_serializer.values(queryset.order_by('pk'))
+        expected = JSONRenderer().render(serializer(queryset.order_by('pk'), many=True).data)
+        self.assertEqual(JSONRenderer().render(read_serializer(rows, many=True).data), expected)
+
+    def test_output_is_identical(self):
+        self.assertSameOutput(StudentReadSerializer, StudentSerializer, Student.objects.all())
+        self.assertSameOutput(AdvisorReadSerializer, AdvisorSerializer, Advisor.objects.all())
+        self.assertSameOutput(FinalProjectReadSerializer, FinalProjectSerializer, FinalProject.objects.with_related())
+
+    def test_search_output_is_identical(self):
+        staff = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=staff, role='staff')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(staff).access_token}')
+        response = self.client.get('/api/projects/', {'q': 'p1'})
+        expected = FinalProjectSerializer(FinalProject.objects.with_related().filter(title='P1'), many=True).data
+        self.assertEqual(len(expected), 1)
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+
+    def test_nested_relations_cost_one_query_each(self):
+        rows = list(FinalProjectReadSerializer.values(FinalProject.objects.all()))
+        with self.assertNumQueries(2):
+            FinalProjectReadSerializer(rows, many=True).data
+
+
+class ProjectExportTests(APITestCase):
+    """
+    Tests for the streaming project export.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.lecturer = User.objects.create_user(username='lecturer', password='password123')
+        UserProfile.objects.create(user=self.lecturer, role='lecturer')
+        self.advisor = Advisor.objects.create(user=self.lecturer, email='a1@test.com', first_name='A', last_name='1', leading_quota=5, committee_quota=5)
+        self.student = Student.objects.create(student_id='s1', email='s1@test.com', first_name='S', last_name='1', major='CS', year_enrolled=2020)
+
+        self.own = FinalProject.objects.create(title='Own', description='...', advisor=self.advisor)
+        self.own.students.add(self.student)
+        self.own.committee_members.add(self.advisor)
+        self.other = FinalProject.objects.create(title='Other', description='...')
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+
+    def test_csv_export(self):
+        self.authenticate(self.staff_user)
+        response = self.client.get('/api/projects/export/?format=csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,title,description,submission_date,status,advisor,students,committee_members')
+        self.assertEqual(lines[1], f'{self.own.id},Own,...,,in_progress,{self.advisor.id},{self.student.id},{self.advisor.id}')
+        self.assertEqual(len(lines), 3)
+
+    def test_ndjson_export_respects_scoping(self):
+        self.authenticate(self.lecturer)
+        response = self.client.get('/api/projects/export.ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.own.id])
+        self.assertEqual(rows[0]['students'][0]['student_id'], 's1')
+        self.assertEqual(rows[0]['committee_members'][0]['email'], 'a1@test.com')
+
+    def test_export_query_count_is_per_chunk(self):
+        """
+        Prefetching runs per chunk, not per project.
+        """
+        self.authenticate(self.staff_user)
+        for i in range(10):
+            project = FinalProject.objects.create(title=f'P{i}', description='...', advisor=self.advisor)
+            project.students.add(self.student)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/projects/export/?format=ndjson')
+            b''.join(response.streaming_content)
+        self.assertLess(len(ctx.captured_queries), 10)
+
+
+class BulkAssignmentTests(APITestCase):
+    """
+    Tests for the all-or-nothing bulk assignment endpoint.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        self.advisors = [
+            Advisor.objects.create(email=f'a{i}@test.com', first_name='A', last_name=str(i), leading_quota=2, committee_quota=2)
+            for i in range(3)
+        ]
+        self.projects = [FinalProject.objects.create(title=f'P{i}', description='...') for i in range(3)]
+
+    def assign(self, assignments):
+        return self.client.post('/api/projects/bulk-assign/', {'assignments': assignments}, format='json')
+
+    def loads(self):
+        return [(a.leading_count, a.committee_count) for a in Advisor.objects.order_by('pk')]
+
+    def test_bulk_assign_writes_everything(self):
+        a0, a1, a2 = (advisor.pk for advisor in self.advisors)
+        p0, p1, p2 = (project.pk for project in self.projects)
+        response = self.assign([
+            {'project': p0, 'advisor': a0, 'committee_members': [a1, a2]},
+            {'project': p1, 'advisor': a0, 'committee_members': [a1]},
+            {'project': p2, 'advisor': a1},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual(self.loads(), [(2, 0), (1, 2), (0, 1)])
+        self.assertCountEqual(self.projects[0].committee_members.values_list('pk', flat=True), [a1, a2])
+
+        # Replacing a committee removes the old rows and frees the seats
+        response = self.assign([{'project': p0, 'committee_members': [a0]}])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(self.projects[0].committee_members.values_list('pk', flat=True)), [a0])
+        self.assertEqual(self.loads(), [(2, 1), (1, 1), (0, 0)])
+
+        out = StringIO()
+        call_command('recount_advisor_loads', '--check', stdout=out)
+        self.assertIn('in sync', out.getvalue())
+
+    def test_quota_is_checked_against_the_whole_batch(self):
+        """
+        Each assignment fits alone, but together they exceed the advisor's quota.
+        """
+        a0 = self.advisors[0].pk
+        response = self.assign([{'project': project.pk, 'advisor': a0} for project in self.projects])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 1, 2])
+        self.assertIn('over their limit of 2', response.data['errors'][0]['errors']['advisor'][0])
+        self.assertFalse(FinalProject.objects.filter(advisor__isnull=False).exists())
+        self.assertEqual(self.loads(), [(0, 0)] * 3)
+
+    def test_unknown_ids_reject_the_batch(self):
+        response = self.assign([
+            {'project': self.projects[0].pk, 'advisor': self.advisors[0].pk},
+            {'project': 999, 'advisor': self.advisors[0].pk},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertFalse(FinalProject.objects.filter(advisor__isnull=False).exists())
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        extra = [FinalProject.objects.create(title=f'X{i}', description='...') for i in range(6)]
+        with CaptureQueriesContext(connection) as small:
+            self.assign([{'project': self.projects[0].pk, 'advisor': self.advisors[0].pk, 'committee_members': [self.advisors[1].pk]}])
+        for advisor in self.advisors:
+            Advisor.objects.filter(pk=advisor.pk).update(leading_quota=10, committee_quota=10)
+        with CaptureQueriesContext(connection) as large:
+            response = self.assign([
+                {'project': project.pk, 'advisor': self.advisors[i % 3].pk, 'committee_members': [self.advisors[(i + 1) % 3].pk]}
+                for i, project in enumerate(extra)
+            ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_bulk_assign_denied_for_students(self):
+        student_user = User.objects.create_user(username='student', password='password123')
+        UserProfile.objects.create(user=student_user, role='student')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(student_user).access_token}')
+        response = self.assign([{'project': self.projects[0].pk, 'advisor': self.advisors[0].pk}])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(RESPONSE_CACHE_SETTLE_SECONDS=0)
+class ConditionalGetTests(APITestCase):
+    """
+    ETags on the project routes, and the version stamps behind them.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        self.advisor = Advisor.objects.create(email='a@test.com', first_name='A', last_name='A', leading_quota=5, committee_quota=5)
+        self.student = Student.objects.create(student_id='s1', email='s1@test.com', first_name='S', last_name='One', major='CS', year_enrolled=2020)
+        self.project = FinalProject.objects.create(title='P1', description='...', advisor=self.advisor)
+        self.project.students.add(self.student)
+        self.other = FinalProject.objects.create(title='P2', description='...')
+
+    def assertChanges(self, url, change):
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_modified_skips_the_serializer(self):
+        for url in ['/api/projects/', f'/api/projects/{self.project.pk}/']:
+            etag = self.client.get(url)['ETag']
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response['ETag'], etag)
+            self.assertFalse(response.content)
+            project_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "projects_finalproject' in q['sql']]
+            self.assertEqual(len(project_queries), 1, project_queries)
+
+    def test_query_string_and_user_are_part_of_the_etag(self):
+        etag = self.client.get('/api/projects/')['ETag']
+        self.assertNotEqual(self.client.get('/api/projects/?fields=id')['ETag'], etag)
+        other_staff = User.objects.create_user(username='staff2', password='password123', is_staff=True)
+        UserProfile.objects.create(user=other_staff, role='staff')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(other_staff).access_token}')
+        self.assertNotEqual(self.client.get('/api/projects/')['ETag'], etag)
+
+    def test_unknown_object_is_not_found(self):
+        response = self.client.get('/api/projects/999/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deleting_a_project_changes_the_list_etag(self):
+        self.assertChanges('/api/projects/', self.other.delete)
+
+    @override_settings(RESPONSE_CACHE_SETTLE_SECONDS=7)
+    def test_recently_changed_lists_get_no_etag(self):
+        # A write stamped before a recent one may still commit and keep the stamp
+        response = self.client.get('/api/projects/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', response)
+
+        FinalProject.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        etag = self.client.get('/api/projects/')['ETag']
+        self.assertEqual(self.client.get('/api/projects/', HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_editing_an_embedded_student_changes_the_project_etag(self):
+        def rename():
+            self.student.first_name = 'Renamed'
+            self.student.save()
+        self.assertChanges(f'/api/projects/{self.project.pk}/', rename)
+
+    def test_link_changes_change_the_project_etag(self):
+        url = f'/api/projects/{self.project.pk}/'
+        self.assertChanges(url, lambda: self.project.committee_members.add(self.advisor))
+        self.assertChanges(url, lambda: self.student.projects.clear())
+
+    def test_advisor_load_changes_reach_their_other_projects(self):
+        # P1 embeds the advisor, whose leading_count grows when P2 is assigned
+        def assign():
+            self.other.advisor = self.advisor
+            self.other.save()
+        self.assertChanges(f'/api/projects/{self.project.pk}/', assign)
+        self.assertChanges(f'/api/projects/{self.project.pk}/', lambda: self.client.post(
+            '/api/projects/bulk-assign/', {'assignments': [{'project': self.other.pk, 'advisor': None}]}, format='json',
+        ))
+
+
+class ResponseCacheTests(APITestCase):
+    """
+    Tests for the scoped list response cache.
+    """
+
+    def setUp(self):
+        caches['responses'].clear()
+        self.advisors, self.projects = [], []
+        for n in range(2):
+            user = User.objects.create_user(username=f'lecturer{n}', password='password123')
+            UserProfile.objects.create(user=user, role='lecturer')
+            advisor = Advisor.objects.create(user=user, email=f'a{n}@test.com', first_name='A', last_name=str(n), leading_quota=5)
+            self.advisors.append(advisor)
+            self.projects.append(FinalProject.objects.create(title=f'P{n}', description='...', advisor=advisor))
+
+    def list_as(self, advisor):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(advisor.user).access_token}')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        built = any('FROM "projects_finalproject_students"' in q['sql'] for q in ctx.captured_queries)
+        return response.json(), built
+
+    def test_repeated_list_is_served_from_cache(self):
+        first, built = self.list_as(self.advisors[0])
+        self.assertTrue(built)
+        second, built = self.list_as(self.advisors[0])
+        self.assertFalse(built)
+        self.assertEqual(second, first)
+
+    def test_only_writes_in_scope_invalidate(self):
+        self.list_as(self.advisors[0])
+        self.projects[1].title = 'Elsewhere'
+        self.projects[1].save()
+        _, built = self.list_as(self.advisors[0])
+        self.assertFalse(built)
+
+        self.projects[0].title = 'Renamed'
+        self.projects[0].save()
+        data, built = self.list_as(self.advisors[0])
+        self.assertTrue(built)
+        self.assertEqual(data['results'][0]['title'], 'Renamed')
+
+    def test_staff_share_one_scope(self):
+        staff = [User.objects.create_user(username=f'staff{n}', password='password123', is_staff=True) for n in range(2)]
+        responses = []
+        for user in staff:
+            self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+            with CaptureQueriesContext(connection) as ctx:
+                responses.append(self.client.get('/api/projects/').json())
+        self.assertEqual(responses[0], responses[1])
+        self.assertFalse(any('FROM "projects_finalproject_students"' in q['sql'] for q in ctx.captured_queries))
+
+    @override_settings(RESPONSE_CACHE_SETTLE_SECONDS=7)
+    def test_recently_changed_lists_are_cached_for_the_settle_window(self):
+        # A write stamped before a recent one may still commit and keep the version
+        cache = caches['responses']
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.list_as(self.advisors[0])
+        self.assertEqual(cache_set.call_args.args[2], 7)
+
+        FinalProject.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            self.list_as(self.advisors[0])
+        self.assertIs(cache_set.call_args.args[2], DEFAULT_TIMEOUT)
+
+    @override_settings(RESPONSE_CACHE_ALIAS=None)
+    def test_cache_can_be_turned_off(self):
+        self.list_as(self.advisors[0])
+        _, built = self.list_as(self.advisors[0])
+        self.assertTrue(built)
+
+
+@skipUnless(connection.vendor == 'sqlite', "Query plans are only deterministic on SQLite's planner.")
+class HotQueryIndexTests(TestCase):
+    """
+    EXPLAIN the dashboard, scoping and quota queries and check that each
+    one is answered through the index added for it.
+    """
+
+    def assertUsesIndex(self, queryset, *indexes):
+        plan = queryset.explain()
+        for index in indexes:
+            self.assertRegex(plan, rf'USING (COVERING )?INDEX {index}\b', plan)
+
+    def test_dashboard_status_counts(self):
+        self.assertUsesIndex(Student.objects.values('status').annotate(count=Count('status')), 'student_status_idx')
+        self.assertUsesIndex(FinalProject.objects.values('status').annotate(count=Count('status')), 'project_status_idx')
+
+    def test_advisor_scoping(self):
+        queryset = FinalProject.objects.visible_to(RoleContext(user_id=1, role='lecturer', advisor_id=1))
+        self.assertUsesIndex(queryset, 'project_advisor_status_idx', 'project_committee_advisor_idx')
+
+    def test_student_scoping(self):
+        queryset = FinalProject.objects.visible_to(RoleContext(user_id=1, role='student', student_id=1))
+        self.assertUsesIndex(queryset, 'project_students_student_idx')
+
+    def test_advisor_in_progress_projects(self):
+        self.assertUsesIndex(FinalProject.objects.filter(advisor_id=1, status='in_progress'), 'project_advisor_status_idx')
+
+    def test_quota_recount(self):
+        loads = actual_loads()
+        queryset = Advisor.objects.annotate(expected_leading=loads['leading_count'], expected_committee=loads['committee_count'])
+        # Counting committee seats only needs advisor_id, which the FK's own index covers as well
+        self.assertUsesIndex(queryset, 'project_advisor_status_idx', r'(project_committee_advisor_idx|\w+_advisor_id_\w+)')
+
+    def test_profiles_by_role(self):
+        self.assertUsesIndex(UserProfile.objects.filter(role='lecturer'), 'userprofile_role_idx')
@@ -1,8 +1,8 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from mysite.asyncviews import AsyncReadRouter
 from .views import FinalProjectViewSet
 
-router = DefaultRouter()
+router = AsyncReadRouter()
 router.register(r'projects', FinalProjectViewSet, basename='project')
 
 urlpatterns = [
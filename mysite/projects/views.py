@@ -1,49 +1,98 @@
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from .assignment import AssignmentError, bulk_assign
 from .models import FinalProject
-from .serializers import FinalProjectSerializer
+from .search import project_index
+from .serializers import BulkAssignmentSerializer, FinalProjectReadSerializer, FinalProjectSerializer
 from users.permissions import IsAdminUser, IsStaffUser, IsStudentUser, IsLecturerUser
+from users.roles import get_role_context
+from mysite.conditional import ConditionalGetMixin
+from mysite.exports import ExportMixin
+from mysite.readers import FastReadMixin
+from mysite.response_cache import ResponseCacheMixin
+from mysite.search import SearchMixin
+from mysite.sparse import ALL_FIELDS, SparseFieldsMixin
 
-class FinalProjectViewSet(viewsets.ModelViewSet):
+class FinalProjectViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsMixin, SearchMixin, FastReadMixin, ExportMixin, viewsets.ModelViewSet):
     """
     This viewset handles CRUD operations for Final Projects.
     Permissions are based on user roles (Student, Advisor, Staff, Admin).
     """
     serializer_class = FinalProjectSerializer
+    read_serializer_class = FinalProjectReadSerializer
     permission_classes = [permissions.IsAuthenticated]
+    export_fields = ['id', 'title', 'description', 'submission_date', 'status', 'advisor', 'students', 'committee_members']
+    search_index = project_index
+    # Writes pay for the quota checks, load counters and stamps in
+    # signals.py; `?q=` lists also count their matches (mysite/search.py)
+    query_budgets = {
+        'list': 8, 'retrieve': 6, 'export': 3, 'bulk_assign': 12,
+        'create': 22, 'update': 22, 'partial_update': 22,
+    }
+    # Served on the event loop under ASGI (mysite/asyncviews.py)
+    async_actions = ('list', 'retrieve')
 
     def get_queryset(self):
         """
-        - Admin/Staff see all projects.
-        - Students see projects they are assigned to.
-        - Lecturers see projects they are advising or are a committee member of.
+        Scope projects to what the requesting user may see; see
+        `FinalProjectQuerySet.visible_to` for the per-role rules.
+        With `?fields=`/`?expand=` only the requested relations are loaded.
         """
-        user = self.request.user
-        if user.is_staff or (hasattr(user, 'userprofile') and user.userprofile.role in ['admin', 'staff']):
-            return FinalProject.objects.all()
-        
-        queryset = FinalProject.objects.none()
-        if hasattr(user, 'student_profile'):
-            queryset = queryset.union(FinalProject.objects.filter(students=user.student_profile))
-        
-        if hasattr(user, 'advisor_profile'):
-            queryset = queryset.union(FinalProject.objects.filter(advisor=user.advisor_profile))
-            queryset = queryset.union(FinalProject.objects.filter(committee_members=user.advisor_profile))
+        projects = FinalProject.objects.visible_to(get_role_context(self.request))
+        if self.get_field_selection() is ALL_FIELDS:
+            return projects.with_related()
+        return self.prefetch_selected(projects, ['students', 'advisor', 'committee_members'])
 
-        return queryset.distinct()
+    def get_cache_scope(self):
+        """
+        Users `visible_to` scopes alike share cached list responses.
+        """
+        context = get_role_context(self.request)
+        if context.is_admin_or_staff:
+            return 'all'
+        return f'student:{context.student_id}:advisor:{context.advisor_id}'
+
+    def export_records(self, queryset):
+        """
+        Export each project with compact nested students, advisor and committee.
+        """
+        for project in queryset.iterator(chunk_size=self.export_chunk_size):
+            advisor = project.advisor
+            yield {
+                'id': project.id,
+                'title': project.title,
+                'description': project.description,
+                'submission_date': project.submission_date,
+                'status': project.status,
+                'advisor': advisor and {
+                    'id': advisor.id, 'first_name': advisor.first_name,
+                    'last_name': advisor.last_name, 'email': advisor.email,
+                },
+                'students': [
+                    {'id': student.id, 'student_id': student.student_id,
+                     'first_name': student.first_name, 'last_name': student.last_name}
+                    for student in project.students.all()
+                ],
+                'committee_members': [
+                    {'id': member.id, 'first_name': member.first_name,
+                     'last_name': member.last_name, 'email': member.email}
+                    for member in project.committee_members.all()
+                ],
+            }
 
     def create(self, request, *args, **kwargs):
         """
         - A student can create a project and assign themselves.
         - Admin/Staff can create any project.
         """
-        user = self.request.user
-        if not (hasattr(user, 'userprofile') and user.userprofile.role in ['admin', 'staff', 'student']):
+        context = get_role_context(request)
+        if context.role not in ['admin', 'staff', 'student']:
             return Response({'detail': 'You do not have permission to create a project.'}, status=status.HTTP_403_FORBIDDEN)
         
         # When a student creates a project, automatically add them to it
-        if hasattr(user, 'userprofile') and user.userprofile.role == 'student':
-            request.data['students'] = [user.student_profile.id]
+        if context.role == 'student':
+            request.data['students'] = [context.student_id]
 
         return super().create(request, *args, **kwargs)
 
@@ -54,11 +103,13 @@ class FinalProjectViewSet(viewsets.ModelViewSet):
         - Admin/Staff can update anything.
         """
         instance = self.get_object()
-        user = self.request.user
+        context = get_role_context(request)
 
-        is_admin_or_staff = user.is_staff or (hasattr(user, 'userprofile') and user.userprofile.role in ['admin', 'staff'])
-        is_assigned_student = hasattr(user, 'student_profile') and user.student_profile in instance.students.all()
-        is_assigned_advisor = hasattr(user, 'advisor_profile') and user.advisor_profile == instance.advisor
+        is_admin_or_staff = context.is_admin_or_staff
+        is_assigned_student = context.student_id is not None and any(
+            student.pk == context.student_id for student in instance.students.all()
+        )
+        is_assigned_advisor = context.advisor_id is not None and context.advisor_id == instance.advisor_id
 
         # Allow full update for admin/staff
         if is_admin_or_staff:
@@ -84,8 +135,7 @@ class FinalProjectViewSet(viewsets.ModelViewSet):
         """
         Only Admin and Staff can delete a project.
         """
-        user = self.request.user
-        if not (user.is_staff or (hasattr(user, 'userprofile') and user.userprofile.role in ['admin', 'staff'])):
+        if not get_role_context(request).is_admin_or_staff:
             return Response({'detail': 'You do not have permission to delete this project.'}, status=status.HTTP_403_FORBIDDEN)
         
         return super().destroy(request, *args, **kwargs)
@@ -97,3 +147,20 @@ class FinalProjectViewSet(viewsets.ModelViewSet):
         # The get_queryset method already filters this, so if the object is found,
         # the user has permission.
         return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], url_path='bulk-assign')
+    def bulk_assign(self, request):
+        """
+        Assign advisors and committees to many projects in one request.
+        Only Admin and Staff can use it; the batch is all-or-nothing.
+        """
+        if not get_role_context(request).is_admin_or_staff:
+            return Response({'detail': 'You do not have permission to perform this action.'}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = BulkAssignmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            updated = bulk_assign(serializer.validated_data['assignments'])
+        except AssignmentError as exc:
+            return Response({'errors': exc.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'updated': updated})
@@ -0,0 +1,206 @@
+"""
+Bulk student import.
+
+Rows (from CSV or JSON) are validated up front, including uniqueness
+against the database and within the batch, using a fixed number of
+queries. Only if every row is valid are the User, UserProfile and
+Student rows written with chunked `bulk_create` inside one transaction.
+
+Password hashing is the dominant cost of creating users one by one, so
+it is either spread over a process pool (`PASSWORD_HASH`, management
+command only) or skipped entirely (`PASSWORD_DEFERRED`). Users created
+without a password get an unusable one plus a one-time set-password
+token (`users.activation`), listed in `importer.activations` for staff
+to hand out.
+"""
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework import serializers
+
+from users import activation
+from users.models import UserProfile
+from .models import Student
+from .signals import students_imported
+
+PASSWORD_HASH = 'hash'
+PASSWORD_DEFERRED = 'deferred'
+PASSWORD_MODES = [PASSWORD_HASH, PASSWORD_DEFERRED]
+
+# Below this many passwords a process pool costs more than it saves
+POOL_THRESHOLD = 8
+
+
+class StudentImportRowSerializer(serializers.ModelSerializer):
+    """
+    Validates a single import row. Uniqueness is checked for the whole
+    batch by `StudentImporter`, so the per-row unique validators are off.
+    """
+    username = serializers.CharField(max_length=150, required=False)
+    password = serializers.CharField(required=False, write_only=True)
+
+    class Meta:
+        model = Student
+        fields = [
+            'username', 'password', 'first_name', 'last_name', 'student_id', 'email',
+            'major', 'year_enrolled', 'date_of_birth', 'phone_number', 'address',
+            'graduation_year_estimate', 'gpa', 'status',
+        ]
+        extra_kwargs = {
+            'student_id': {'validators': []},
+            'email': {'validators': []},
+        }
+
+
+def parse_rows(content, fmt):
+    """
+    Parse CSV text or a JSON array of objects into a list of row dicts.
+    Empty CSV cells are dropped so optional fields fall back to their defaults.
+    """
+    if fmt == 'csv':
+        return [
+            {key: value for key, value in row.items() if value not in ('', None)}
+            for row in csv.DictReader(io.StringIO(content))
+        ]
+    if fmt == 'json':
+        rows = json.loads(content)
+        if not isinstance(rows, list):
+            raise ValueError("JSON import must be an array of objects.")
+        return rows
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _setup_django():
+    # Process pool workers started with 'spawn' need their own Django setup.
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mysite.settings')
+    django.setup()
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hash `passwords` (None entries become unusable passwords), in parallel when worth it.
+    """
+    raw = [password for password in passwords if password is not None]
+    if len(raw) < POOL_THRESHOLD or workers == 1:
+        hashed = [make_password(password) for password in raw]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_setup_django) as pool:
+            hashed = list(pool.map(make_password, raw, chunksize=16))
+
+    hashed = iter(hashed)
+    return [next(hashed) if password is not None else make_password(None) for password in passwords]
+
+
+class StudentImporter:
+    """
+    Validate and import a batch of student rows.
+
+    Usage: `importer = StudentImporter(rows); if importer.is_valid(): importer.save()`.
+    Per-row errors are in `importer.errors` as [{'row': n, 'errors': {...}}],
+    with rows numbered from 1. After `save()`, `importer.activations` holds
+    the set-password tokens of the users created without a password.
+    """
+
+    def __init__(self, rows, password_mode=PASSWORD_DEFERRED, workers=None, batch_size=1000):
+        if password_mode not in PASSWORD_MODES:
+            raise ValueError(f"password_mode must be one of {PASSWORD_MODES}")
+        self.rows = rows
+        self.password_mode = password_mode
+        self.workers = workers
+        self.batch_size = batch_size
+        self.errors = []
+        self.validated_rows = None
+        self.activations = []
+
+    def is_valid(self):
+        validated = []
+        errors = {}
+        for number, row in enumerate(self.rows, start=1):
+            serializer = StudentImportRowSerializer(data=row)
+            if serializer.is_valid():
+                data = serializer.validated_data
+                data.setdefault('username', data['student_id'])
+                validated.append((number, data))
+            else:
+                errors[number] = dict(serializer.errors)
+
+        self.check_unique(validated, errors)
+        self.errors = [{'row': number, 'errors': errors[number]} for number in sorted(errors)]
+        self.validated_rows = [data for number, data in validated if number not in errors]
+        return not self.errors
+
+    def check_unique(self, validated, errors):
+        """
+        Flag values that already exist in the database or repeat within the batch.
+        """
+        checks = [
+            ('username', User.objects, 'username'),
+            ('student_id', Student.objects, 'student_id'),
+            ('email', Student.objects, 'email'),
+        ]
+        for field, manager, lookup in checks:
+            values = {data[field] for number, data in validated}
+            taken = set(manager.filter(**{f'{lookup}__in': values}).values_list(lookup, flat=True))
+            seen = set()
+            for number, data in validated:
+                value = data[field]
+                if value in taken:
+                    errors.setdefault(number, {})[field] = [f'{field} "{value}" already exists.']
+                elif value in seen:
+                    errors.setdefault(number, {})[field] = [f'{field} "{value}" appears more than once in this import.']
+                seen.add(value)
+
+    def creates_unusable_passwords(self):
+        """
+        Whether `save()` would create users without a usable password.
+        """
+        assert self.validated_rows is not None, "Call is_valid() before save()."
+        return self.password_mode == PASSWORD_DEFERRED or any('password' not in data for data in self.validated_rows)
+
+    @transaction.atomic
+    def save(self):
+        """
+        Write all validated rows; returns the created Student objects.
+        """
+        assert self.validated_rows is not None, "Call is_valid() before save()."
+        rows = self.validated_rows
+        if self.password_mode == PASSWORD_HASH:
+            passwords = hash_passwords([data.get('password') for data in rows], workers=self.workers)
+        else:
+            passwords = [make_password(None)] * len(rows)
+
+        users = User.objects.bulk_create([
+            User(
+                username=data['username'], password=password, email=data['email'],
+                first_name=data['first_name'], last_name=data['last_name'],
+            )
+            for data, password in zip(rows, passwords)
+        ], batch_size=self.batch_size)
+
+        if users and users[0].pk is None:
+            # Backends that can't return ids from a bulk insert
+            ids = dict(User.objects.filter(username__in=[user.username for user in users]).values_list('username', 'pk'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        self.activations = [activation.issue(user) for user in users if not user.has_usable_password()]
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user, role='student') for user in users],
+            batch_size=self.batch_size,
+        )
+        student_fields = set(StudentImportRowSerializer.Meta.fields) - {'username', 'password'}
+        students = Student.objects.bulk_create([
+            Student(user=user, **{key: value for key, value in data.items() if key in student_fields})
+            for user, data in zip(users, rows)
+        ], batch_size=self.batch_size)
+
+        # bulk_create sends no post_save, so announce the batch for cache invalidation
+        students_imported.send(sender=Student, students=students)
+        return students
@@ -0,0 +1,56 @@
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.importer import PASSWORD_HASH, PASSWORD_MODES, StudentImporter, parse_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk-import students (and their user accounts) from a CSV or JSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header row, or a JSON array of objects.")
+        parser.add_argument('--format', choices=['csv', 'json'], help="Defaults to the file extension.")
+        parser.add_argument(
+            '--password-mode', choices=PASSWORD_MODES, default=PASSWORD_HASH,
+            help="'hash' hashes the rows' passwords in a process pool; "
+                 "'deferred' leaves accounts without a usable password until it is set with a one-time token.",
+        )
+        parser.add_argument(
+            '--activations', help="CSV file receiving the set-password tokens (username, uid, token) of the "
+                                  "accounts created without a password; required when there are any.",
+        )
+        parser.add_argument('--workers', type=int, help="Password hashing processes (default: CPU count).")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per INSERT.")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        fmt = options['format'] or ('json' if path.suffix.lower() == '.json' else 'csv')
+        try:
+            rows = parse_rows(path.read_text(encoding='utf-8-sig'), fmt)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        importer = StudentImporter(
+            rows,
+            password_mode=options['password_mode'],
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+        )
+        if not importer.is_valid():
+            for error in importer.errors:
+                self.stderr.write(f"Row {error['row']}: {error['errors']}")
+            raise CommandError(f"{len(importer.errors)} invalid row(s); nothing was imported.")
+        if importer.creates_unusable_passwords() and not options['activations']:
+            raise CommandError(
+                "Some accounts would have no password; pass --activations to receive their set-password tokens."
+            )
+
+        students = importer.save()
+        if importer.activations:
+            with open(options['activations'], 'w', newline='') as handle:
+                writer = csv.DictWriter(handle, fieldnames=['username', 'uid', 'token'])
+                writer.writeheader()
+                writer.writerows(importer.activations)
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(students)} student(s)."))
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# The search index DDL as of this migration, spelled out so later changes
+# to students/search.py do not alter it
+TABLE = 'students_student_fts'
+COLUMNS = 'first_name, last_name, student_id, major, email'
+PG_DOCUMENT = "to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(student_id, '') || ' ' || coalesce(major, '') || ' ' || coalesce(email, ''))"
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {TABLE} USING fts5("
+            f"{COLUMNS}, prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f'INSERT INTO {TABLE} (rowid, {COLUMNS}) SELECT id, {COLUMNS} FROM students_student')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'CREATE TABLE {TABLE} (id bigint PRIMARY KEY, document tsvector NOT NULL)')
+        schema_editor.execute(f'CREATE INDEX {TABLE}_document_idx ON {TABLE} USING GIN (document)')
+        schema_editor.execute(f'INSERT INTO {TABLE} (id, document) SELECT id, {PG_DOCUMENT} FROM students_student')
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_student_status_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -24,6 +24,15 @@ class Student(models.Model):
         ('leave', 'ພັກການຮຽນ'),
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='studying')
+    # Version stamp for ETags; bumped by save() and by the queryset updates
+    # that change what the API shows for this student.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Dashboard per-status counts are answered from the index alone
+            models.Index(fields=['status'], name='student_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.student_id})"
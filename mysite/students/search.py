@@ -0,0 +1,28 @@
+"""
+Full-text index over students, kept current from model signals.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from mysite.search import SearchIndex
+from .models import Student
+from .signals import students_imported
+
+student_index = SearchIndex(
+    Student, 'students_student_fts', ['first_name', 'last_name', 'student_id', 'major', 'email'],
+)
+
+
+@receiver(post_save, sender=Student)
+def index_student(sender, instance, **kwargs):
+    student_index.add([instance])
+
+
+@receiver(students_imported, sender=Student)
+def index_imported_students(sender, students, **kwargs):
+    student_index.add(students)
+
+
+@receiver(post_delete, sender=Student)
+def unindex_student(sender, instance, **kwargs):
+    student_index.remove([instance.pk])
@@ -1,7 +1,15 @@
 from rest_framework import serializers
+from mysite.readers import ValuesSerializer
+from mysite.sparse import SparseFieldsSerializerMixin
 from .models import Student
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Student
         fields = '__all__'
+
+class StudentReadSerializer(ValuesSerializer):
+    """
+    StudentSerializer's output built from `.values()` rows, for list responses.
+    """
+    serializer_class = StudentSerializer
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent at the end of a bulk import, inside its transaction, since
+# bulk_create sends no post_save. Arguments: students (the created objects).
+students_imported = Signal()
@@ -0,0 +1,230 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from mysite.pagination import KeysetPagination
+from users.models import UserProfile
+from .importer import POOL_THRESHOLD
+from .models import Student
+from .search import student_index
+
+class StudentExportTests(APITestCase):
+    """
+    Tests for the streaming student export.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.student_user = User.objects.create_user(username='student', password='password123')
+        UserProfile.objects.create(user=self.student_user, role='student')
+        Student.objects.create(user=self.student_user, student_id='s1', email='s1@test.com', first_name='S', last_name='1', major='CS', year_enrolled=2020, gpa='3.50')
+
+    def test_staff_can_export_csv(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+        response = self.client.get('/api/students/export/', HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,user,first_name,last_name,student_id'))
+        self.assertIn(',3.50,studying', lines[1])
+
+    def test_student_cannot_export(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.student_user).access_token}')
+        response = self.client.get('/api/students/export/?format=csv')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class StudentSearchTests(APITestCase):
+    """
+    Tests for `?q=` full-text search over students.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        self.alice = Student.objects.create(student_id='s1', email='alice@test.com', first_name='Alice', last_name='Smith', major='Computer Science', year_enrolled=2020)
+        self.bob = Student.objects.create(student_id='s2', email='bob@test.com', first_name='Bob', last_name='Smithers', major='Mathematics', year_enrolled=2020)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+
+    def search(self, text, **params):
+        response = self.client.get('/api/students/', {'q': text, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_prefix_words_must_all_match(self):
+        self.assertEqual({s['id'] for s in self.search('smi')['results']}, {self.alice.pk, self.bob.pk})
+        self.assertEqual([s['id'] for s in self.search('ali smi')['results']], [self.alice.pk])
+        self.assertEqual([s['id'] for s in self.search('math')['results']], [self.bob.pk])
+        self.assertEqual(self.search('')['results'], [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.alice.major = 'Physics'
+        self.alice.save()
+        self.assertEqual(self.search('computer')['results'], [])
+        self.assertEqual([s['id'] for s in self.search('phys')['results']], [self.alice.pk])
+        self.alice.delete()
+        self.assertEqual(self.search('phys')['results'], [])
+
+    def test_ranked_results_are_paginated(self):
+        page = self.search('smi', page_size=1)
+        self.assertEqual(len(page['results']), 1)
+        self.assertIsNone(page['previous'])
+        response = self.client.get(page['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertNotEqual(response.data['results'][0]['id'], page['results'][0]['id'])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+
+    @mock.patch.object(KeysetPagination, 'offset_cutoff', 1)
+    def test_ranked_pages_go_past_the_offset_cutoff(self):
+        carol = Student.objects.create(student_id='s3', email='carol@test.com', first_name='Carol', last_name='Smithson', major='Biology', year_enrolled=2020)
+        page = self.search('smi', page_size=1)
+        seen = [s['id'] for s in page['results']]
+        while page['next']:
+            page = self.client.get(page['next']).data
+            seen.extend(s['id'] for s in page['results'])
+        self.assertEqual(sorted(seen), [self.alice.pk, self.bob.pk, carol.pk])
+
+    def test_best_matches_rank_first(self):
+        Student.objects.bulk_create([
+            Student(student_id=f'f{n}', email=f'f{n}@test.com', first_name='Filler', last_name=str(n), major='Chemistry', year_enrolled=2020)
+            for n in range(20)
+        ])
+        best = Student.objects.create(student_id='s9', email='chem@test.com', first_name='Chem', last_name='Chemistry', major='Chemistry', year_enrolled=2020)
+        student_index.add(Student.objects.filter(student_id__startswith='f'))
+        self.assertEqual(self.search('chem', page_size=1)['results'][0]['id'], best.pk)
+
+    @override_settings(SEARCH_RANK_LIMIT=1)
+    def test_broad_queries_come_back_in_id_order(self):
+        page = self.search('smi', page_size=1)
+        seen = [s['id'] for s in page['results']]
+        while page['next']:
+            page = self.client.get(page['next']).data
+            seen.extend(s['id'] for s in page['results'])
+        self.assertEqual(seen, [self.alice.pk, self.bob.pk])
+        self.assertEqual([s['id'] for s in self.search('bob smi')['results']], [self.bob.pk])
+
+    def test_imported_students_are_indexed(self):
+        response = self.client.post('/api/students/import/', [
+            {'student_id': 's3', 'email': 'carol@test.com', 'first_name': 'Carol', 'last_name': 'Jones', 'major': 'Biology', 'year_enrolled': 2021},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertEqual(len(self.search('carol')['results']), 1)
+
+
+class StudentImportTests(APITestCase):
+    """
+    Tests for the bulk student import API, command and password hashing.
+    """
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', password='password123', is_staff=True)
+        UserProfile.objects.create(user=self.staff_user, role='staff')
+        Student.objects.create(student_id='taken', email='taken@test.com', first_name='T', last_name='T', major='CS', year_enrolled=2020)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.staff_user).access_token}')
+
+    def rows(self, count, start=0):
+        return [
+            {'student_id': f'n{i}', 'email': f'n{i}@test.com', 'first_name': 'N', 'last_name': str(i),
+             'major': 'CS', 'year_enrolled': 2024}
+            for i in range(start, start + count)
+        ]
+
+    def test_import_uses_a_fixed_number_of_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.post('/api/students/import/', self.rows(2), format='json')
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post('/api/students/import/', {'rows': self.rows(50, start=10)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 50)
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+
+        student = Student.objects.select_related('user__userprofile').get(student_id='n10')
+        self.assertEqual(student.user.username, 'n10')
+        self.assertEqual(student.user.userprofile.role, 'student')
+        self.assertFalse(student.user.has_usable_password())
+
+    def test_imported_students_set_their_password_with_a_one_time_token(self):
+        response = self.client.post('/api/students/import/', self.rows(2), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        [first, second] = response.data['activations']
+        self.assertEqual(first['username'], 'n0')
+
+        self.client.credentials()
+        redeem = {'uid': first['uid'], 'token': first['token'], 'password': 'a-long-new-password'}
+        response = self.client.post('/api/password/set/', redeem, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.post('/api/token/', {'username': 'n0', 'password': 'a-long-new-password'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.post('/api/password/set/', {**redeem, 'password': 'another-long-password'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('token', response.data)
+        response = self.client.post('/api/password/set/', {**redeem, 'token': second['token']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_api_does_not_hash_passwords(self):
+        response = self.client.post('/api/students/import/', {'rows': self.rows(1), 'password_mode': 'hash'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password_mode', response.data)
+        self.assertEqual(Student.objects.count(), 1)
+
+    def test_invalid_rows_are_reported_and_nothing_is_written(self):
+        rows = self.rows(3)
+        rows[0]['student_id'] = 'taken'
+        rows[1]['year_enrolled'] = 'soon'
+        rows[2]['email'] = rows[0]['email']
+        response = self.client.post('/api/students/import/', rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error['row'] for error in response.data['errors']], [1, 2, 3])
+        self.assertIn('student_id', response.data['errors'][0]['errors'])
+        self.assertIn('year_enrolled', response.data['errors'][1]['errors'])
+        self.assertIn('more than once', response.data['errors'][2]['errors']['email'][0])
+        self.assertEqual(Student.objects.count(), 1)
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile('students.csv', b'student_id,email,first_name,last_name,major,year_enrolled,gpa\nc1,c1@test.com,C,1,CS,2024,\n')
+        response = self.client.post('/api/students/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(Student.objects.get(student_id='c1').gpa)
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_command_hashes_passwords(self):
+        rows = self.rows(POOL_THRESHOLD + 2)
+        for row in rows:
+            row['password'] = f"secret-{row['student_id']}"
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as handle:
+            json.dump(rows, handle)
+        self.addCleanup(os.unlink, handle.name)
+
+        call_command('import_students', handle.name, '--workers', '2', stdout=StringIO())
+        user = User.objects.get(username='n3')
+        self.assertTrue(user.check_password('secret-n3'))
+        self.assertEqual(Student.objects.count(), len(rows) + 1)
+
+    def test_command_writes_activations_for_accounts_without_a_password(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as handle:
+            json.dump(self.rows(2), handle)
+        self.addCleanup(os.unlink, handle.name)
+        with self.assertRaises(CommandError):
+            call_command('import_students', handle.name, stdout=StringIO())
+        self.assertEqual(Student.objects.count(), 1)
+
+        activations = handle.name + '.csv'
+        self.addCleanup(os.unlink, activations)
+        call_command('import_students', handle.name, '--activations', activations, stdout=StringIO())
+        with open(activations) as output:
+            self.assertEqual([row['username'] for row in csv.DictReader(output)], ['n0', 'n1'])
@@ -1,8 +1,8 @@
 from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from mysite.asyncviews import AsyncReadRouter
 from .views import StudentViewSet
 
-router = DefaultRouter()
+router = AsyncReadRouter()
 router.register(r'students', StudentViewSet, basename='student')
 
 urlpatterns = [
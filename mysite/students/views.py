@@ -1,21 +1,42 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
 from .models import Student
-from .serializers import StudentSerializer
+from .search import student_index
+from .serializers import StudentReadSerializer, StudentSerializer
+from .importer import PASSWORD_DEFERRED, StudentImporter, parse_rows
 from users.permissions import IsAdminUser, IsStaffUser, IsStudentUser
+from users.roles import get_role_context
+from mysite.conditional import ConditionalGetMixin
+from mysite.exports import ExportMixin
+from mysite.fastjson import FastJSONParser
+from mysite.readers import FastReadMixin
+from mysite.response_cache import ResponseCacheMixin
+from mysite.search import SearchMixin
+from mysite.sparse import SparseFieldsMixin
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(ConditionalGetMixin, ResponseCacheMixin, SparseFieldsMixin, SearchMixin, FastReadMixin, ExportMixin, viewsets.ModelViewSet):
     """
     This viewset automatically provides `list`, `create`, `retrieve`,
-    `update` and `destroy` actions.
+    `update` and `destroy` actions, plus a streaming `export` and `?q=` search.
     """
     serializer_class = StudentSerializer
+    read_serializer_class = StudentReadSerializer
+    export_fields = [field.name for field in Student._meta.concrete_fields]
+    search_index = student_index
+    # `?q=` lists also count their matches (mysite/search.py)
+    query_budgets = {'list': 6, 'retrieve': 5, 'export': 3, 'import_students': 12}
+    # Served on the event loop under ASGI (mysite/asyncviews.py); retrieve
+    # keeps its synchronous owner check
+    async_actions = ('list',)
     permission_classes = [permissions.IsAuthenticated]
 
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action in ['list', 'create', 'destroy']:
+        if self.action in ['list', 'export', 'create', 'destroy', 'import_students']:
             self.permission_classes = [permissions.IsAuthenticated, IsAdminUser | IsStaffUser]
         elif self.action in ['update', 'partial_update', 'retrieve']:
             # For retrieve, we will do a custom check in the method
@@ -27,11 +48,11 @@ class StudentViewSet(viewsets.ModelViewSet):
         This view should return a list of all the students
         for admin/staff users, or only the current user's student profile.
         """
-        user = self.request.user
-        if user.is_staff or (hasattr(user, 'userprofile') and user.userprofile.role in ['admin', 'staff']):
+        context = get_role_context(self.request)
+        if context.is_admin_or_staff:
             return Student.objects.all()
-        elif hasattr(user, 'student_profile'):
-            return Student.objects.filter(user=user)
+        elif context.student_id is not None:
+            return Student.objects.filter(pk=context.student_id)
         else:
             # Return an empty queryset if the user is not staff/admin and has no student profile
             return Student.objects.none()
@@ -42,10 +63,10 @@ class StudentViewSet(viewsets.ModelViewSet):
         Admin and Staff can retrieve any profile.
         """
         instance = self.get_object()
-        user = self.request.user
+        context = get_role_context(request)
         
         # Check if the user is the owner of the student profile, or is admin/staff
-        if instance.user == user or user.is_staff or (hasattr(user, 'userprofile') and user.userprofile.role in ['admin', 'staff']):
+        if instance.user_id == context.user_id or context.is_admin_or_staff:
             return super().retrieve(request, *args, **kwargs)
         else:
             # If not authorized, explicitly deny permission
@@ -57,9 +78,9 @@ class StudentViewSet(viewsets.ModelViewSet):
         Admin and Staff can update any profile.
         """
         instance = self.get_object()
-        user = self.request.user
+        context = get_role_context(request)
 
-        if instance.user == user or user.is_staff or (hasattr(user, 'userprofile') and user.userprofile.role in ['admin', 'staff']):
+        if instance.user_id == context.user_id or context.is_admin_or_staff:
             return super().update(request, *args, **kwargs)
         else:
             self.permission_denied(request)
@@ -68,6 +89,48 @@ class StudentViewSet(viewsets.ModelViewSet):
         """
         Only Admin and Staff can delete a student profile.
         """
-        if not (self.request.user.is_staff or (hasattr(self.request.user, 'userprofile') and self.request.user.userprofile.role in ['admin', 'staff'])):
+        if not get_role_context(request).is_admin_or_staff:
             self.permission_denied(request)
         return super().destroy(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[FastJSONParser, MultiPartParser, FormParser])
+    def import_students(self, request):
+        """
+        Bulk-create students (with their user accounts) from a JSON array of
+        rows, `{"rows": [...]}`, or an uploaded CSV/JSON `file`.
+
+        All rows are validated first; if any fail, nothing is written and the
+        per-row errors are returned. Passwords are not hashed here, which
+        is too slow inside a request: accounts get an unusable password and
+        the response lists a one-time set-password token for each
+        (`activations`, redeemed at /api/password/set/). The
+        `import_students` command can hash the rows' passwords instead.
+        """
+        data = request.data
+        try:
+            if isinstance(data, list):
+                rows, options = data, {}
+            elif 'file' in request.FILES:
+                upload = request.FILES['file']
+                fmt = 'json' if upload.name.lower().endswith('.json') else 'csv'
+                rows, options = parse_rows(upload.read().decode('utf-8-sig'), fmt), data
+            else:
+                rows, options = data.get('rows'), data
+            if not isinstance(rows, list):
+                raise ValueError("Provide a list of rows, {\"rows\": [...]} or a CSV/JSON file.")
+        except (ValueError, UnicodeDecodeError) as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        password_mode = options.get('password_mode', PASSWORD_DEFERRED)
+        if password_mode != PASSWORD_DEFERRED:
+            # Hashing runs a process pool, which is no place for a request worker
+            return Response(
+                {'password_mode': [f'Must be "{PASSWORD_DEFERRED}"; use the import_students command to hash passwords.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        importer = StudentImporter(rows, password_mode=password_mode)
+        if not importer.is_valid():
+            return Response({'errors': importer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        students = importer.save()
+        return Response({'created': len(students), 'activations': importer.activations}, status=status.HTTP_201_CREATED)
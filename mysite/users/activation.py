@@ -0,0 +1,32 @@
+"""
+One-time set-password tokens for accounts created without a usable
+password, such as bulk-imported students.
+
+Tokens come from Django's password reset token generator: they are tied
+to the account's password hash and last login, so one stops working as
+soon as the password is set, and expire after PASSWORD_RESET_TIMEOUT.
+Staff hand them out; the user redeems theirs at /api/password/set/.
+"""
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+def issue(user):
+    return {
+        'username': user.get_username(),
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': default_token_generator.make_token(user),
+    }
+
+
+def redeem(uid, token):
+    """
+    The user `uid` and `token` were issued for, or None if either is invalid.
+    """
+    try:
+        user = User.objects.get(pk=force_str(urlsafe_base64_decode(uid)))
+    except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+        return None
+    return user if default_token_generator.check_token(user, token) else None
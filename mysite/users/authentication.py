@@ -0,0 +1,56 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from . import denylist
+from .tokens import RoleTokenUser, has_role_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that skips the database for read-only requests.
+
+    For safe methods, tokens carrying role claims (see users.tokens) are
+    turned into a `RoleTokenUser` built from the claims alone, and the
+    permissions and querysets read the role context from it. Writes, and
+    tokens without role claims, load the `User` row as usual. Tokens on
+    the local denylist are rejected either way.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if denylist.is_denied(validated_token):
+            raise InvalidToken(_("Token has been revoked."))
+
+        if request.method in SAFE_METHODS and has_role_claims(validated_token):
+            return RoleTokenUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def needs_database(self, request):
+        """
+        Whether `authenticate()` would load the user row: async views may
+        only authenticate on the event loop when it would not.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return False
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return False
+
+        try:
+            validated_token = self.get_validated_token(raw_token)
+        except InvalidToken:
+            # Rejected without a query
+            return False
+        return not (request.method in SAFE_METHODS and has_role_claims(validated_token))
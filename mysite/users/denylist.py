@@ -0,0 +1,34 @@
+"""
+Local JWT denylist.
+
+Revoked token ids (jti) are kept in a Django cache until the token would
+have expired anyway, so lookups never touch the database. The default
+local-memory cache is per process; deployments running several worker
+processes should point `JWT_DENYLIST_CACHE` at a shared cache alias.
+"""
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.settings import api_settings
+
+
+def _cache():
+    return caches[settings.JWT_DENYLIST_CACHE]
+
+
+def _key(token):
+    return f"jwt:denied:{token[api_settings.JTI_CLAIM]}"
+
+
+def deny(token):
+    """
+    Reject `token` from now until it expires.
+    """
+    remaining = token['exp'] - int(datetime.now(tz=timezone.utc).timestamp())
+    if remaining > 0:
+        _cache().set(_key(token), True, timeout=remaining)
+
+
+def is_denied(token):
+    return _cache().get(_key(token), False)
@@ -12,5 +12,10 @@ class UserProfile(models.Model):
     ]
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='student')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['role'], name='userprofile_role_idx'),
+        ]
+
     def __str__(self):
         return self.user.username
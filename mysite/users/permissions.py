@@ -1,29 +1,30 @@
 from rest_framework.permissions import BasePermission
+from .roles import get_role_context
 
 class IsAdminUser(BasePermission):
     """
     Allows access only to admin users.
     """
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and request.user.userprofile.role == 'admin')
+        return get_role_context(request).role == 'admin'
 
 class IsStaffUser(BasePermission):
     """
     Allows access only to staff users.
     """
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and request.user.userprofile.role == 'staff')
+        return get_role_context(request).role == 'staff'
 
 class IsLecturerUser(BasePermission):
     """
     Allows access only to lecturer users.
     """
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and request.user.userprofile.role == 'lecturer')
+        return get_role_context(request).role == 'lecturer'
 
 class IsStudentUser(BasePermission):
     """
     Allows access only to student users.
     """
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and request.user.userprofile.role == 'student')
+        return get_role_context(request).role == 'student'
@@ -0,0 +1,69 @@
+"""
+Per-request role resolution.
+
+`get_role_context(request)` resolves the user's UserProfile role and
+Student/Advisor profile ids with a single query the first time it is
+called for a request and caches the result on the request, so
+permissions, querysets and views can all ask "who is this?" without
+each dereferencing `userprofile`/`student_profile`/`advisor_profile`
+(and triggering a query for every missing reverse one-to-one).
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from django.contrib.auth.models import User
+
+
+@dataclass(frozen=True)
+class RoleContext:
+    user_id: Optional[int] = None
+    role: Optional[str] = None
+    is_staff: bool = False
+    student_id: Optional[int] = None
+    advisor_id: Optional[int] = None
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    @property
+    def is_admin_or_staff(self):
+        return self.is_staff or self.role in ['admin', 'staff']
+
+
+ANONYMOUS = RoleContext()
+
+
+def build_role_context(user):
+    """
+    Resolve the RoleContext for `user` with one query, or none for a
+    `users.tokens.RoleTokenUser`.
+    """
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS
+    # Users authenticated from JWT claims carry their context already
+    claims_context = getattr(user, 'role_context', None)
+    if claims_context is not None:
+        return claims_context
+    row = User.objects.filter(pk=user.pk).values(
+        'userprofile__role', 'student_profile__id', 'advisor_profile__id'
+    ).first() or {}
+    return RoleContext(
+        user_id=user.pk,
+        role=row.get('userprofile__role'),
+        is_staff=user.is_staff,
+        student_id=row.get('student_profile__id'),
+        advisor_id=row.get('advisor_profile__id'),
+    )
+
+
+def get_role_context(request):
+    """
+    Return the RoleContext for `request.user`, computed once per request.
+    """
+    user = request.user
+    cached = getattr(request, '_role_context', None)
+    if cached is None or cached[0] is not user:
+        cached = (user, build_role_context(user))
+        request._role_context = cached
+    return cached[1]
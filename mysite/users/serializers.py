@@ -1,6 +1,9 @@
 from django.db import transaction
 from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
+from . import activation
 from .models import UserProfile
 from students.models import Student
 from advisors.models import Advisor
@@ -80,3 +83,31 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             )
             
         return user
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
+
+class SetPasswordSerializer(serializers.Serializer):
+    """
+    Redeems a one-time set-password token (see activation.py).
+    """
+    uid = serializers.CharField()
+    token = serializers.CharField()
+    password = serializers.CharField(write_only=True)
+
+    def validate(self, data):
+        user = activation.redeem(data['uid'], data['token'])
+        if user is None:
+            raise serializers.ValidationError({'token': ["Invalid or expired token."]})
+        try:
+            validate_password(data['password'], user)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({'password': list(exc.messages)})
+        data['user'] = user
+        return data
+
+    def save(self):
+        user = self.validated_data['user']
+        user.set_password(self.validated_data['password'])
+        user.save(update_fields=['password'])
+        return user
@@ -0,0 +1,128 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from advisors.models import Advisor
+from students.models import Student
+from .models import UserProfile
+from .permissions import IsAdminUser, IsLecturerUser, IsStaffUser
+from .roles import build_role_context, get_role_context
+
+class RoleContextTests(APITestCase):
+    """
+    Tests for the per-request role context.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='dual', password='password123')
+        UserProfile.objects.create(user=self.user, role='lecturer')
+        self.student = Student.objects.create(user=self.user, student_id='s1', email='s1@test.com', first_name='S', last_name='1', major='CS', year_enrolled=2020)
+        self.advisor = Advisor.objects.create(user=self.user, email='a1@test.com', first_name='A', last_name='1')
+
+    def test_context_loaded_in_one_query(self):
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            context = build_role_context(user)
+        self.assertEqual(context.role, 'lecturer')
+        self.assertEqual(context.student_id, self.student.pk)
+        self.assertEqual(context.advisor_id, self.advisor.pk)
+        self.assertFalse(context.is_admin_or_staff)
+
+    def test_user_without_profiles(self):
+        bare = User.objects.create_user(username='bare', password='password123')
+        context = build_role_context(bare)
+        self.assertIsNone(context.role)
+        self.assertIsNone(context.student_id)
+        self.assertIsNone(context.advisor_id)
+
+    def test_permissions_share_one_lookup_per_request(self):
+        request = APIRequestFactory().get('/')
+        request.user = User.objects.get(pk=self.user.pk)
+        permission = (IsAdminUser | IsStaffUser | IsLecturerUser)()
+        with self.assertNumQueries(1):
+            self.assertTrue(permission.has_permission(request, None))
+            get_role_context(request)
+
+    def test_project_list_makes_no_per_role_queries(self):
+        """
+        Authentication plus role resolution cost two queries, whatever the user's roles.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # user, role context, ETag version stamp, projects page
+        self.assertEqual(len(ctx.captured_queries), 4)
+
+
+class ClaimsAuthenticationTests(APITestCase):
+    """
+    Tests for role claims in JWTs, query-free reads and the local denylist.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='lecturer', password='password123')
+        UserProfile.objects.create(user=self.user, role='lecturer')
+        self.advisor = Advisor.objects.create(user=self.user, email='a1@test.com', first_name='A', last_name='1')
+
+    def obtain(self):
+        response = self.client.post('/api/token/', {'username': 'lecturer', 'password': 'password123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_token_carries_role_claims(self):
+        access = AccessToken(self.obtain()['access'])
+        self.assertEqual(access['role'], 'lecturer')
+        self.assertEqual(access['advisor_id'], self.advisor.pk)
+        self.assertIsNone(access['student_id'])
+        self.assertFalse(access['is_staff'])
+
+    def test_reads_authorize_without_the_database(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.obtain()['access']}")
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(any('auth_user' in query['sql'] for query in ctx.captured_queries))
+        # ETag version stamp, projects page
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_student_reads_own_profile(self):
+        user = User.objects.create_user(username='student', password='password123')
+        UserProfile.objects.create(user=user, role='student')
+        student = Student.objects.create(
+            user=user, student_id='S1', email='s1@test.com', first_name='S', last_name='1',
+            major='CS', year_enrolled=2020,
+        )
+        response = self.client.post('/api/token/', {'username': 'student', 'password': 'password123'}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        response = self.client.get(f'/api/students/{student.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['student_id'], 'S1')
+
+    def test_refresh_reloads_role_claims(self):
+        tokens = self.obtain()
+        UserProfile.objects.filter(user=self.user).update(role='staff')
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'staff')
+
+    def test_revoked_tokens_are_rejected(self):
+        tokens = self.obtain()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        response = self.client.post('/api/token/revoke/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cannot_revoke_another_users_token(self):
+        other = User.objects.create_user(username='other', password='password123')
+        UserProfile.objects.create(user=other, role='student')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.obtain()['access']}")
+        response = self.client.post('/api/token/revoke/', {'refresh': str(RefreshToken.for_user(other))}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
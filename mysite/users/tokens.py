@@ -0,0 +1,89 @@
+"""
+JWTs carrying role claims.
+
+Access tokens embed the user's role, Student/Advisor profile ids and
+staff flag, so `ClaimsJWTAuthentication` can authorize read-only requests
+from the token alone. Claims are re-read from the database whenever a
+refresh token mints a new access token, so a role change takes effect
+within one ACCESS_TOKEN_LIFETIME; `denylist.deny()` revokes immediately.
+"""
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import denylist
+from .roles import RoleContext, build_role_context
+
+ROLE_CLAIMS = ('role', 'student_id', 'advisor_id', 'is_staff')
+
+
+def add_role_claims(token, user):
+    context = build_role_context(user)
+    token['username'] = user.get_username()
+    token['role'] = context.role
+    token['student_id'] = context.student_id
+    token['advisor_id'] = context.advisor_id
+    token['is_staff'] = context.is_staff
+
+
+def has_role_claims(token):
+    return all(claim in token for claim in ROLE_CLAIMS)
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Lightweight user built from an access token's claims, without a database lookup.
+    """
+
+    @property
+    def role_context(self):
+        # simplejwt reads the user id claim back as a str
+        return RoleContext(
+            user_id=int(self.pk),
+            role=self.token['role'],
+            is_staff=bool(self.token['is_staff']),
+            student_id=self.token['student_id'],
+            advisor_id=self.token['advisor_id'],
+        )
+
+
+class FreshClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token that re-reads the role claims when minting an access token.
+    """
+
+    @property
+    def access_token(self):
+        access = super().access_token
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}).first()
+        if user is not None:
+            add_role_claims(access, user)
+        return access
+
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    `TokenObtainPairView` serializer embedding the role claims.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        add_role_claims(token, user)
+        return token
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    `TokenRefreshView` serializer that rejects revoked refresh tokens and
+    issues access tokens with up-to-date role claims.
+    """
+    token_class = FreshClaimsRefreshToken
+
+    def validate(self, attrs):
+        if denylist.is_denied(self.token_class(attrs['refresh'])):
+            raise InvalidToken("Token has been revoked.")
+        return super().validate(attrs)
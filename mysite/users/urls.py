@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import UserRegistrationView
+from .views import SetPasswordView, UserRegistrationView, TokenRevokeView
 
 urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='user-registration'),
+    path('token/revoke/', TokenRevokeView.as_view(), name='token_revoke'),
+    path('password/set/', SetPasswordView.as_view(), name='password_set'),
 ]
@@ -1,5 +1,13 @@
-from rest_framework import generics, permissions
-from .serializers import UserRegistrationSerializer
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from . import denylist
+from .roles import get_role_context
+from .serializers import SetPasswordSerializer, UserRegistrationSerializer, TokenRevokeSerializer
 from django.contrib.auth.models import User
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -9,3 +17,40 @@ class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny] # Allow any user (authenticated or not) to access this endpoint.
+
+class TokenRevokeView(APIView):
+    """
+    Revoke a refresh token and the access token used for this request
+    (e.g. on logout). Users can revoke their own tokens; admins anyone's.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = TokenRevokeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            refresh = RefreshToken(serializer.validated_data['refresh'])
+        except TokenError as exc:
+            raise ValidationError({'refresh': [str(exc)]})
+
+        if str(refresh[api_settings.USER_ID_CLAIM]) != str(request.user.pk) and get_role_context(request).role != 'admin':
+            return Response({'detail': 'You cannot revoke another user\'s token.'}, status=status.HTTP_403_FORBIDDEN)
+
+        denylist.deny(refresh)
+        if request.auth is not None:
+            denylist.deny(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class SetPasswordView(APIView):
+    """
+    Set the password of an account created without one (e.g. by a bulk
+    student import) with the one-time token issued for it.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def post(self, request):
+        serializer = SetPasswordSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(status=status.HTTP_204_NO_CONTENT)